@@ -12,6 +12,42 @@ REM Clean previous builds
 if exist "build" rmdir /s /q "build"
 if exist "dist" rmdir /s /q "dist"
 
+REM Bake the referenced images
+echo Baking assets...
+python script\bake_assets.py
+if %ERRORLEVEL% NEQ 0 (
+    echo Asset bake failed!
+    pause
+    exit /b 1
+)
+
+REM Pack the texture atlas
+echo Packing texture atlas...
+python script\build_atlas.py
+if %ERRORLEVEL% NEQ 0 (
+    echo Atlas build failed!
+    pause
+    exit /b 1
+)
+
+REM Compile the level maps
+echo Compiling levels...
+python script\compile_levels.py
+if %ERRORLEVEL% NEQ 0 (
+    echo Level compile failed!
+    pause
+    exit /b 1
+)
+
+REM Pack the asset archive
+echo Packing asset archive...
+python script\build_pack.py
+if %ERRORLEVEL% NEQ 0 (
+    echo Asset pack failed!
+    pause
+    exit /b 1
+)
+
 REM Build the executable
 echo Building executable with PyInstaller...
 pyinstaller peluche_express.spec
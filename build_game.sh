@@ -45,6 +45,22 @@ if [ -d "dist" ]; then
     echo "Removed dist directory"
 fi
 
+echo
+echo "Baking assets..."
+python script/bake_assets.py || exit 1
+
+echo
+echo "Packing texture atlas..."
+python script/build_atlas.py || exit 1
+
+echo
+echo "Compiling levels..."
+python script/compile_levels.py || exit 1
+
+echo
+echo "Packing asset archive..."
+python script/build_pack.py || exit 1
+
 echo
 echo "Building executable with PyInstaller..."
 echo "This may take a few minutes..."
@@ -1,15 +1,47 @@
 # -*- coding: utf-8 -*-
+import argparse
+import os
 import arcade
+from src.frame_pacing import DEFAULT_PACING, PACING_POLICIES, FramePacer
 from src.game import PelucheExpress
+from src.input_recording import InputLog, InputReplay
 # Constants
 SCREEN_WIDTH = 1260
 SCREEN_HEIGHT = 840
 SCREEN_TITLE = "Platformer"
 
 def main():
+    parser = argparse.ArgumentParser(description="Peluche Express")
+    parser.add_argument("--profile-dump", metavar="PATH",
+                        help="on exit, write the last frames' phase timings to PATH")
+    parser.add_argument("--profile-format", choices=("json", "chrome"),
+                        help="json, or chrome for chrome://tracing / Perfetto (default: chrome for *.trace.json)")
+    parser.add_argument("--resident-levels", type=int, metavar="N",
+                        help="built levels kept for the next lap of the level chain (default 3, 0 rebuilds every visit)")
+    parser.add_argument("--record", metavar="DIR",
+                        help="save the input of each level played to DIR (replay with --replay or script/replay.py)")
+    parser.add_argument("--replay", metavar="LOG",
+                        help="play a recorded input log's level with its input instead of the keyboard")
+    parser.add_argument("--frame-pacing", choices=tuple(PACING_POLICIES), default=DEFAULT_PACING,
+                        help="how static screens are paced: full rate, adaptive (10 updates and draws a second, "
+                             "the default) or on-demand (redrawn only when they change)")
+    args = parser.parse_args()
+
     window = PelucheExpress(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE)
+    window.frame_pacer = FramePacer(window, args.frame_pacing)
+    if args.resident_levels is not None:
+        window.level_residency.max_levels = args.resident_levels
+    if args.record:
+        os.makedirs(args.record, exist_ok=True)
+        window.record_dir = args.record
+    if args.replay:
+        window.input_replay = InputReplay(InputLog.load(args.replay))
     window.setup()
-    arcade.run()
+    try:
+        arcade.run()
+    finally:
+        if args.profile_dump:
+            window.profiler.dump(args.profile_dump, args.profile_format)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
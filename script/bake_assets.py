@@ -0,0 +1,214 @@
+"""
+Bake the images the game draws into a smaller asset tree sized for a target resolution.
+
+This script:
+ - collects every image the game references: the tiles and tile objects of
+   each level (compiled from its tilemap), level and screen backgrounds from
+   config/levels.json, the player and HUD sprites (src.atlas.SPRITE_RESOURCES)
+   and the dogs of levels that have some (src/dogs.py)
+ - works out the largest size each one is drawn at on a --target window
+   (default the game's own SCREEN_WIDTH x SCREEN_HEIGHT, a scale of 1)
+ - scales down the images drawn at a size the game sets (backgrounds, the HUD
+   icon, the dogs); images whose sprites take their size from the texture (tile layers,
+   tilesheet crops, the players) keep their pixels, so hit boxes and physics
+   don't change
+ - drops the alpha channel of fully opaque images and the metadata of all
+ - writes them under assets/baked/ at their original relative paths, with a
+   manifest.json that src.resource_utils.get_resource_path reads to prefer them
+ - reports the bytes, pixels and decode time saved (decode as arcade does it,
+   median of --repeat runs)
+
+Run it from the project root (the build scripts do this before the atlas):
+    python script/bake_assets.py [--target 1260x840] [--repeat 5]
+"""
+import argparse
+import io
+import json
+import os
+import shutil
+import statistics
+import sys
+import time
+
+from PIL import Image
+
+# Project root is the parent of the script directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.atlas import SPRITE_RESOURCES  # noqa: E402
+from src.dogs import DOG_HEIGHT, DOG_IMAGE, dog_positions  # noqa: E402
+from src.level_compiler import load_level_data  # noqa: E402
+from src.level_data import GID_FLAGS  # noqa: E402
+from src.resource_utils import BAKED_DIR, BAKED_MANIFEST  # noqa: E402
+from src.simulation import SCREEN_HEIGHT, SCREEN_WIDTH  # noqa: E402
+
+IMAGES_DIR = "assets/images"
+# HUD icons and the size src/hud.py draws them at
+HUD_ICONS = {"assets/images/Candy expansion/Tiles/cherry.png": (24, 24)}
+
+
+def collect_references():
+    """
+    Project-relative image path -> list of drawn sizes in window pixels at
+    scale 1; a size of None means the sprite takes its size from the texture.
+    """
+    with open(os.path.join(ROOT, "config", "levels.json"), "r", encoding="utf-8") as f:
+        levels = json.load(f)
+    references = {}
+
+    def add(path, size):
+        references.setdefault(path, []).append(size)
+
+    for level in levels:
+        if level.get("type") != "level":
+            # Screens stretch their background over the window
+            add(level["background"], ("height", SCREEN_HEIGHT))
+            continue
+        level_data = load_level_data(os.path.join(ROOT, level["map"]))
+        for layer in level_data.layers:
+            if layer["kind"] == "tiles":
+                gids = {gid & ~GID_FLAGS for gid in level_data.layer_data[layer["name"]] if gid}
+                for gid in gids:
+                    add(level_data.tiles[gid]["image"], None)
+                continue
+            for obj in layer["objects"]:
+                if obj["kind"] == "tile":
+                    # Drawn at the object's size, but from a crop rect of the source image
+                    add(level_data.tiles[obj["gid"] & ~GID_FLAGS]["image"], None)
+        if dog_positions(level_data):
+            add(DOG_IMAGE, ("height", DOG_HEIGHT))
+        # Level backgrounds are scaled to the map's height (backgrounds.ParallaxBackground)
+        map_height = level_data.height * level_data.tile_height
+        for layer in level.get("background_layers") or [{"image": level["background"]}]:
+            add(layer["image"], ("height", map_height))
+    for path in SPRITE_RESOURCES:
+        add(path, None)
+    for path, (width, height) in HUD_ICONS.items():
+        add(path, ("box", width, height))
+    return references
+
+
+def baked_scale(image_size, sizes, factor):
+    """Scale to bake an image at: the largest drawn size at `factor`, never above 1."""
+    if None in sizes:
+        return 1.0
+    width, height = image_size
+    scale = 0.0
+    for size in sizes:
+        if size[0] == "height":
+            scale = max(scale, size[1] * factor / height)
+        else:
+            scale = max(scale, size[1] * factor / width, size[2] * factor / height)
+    return min(1.0, scale)
+
+
+def bake_image(source, scale):
+    """The baked PNG bytes of an image and its new (size, mode)."""
+    image = Image.open(source)
+    image.load()
+    if scale < 1.0:
+        size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+        image = image.resize(size, Image.Resampling.LANCZOS)
+    if image.mode in ("RGBA", "LA") and image.getchannel("A").getextrema() == (255, 255):
+        image = image.convert(image.mode[:-1])
+    # Keeps no text, ICC profile or dpi chunks
+    image.info = {}
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG", optimize=True)
+    return buffer.getvalue(), image.size, image.mode
+
+
+def decode_ms(path, repeat):
+    """Median time to open an image and convert it to RGBA, like arcade.load_texture."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        Image.open(path).convert("RGBA")
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def parse_target(text):
+    width, _, height = text.lower().partition("x")
+    return int(width), int(height)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--target", type=parse_target, default=(SCREEN_WIDTH, SCREEN_HEIGHT),
+                        help="window size to bake for, WIDTHxHEIGHT")
+    parser.add_argument("--repeat", type=int, default=5, help="decodes timed per image")
+    args = parser.parse_args()
+    target_width, target_height = args.target
+    # The camera shows the same world at any window size, so drawn sizes scale with it
+    factor = max(target_width / SCREEN_WIDTH, target_height / SCREEN_HEIGHT)
+
+    baked_dir = os.path.join(ROOT, BAKED_DIR)
+    if os.path.isdir(baked_dir):
+        shutil.rmtree(baked_dir)
+    references = collect_references()
+    entries = {}
+    totals = {"source_bytes": 0, "bytes": 0, "source_pixels": 0, "pixels": 0, "source_ms": 0.0, "ms": 0.0}
+    # One row per image resized or stripped of its alpha channel
+    print(f"{'image':<52}{'source':>11}{'baked':>15}{'KB':>7}{'->':>3}{'KB':>6}{'decode ms':>11}{'->':>4}{'ms':>6}")
+    for path in sorted(references):
+        source = os.path.join(ROOT, path)
+        with Image.open(source) as image:
+            source_size, source_mode = image.size, image.mode
+        scale = baked_scale(source_size, references[path], factor)
+        data, size, mode = bake_image(source, scale)
+        source_bytes = os.path.getsize(source)
+        destination = os.path.join(baked_dir, path)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        if len(data) < source_bytes or size != source_size:
+            with open(destination, "wb") as f:
+                f.write(data)
+        else:
+            # Re-encoding didn't pay off: ship the original bytes
+            shutil.copyfile(source, destination)
+            mode = source_mode
+        stat = os.stat(source)
+        entries[path] = {
+            "source_size": list(source_size),
+            "size": list(size),
+            "mode": mode,
+            "source_bytes": stat.st_size,
+            "source_mtime": int(stat.st_mtime),
+        }
+        baked_bytes = os.path.getsize(destination)
+        source_ms, baked_ms = decode_ms(source, args.repeat), decode_ms(destination, args.repeat)
+        totals["source_bytes"] += source_bytes
+        totals["bytes"] += baked_bytes
+        totals["source_pixels"] += source_size[0] * source_size[1]
+        totals["pixels"] += size[0] * size[1]
+        totals["source_ms"] += source_ms
+        totals["ms"] += baked_ms
+        if size != source_size or mode != source_mode:
+            name = os.path.relpath(path, IMAGES_DIR)
+            print(f"{name[-51:]:<52}{'%dx%d' % source_size:>11}{'%dx%d %s' % (*size, mode):>15}{source_bytes // 1024:>7}"
+                  f"{'':>3}{baked_bytes // 1024:>6}{source_ms:>11.2f}{'':>4}{baked_ms:>6.2f}")
+
+    manifest = {"version": 1, "target": [target_width, target_height], "images": entries}
+    with open(os.path.join(ROOT, BAKED_MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+
+    shipped = sum(
+        os.path.getsize(os.path.join(directory, name))
+        for directory, _, names in os.walk(os.path.join(ROOT, IMAGES_DIR))
+        for name in names
+    )
+    print()
+    print(f"Baked {len(entries)} referenced images for {target_width}x{target_height} into {BAKED_DIR}/")
+    print(f"  {IMAGES_DIR}: {shipped / 2**20:.1f} MB, of which referenced {totals['source_bytes'] / 2**20:.1f} MB")
+    print(f"  baked:         {totals['bytes'] / 2**20:.1f} MB "
+          f"({100 * (1 - totals['bytes'] / shipped):.0f}% less than {IMAGES_DIR} to ship)")
+    print(f"  texels:        {totals['source_pixels'] / 1e6:.2f} M -> {totals['pixels'] / 1e6:.2f} M "
+          f"({totals['source_pixels'] * 4 / 2**20:.1f} -> {totals['pixels'] * 4 / 2**20:.1f} MB as RGBA)")
+    print(f"  decode:        {totals['source_ms']:.1f} ms -> {totals['ms']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
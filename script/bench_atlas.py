@@ -0,0 +1,78 @@
+"""
+Compare level tilemap load time with and without the texture atlas.
+
+For every level in config/levels.json this times:
+ - loose: CompiledTileMap with the atlas taken away, so its texture preload
+   (decode_texture_images + install_textures) reads each tile PNG from disk
+ - atlas: CompiledTileMap as the game builds it, the preload serving the tiles
+   from the prebuilt atlas pages
+Both start from an empty texture cache (and a closed atlas) on every run, the
+same situation as the first time a level is entered. The compiled level is
+read once beforehand and isn't timed.
+
+Build the atlas first (python script/build_atlas.py), then run:
+    python script/bench_atlas.py [runs]
+Set ARCADE_HEADLESS=1 on machines without a display.
+"""
+import json
+import os
+import statistics
+import sys
+import time
+
+import arcade
+
+# Project root is the parent of the script directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src import atlas  # noqa: E402
+from src.level_compiler import load_level_data  # noqa: E402
+from src.level_data import CompiledTileMap  # noqa: E402
+from src.resource_utils import get_resource_path  # noqa: E402
+from src.textures import texture_registry  # noqa: E402
+
+
+def _cold_start():
+    texture_registry.trim()
+    arcade.cleanup_texture_cache()
+    atlas._atlas = None
+
+
+def time_loose(level_data):
+    _cold_start()
+    # What load_atlas() keeps when no atlas was built
+    atlas._atlas = {}
+    start = time.perf_counter()
+    CompiledTileMap(level_data, scaling=1.0)
+    return time.perf_counter() - start
+
+
+def time_atlas(level_data):
+    _cold_start()
+    start = time.perf_counter()
+    CompiledTileMap(level_data, scaling=1.0)
+    return time.perf_counter() - start
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    if not os.path.exists(get_resource_path(atlas.ATLAS_MANIFEST)):
+        print("Atlas not built. Run: python script/build_atlas.py")
+        return
+    # A GL context is needed to create sprite lists
+    window = arcade.Window(64, 64, "bench_atlas", visible=False)
+    with open(get_resource_path("config/levels.json"), "r", encoding="utf-8") as f:
+        levels = [level for level in json.load(f) if level.get("type") == "level"]
+
+    print(f"{'level':<14}{'loose (ms)':>12}{'atlas (ms)':>12}{'speedup':>10}")
+    for level in levels:
+        level_data = load_level_data(get_resource_path(level["map"]))
+        loose = statistics.median(time_loose(level_data) for _ in range(runs)) * 1000
+        packed = statistics.median(time_atlas(level_data) for _ in range(runs)) * 1000
+        print(f"{level['id']:<14}{loose:>12.1f}{packed:>12.1f}{loose / packed:>9.2f}x")
+    window.close()
+
+
+if __name__ == "__main__":
+    main()
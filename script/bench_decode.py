@@ -0,0 +1,90 @@
+"""
+Time decoding a level's images with 1 to DECODE_WORKERS threads.
+
+For every playable level (or the ones given) this decodes what the level
+loader decodes (its background and tile images, src/level_loader.py) plus the
+players' frames, on a cold texture cache (nothing installed into arcade's), with
+src/atlas.decode_texture_images at each thread count, and reports:
+ - images: distinct images decoded
+ - ms (N threads): best of --repeat runs
+ - speedup: 1-thread time over the most threads' time
+
+Images are decoded from the loose files (the asset archive when built), as
+without an atlas; --atlas crops them out of the atlas pages instead, where
+only the copy is left to parallelize. PIL releases the GIL while it inflates
+a PNG, but the per-pixel hit box scan of a loose image holds it, so the
+speedup stays below the core count (os.cpu_count() here: printed first).
+
+    python script/bench_decode.py [--levels Castle] [--repeat 5] [--atlas] [--threads 1 2 4 8]
+"""
+import argparse
+import os
+import sys
+import time
+
+# Project root is the parent of the script directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src import atlas  # noqa: E402
+from src.animation import character_textures  # noqa: E402
+from src.backgrounds import background_image_paths  # noqa: E402
+from src.level_compiler import load_level_data  # noqa: E402
+from src.level_manager import load_levels_config  # noqa: E402
+from src.player import CHARACTER  # noqa: E402
+from src.resource_utils import get_resource_path  # noqa: E402
+
+
+def thread_counts():
+    """1, 2, 4... threads up to DECODE_WORKERS."""
+    counts = [1, 2, 4, atlas.DECODE_WORKERS]
+    return sorted({count for count in counts if count <= atlas.DECODE_WORKERS})
+
+
+def level_images(level):
+    """Every image the level loader and the player setup decode for a level."""
+    level_data = load_level_data(get_resource_path(level["map"]))
+    players = [path for path, _ in character_textures(CHARACTER) + character_textures(CHARACTER, "blue")]
+    return list(background_image_paths(level)) + level_data.tile_image_paths() + players
+
+
+def time_decode(images, workers, repeat):
+    """Best ms of decoding the images on `workers` threads, and how many were decoded."""
+    best = None
+    decoded = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        decoded = atlas.decode_texture_images(images, include_loose=True, workers=workers)
+        ms = (time.perf_counter() - start) * 1000
+        best = ms if best is None else min(best, ms)
+    return best, len(decoded)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--levels", nargs="+", help="level ids (default: every playable level)")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per thread count (the best is kept)")
+    parser.add_argument("--atlas", action="store_true", help="crop packed images out of the atlas pages")
+    parser.add_argument("--threads", type=int, nargs="+", help="thread counts (default: 1, 2, 4 up to DECODE_WORKERS)")
+    args = parser.parse_args()
+
+    if not args.atlas:
+        # Treated as not built, so every image is read and decoded from its own file
+        atlas._atlas = {}
+    counts = args.threads or thread_counts()
+    levels = load_levels_config()
+    level_ids = args.levels or [level_id for level_id, level in levels.items() if level.get("type") == "level"]
+    print(f"cpu_count {os.cpu_count()}, DECODE_WORKERS {atlas.DECODE_WORKERS}, source {'atlas' if args.atlas else 'loose'}")
+    print(f"{'level':<14}{'images':>7}" + "".join(f"{f'ms ({count})':>10}" for count in counts) + f"{'speedup':>9}")
+    for level_id in level_ids:
+        images = level_images(levels[level_id])
+        times = []
+        decoded = 0
+        for count in counts:
+            ms, decoded = time_decode(images, count, args.repeat)
+            times.append(ms)
+        print(f"{level_id:<14}{decoded:>7}" + "".join(f"{ms:>10.1f}" for ms in times) + f"{times[0] / times[-1]:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
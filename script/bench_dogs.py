@@ -0,0 +1,86 @@
+"""
+Time the dogs' navigation: graph builds and per-frame dog updates.
+
+For every playable level (or the ones given) this builds the level's
+navigation graph (src/navigation.py) from its collidable tiles and reports its
+spans, links, size and build time, then plays the level headless with the
+run-right-jump bot and 0, 10, 50 and 200 extra dogs next to the spawn
+(stress_levels.with_more_dogs), reporting:
+ - dogs ms: mean time per frame of the "update/dogs" section
+ - us/dog: that time per dog that was awake
+ - searches: A* searches run, against next-link cache hits
+
+    ARCADE_HEADLESS=1 python script/bench_dogs.py [--levels Forest] [--frames 1200]
+"""
+import argparse
+import os
+import sys
+import time
+
+# Project root is the parent of the script directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.level_compiler import load_level_data  # noqa: E402
+from src.level_manager import load_levels_config  # noqa: E402
+from src.navigation import NavGraph  # noqa: E402
+from src.resource_utils import get_resource_path  # noqa: E402
+from src.simulation import Simulation, run_right_jump_bot  # noqa: E402
+from src.stress_levels import with_more_dogs  # noqa: E402
+
+DOG_COUNTS = (0, 10, 50, 200)
+
+
+def build_graph(level_data):
+    """The level's graph and how long it took to build, in ms."""
+    start = time.perf_counter()
+    graph = NavGraph.from_level(level_data)
+    return graph, (time.perf_counter() - start) * 1000
+
+
+def play(level_id, level_data, frames):
+    """Play the level with the bot; the dogs' mean ms per frame and the graph's stats."""
+    sim = Simulation(level_id, level_data=level_data)
+    awake = 0
+    while not sim.finished and sim.frame < frames:
+        sim.step(run_right_jump_bot(sim))
+        if sim.dogs:
+            awake += sum(dog.awake for dog in sim.dogs.sprites)
+    phases = sim.profiler.summary(sim.frame)["phases"]
+    dogs_ms = phases.get("update/dogs", 0.0)
+    graph = sim.dogs.graph if sim.dogs else None
+    return {
+        "dogs": len(sim.dogs) if sim.dogs else 0,
+        "dogs_ms": dogs_ms,
+        "us_per_dog": dogs_ms * 1000 * sim.frame / awake if awake else 0.0,
+        "stats": graph.stats() if graph else {"searches": 0, "hits": 0},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--levels", nargs="+", help="level ids (default: every playable level)")
+    parser.add_argument("--frames", type=int, default=1200, help="frames played per case")
+    args = parser.parse_args()
+
+    levels = load_levels_config()
+    level_ids = args.levels or [level_id for level_id, level in levels.items() if level.get("type") == "level"]
+    print(f"{'level':<14}{'spans':>7}{'links':>7}{'bytes':>8}{'build ms':>10}")
+    for level_id in level_ids:
+        graph, ms = build_graph(load_level_data(get_resource_path(levels[level_id]["map"])))
+        stats = graph.stats()
+        print(f"{level_id:<14}{stats['spans']:>7}{stats['links']:>7}{stats['bytes']:>8}{ms:>10.1f}")
+
+    print()
+    print(f"{'level':<14}{'dogs':>6}{'dogs ms':>9}{'us/dog':>8}{'searches':>10}{'hits':>8}")
+    for level_id in level_ids:
+        level_data = load_level_data(get_resource_path(levels[level_id]["map"]))
+        for count in DOG_COUNTS:
+            result = play(level_id, with_more_dogs(level_data, count) if count else level_data, args.frames)
+            stats = result["stats"]
+            print(f"{level_id:<14}{result['dogs']:>6}{result['dogs_ms']:>9.3f}{result['us_per_dog']:>8.2f}"
+                  f"{stats['searches']:>10}{stats['hits']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Measure what static screens cost under each frame pacing policy.
+
+Runs the game's real event loop (pyglet.app.run) on the start screen for a few
+seconds, then on a level's transition screen for TRANSITION_SECONDS (it lasts
+3 s; the level's preparation is finished first, so the loader thread is idle),
+once per policy of src/frame_pacing.py (main.py --frame-pacing), and reports:
+ - updates/s, draws/s: on_update and on_draw calls per second
+ - CPU %: process CPU time (user + system) over wall time, this process only;
+   each draw waits for the GPU to finish, so a software renderer's work counts
+ - energy J: package energy over the run from RAPL, where the kernel exposes it
+   (/sys/class/powercap/intel-rapl:0), else n/a
+
+A slower update rate starts gameplay up to 1 / STATIC_RATE s after the
+transition's 3 s; input brings the full rates back at once.
+
+    python script/bench_pacing.py [--seconds 5] [--level Forest]
+
+Set ARCADE_HEADLESS=1 without a display (the software renderer makes draws
+dearer than on a GPU, so the CPU savings read higher than on real hardware).
+"""
+import argparse
+import os
+import sys
+import time
+
+import pyglet
+
+# Project root is the parent of the script directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from main import SCREEN_HEIGHT, SCREEN_TITLE, SCREEN_WIDTH  # noqa: E402
+from src.frame_pacing import FULL_RATE, PACING_POLICIES, FramePacer  # noqa: E402
+from src.game import PelucheExpress  # noqa: E402
+from src.level_manager import load_current_level  # noqa: E402
+
+# Less than the transition screen's 3 s, so gameplay never starts
+TRANSITION_SECONDS = 2.5
+RAPL_ENERGY = "/sys/class/powercap/intel-rapl:0/energy_uj"
+
+
+def energy_joules():
+    """Package energy counter in joules, or None where RAPL isn't readable."""
+    try:
+        with open(RAPL_ENERGY, "r", encoding="ascii") as f:
+            return int(f.read()) / 1e6
+    except (OSError, ValueError):
+        return None
+
+
+class Counter:
+    """Counts a window's on_update and on_draw calls."""
+
+    def __init__(self, game):
+        self.updates = 0
+        self.draws = 0
+        update, draw = game.on_update, game.on_draw
+
+        def on_update(delta_time):
+            self.updates += 1
+            update(delta_time)
+
+        def on_draw():
+            self.draws += 1
+            draw()
+            # Render now: without a display nothing throttles the frames queued to the GPU
+            game.ctx.finish()
+        game.on_update = on_update
+        game.on_draw = on_draw
+
+
+def run_loop(game, policy, counter, seconds):
+    """Run pyglet's loop for some seconds from full rate with a fresh pacer; (wall s, CPU s, energy J or None)."""
+    pyglet.clock.unschedule(pyglet.app.event_loop._redraw_windows)
+    game.set_update_rate(1 / FULL_RATE)
+    game.frame_pacer = FramePacer(game, policy)
+    counter.updates = counter.draws = 0
+    pyglet.clock.schedule_once(lambda delta_time: pyglet.app.exit(), seconds)
+    energy = energy_joules()
+    cpu = time.process_time()
+    start = time.perf_counter()
+    pyglet.app.run(1 / FULL_RATE)
+    wall = time.perf_counter() - start
+    cpu = time.process_time() - cpu
+    end_energy = energy_joules()
+    return wall, cpu, end_energy - energy if energy is not None and end_energy is not None else None
+
+
+def print_row(screen, policy, counter, wall, cpu, energy):
+    energy_text = f"{energy:>10.2f}" if energy is not None else f"{'n/a':>10}"
+    print(f"{screen:<12}{policy:<11}{counter.updates / wall:>10.1f}{counter.draws / wall:>9.1f}"
+          f"{cpu / wall * 100:>7.1f}{energy_text}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5.0, help="seconds on the start screen per policy")
+    parser.add_argument("--level", default="Forest", help="level whose transition screen is measured")
+    args = parser.parse_args()
+
+    game = PelucheExpress(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE)
+    # Lay out the transition title once (the first use of its font is slow) and let
+    # the level's preparation finish, so only the screens themselves are measured
+    game.current_level_id = args.level
+    load_current_level(game)
+    game.on_draw()
+    game.level_loader.request(args.level).future.result()
+    counter = Counter(game)
+    print(f"{'screen':<12}{'policy':<11}{'updates/s':>10}{'draws/s':>9}{'CPU %':>7}{'energy J':>10}")
+    game.current_level_id = "start"
+    load_current_level(game)
+    for policy in PACING_POLICIES:
+        print_row("start", policy, counter, *run_loop(game, policy, counter, args.seconds))
+    # One visit for every policy: the transition timer restarts instead of the level being entered again
+    game.current_level_id = args.level
+    load_current_level(game)
+    for policy in PACING_POLICIES:
+        game.transition_timer = 0
+        print_row("transition", policy, counter, *run_loop(game, policy, counter, TRANSITION_SECONDS))
+    game.close()
+
+
+if __name__ == "__main__":
+    main()
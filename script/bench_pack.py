@@ -0,0 +1,90 @@
+"""
+Compare cold start and level load reading loose files and the asset archive.
+
+Each measurement runs in a fresh process (empty texture caches, nothing
+mapped yet) with the window hidden, once reading loose files
+(PELUCHE_LOOSE_ASSETS set) and once reading assets.pack:
+ - start: creating the window, setup() and drawing the first frame
+ - <level>: from load_current_level to the level's first frame drawn, the
+   level's preparation waited for instead of the 3 s transition screen
+and, for each, the files opened under the project folder outside of Python
+modules (audit hook), the median over the runs.
+
+Build the archive first (python script/build_pack.py), then run:
+    ARCADE_HEADLESS=1 python script/bench_pack.py [runs]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Project root is the parent of the script directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+RUNS = 5
+MODES = (("loose", {"PELUCHE_LOOSE_ASSETS": "1"}), ("pack", {}))
+
+
+def measure(case):
+    """In the child process: time one case, return (ms, files opened)."""
+    opened = []
+
+    def audit(event, args):
+        if event == "open" and isinstance(args[0], str) and args[0].startswith(ROOT):
+            if not args[0].endswith((".py", ".pyc")):
+                opened.append(args[0])
+
+    sys.addaudithook(audit)
+    from main import SCREEN_HEIGHT, SCREEN_TITLE, SCREEN_WIDTH
+    from src.game import PelucheExpress
+    from src.level_manager import load_current_level
+
+    start = time.perf_counter()
+    game = PelucheExpress(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE)
+    if case == "start":
+        game.setup()
+    else:
+        start = time.perf_counter()
+        del opened[:]
+        game.current_level_id = case
+        load_current_level(game)
+        game.level_loader.request(case).future.result()
+        game.on_update(3.0)
+    game.on_draw()
+    elapsed = (time.perf_counter() - start) * 1000
+    count = len(opened)
+    game.close()
+    return elapsed, count
+
+
+def run(case, env, runs):
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", case],
+            env=dict(os.environ, **env), cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return statistics.median(ms for ms, _ in samples), samples[0][1]
+
+
+def main():
+    if sys.argv[1:2] == ["--child"]:
+        print(json.dumps(measure(sys.argv[2])))
+        return
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else RUNS
+    if not os.path.exists(os.path.join(ROOT, "assets.pack")):
+        sys.exit("No assets.pack: run python script/build_pack.py first")
+    with open(os.path.join(ROOT, "config", "levels.json"), "r", encoding="utf-8") as f:
+        levels = [level["id"] for level in json.load(f) if level.get("type") == "level"]
+    print(f"{'case':<14}{'loose ms':>10}{'opens':>7}{'pack ms':>10}{'opens':>7}{'speedup':>9}")
+    for case in ["start"] + levels:
+        (loose_ms, loose_opens), (pack_ms, pack_opens) = (run(case, env, runs) for _, env in MODES)
+        print(f"{case:<14}{loose_ms:>10.1f}{loose_opens:>7}{pack_ms:>10.1f}{pack_opens:>7}{loose_ms / pack_ms:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Time batched and per-player physics from 2 to 32 players.
+
+For every level in config/levels.json this adds PlayerN spawns next to
+Player1 (src.stress_levels.with_more_players) until there are N, sets the
+players up the way the game does (build_scene, the level's CollisionGrid) and
+replays the compare_physics input script, each player a few steps behind the
+previous one so they spread out. Per simulation step it reports:
+ - batched: PlayerPhysics.step() plus sync_sprites(), every player at once
+ - per player: GridPlayerPhysics.step() plus sync_sprites(), each player
+   driven by its own GridPhysicsEngine
+and the cost per player of each, so the growth with N is easy to read. The
+game steps players batched from player_physics.BATCH_MIN_PLAYERS on, around
+where the two cross.
+
+    ARCADE_HEADLESS=1 python script/bench_players.py [steps]
+"""
+import json
+import os
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+import arcade
+
+# Project root is the parent of the script directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from compare_physics import GRAVITY, scripted_input  # noqa: E402
+from src.gameplay import build_scene, player_spawns  # noqa: E402
+from src.grid_physics import CollisionGrid  # noqa: E402
+from src.input_handler import keys_to_inputs  # noqa: E402
+from src.level_compiler import load_level_data  # noqa: E402
+from src.level_data import CompiledTileMap  # noqa: E402
+from src.player_physics import GridPlayerPhysics, LevelHulls, PlayerPhysics  # noqa: E402
+from src.resource_utils import get_resource_path  # noqa: E402
+from src.stress_levels import with_more_players  # noqa: E402
+
+PLAYER_COUNTS = (2, 4, 8, 16, 24, 32)
+STEPS = 1200
+# Steps between the input scripts of consecutive players
+STAGGER = 7
+
+
+def build_world(level, count):
+    """A game-like object with `count` players set up on the level."""
+    level_data = load_level_data(get_resource_path(level["map"]))
+    missing = count - len(player_spawns(level_data))
+    if missing > 0:
+        level_data = with_more_players(level_data, missing)
+    world = SimpleNamespace(current_level_id=None, level_stream=None)
+    world.tile_map = CompiledTileMap(level_data)
+    build_scene(world, level_data)
+    world.players = world.players[:count]
+    world.collision_grid = CollisionGrid.from_tile_map(world.tile_map, level_data.collidable_layer_names)
+    return world
+
+
+def held_keys(step, index, held):
+    """Player index's script, STAGGER steps behind the previous player's."""
+    for key, pressed in scripted_input(step - index * STAGGER):
+        if pressed:
+            held.add(key)
+        else:
+            held.discard(key)
+    return held
+
+
+def time_physics(world, physics, steps):
+    """Median seconds of one step() plus sync_sprites() of a physics state of the world's players."""
+    held = [set() for _ in world.players]
+    samples = []
+    for step in range(steps):
+        for index in range(physics.count):
+            physics.inputs[index] = keys_to_inputs(held_keys(step, index, held[index]), 1)[0]
+        start = time.perf_counter()
+        physics.step()
+        physics.sync_sprites()
+        samples.append(time.perf_counter() - start)
+        for player in world.players:
+            player.update()
+        physics.refresh_shapes()
+    return statistics.median(samples)
+
+
+def time_batched(world, steps):
+    physics = PlayerPhysics(LevelHulls.from_grid(world.collision_grid), world.players, GRAVITY)
+    return time_physics(world, physics, steps)
+
+
+def time_per_player(world, steps):
+    return time_physics(world, GridPlayerPhysics(world.collision_grid, world.players, GRAVITY), steps)
+
+
+def main():
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 else STEPS
+    window = arcade.Window(64, 64, "bench_players", visible=False)
+    with open(get_resource_path("config/levels.json"), "r", encoding="utf-8") as f:
+        levels = [level for level in json.load(f) if level.get("type") == "level"]
+    print(f"{'level':<14}{'players':>8}{'batched us':>12}{'us/player':>11}{'per player us':>15}{'us/player':>11}")
+    for level in levels:
+        for count in PLAYER_COUNTS:
+            batched = time_batched(build_world(level, count), steps) * 1e6
+            per_player = time_per_player(build_world(level, count), steps) * 1e6
+            print(f"{level['id']:<14}{count:>8}{batched:>12.1f}{batched / count:>11.1f}"
+                  f"{per_player:>15.1f}{per_player / count:>11.1f}")
+    window.close()
+
+
+if __name__ == "__main__":
+    main()
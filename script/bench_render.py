@@ -0,0 +1,94 @@
+"""
+Compare tile drawing cost with and without chunked viewport culling.
+
+For every level in config/levels.json, plus a synthetic map ten times longer
+than the first one, this sweeps a window-sized camera across the map and times:
+ - scene: arcade.Scene.draw(), every sprite of every layer each frame
+ - chunked: src.tile_chunks.ChunkedTileLayers.draw_scene(), only the chunks on screen
+Two medians are reported per mode: submit (CPU time of the draw calls) and
+frame (submit plus waiting for the GPU with ctx.finish, so it includes the
+draw itself).
+
+    python script/bench_render.py [frames]
+Set ARCADE_HEADLESS=1 on machines without a display.
+"""
+import json
+import os
+import statistics
+import sys
+import time
+
+import arcade
+
+# Project root is the parent of the script directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.level_compiler import load_level_data  # noqa: E402
+from src.level_data import CompiledTileMap  # noqa: E402
+from src.resource_utils import get_resource_path  # noqa: E402
+from src.stress_levels import stretched  # noqa: E402
+from src.tile_chunks import ChunkedTileLayers, static_tile_layer_names  # noqa: E402
+
+SCREEN_WIDTH = 1260
+SCREEN_HEIGHT = 840
+STRETCH = 10
+
+
+def time_frames(window, camera, map_width, frames, draw):
+    submits = []
+    totals = []
+    span = max(0, map_width - SCREEN_WIDTH)
+    for frame in range(frames):
+        camera.move_to((span * frame / max(1, frames - 1), 0), 1.0)
+        window.clear()
+        window.ctx.finish()
+        start = time.perf_counter()
+        camera.use()
+        draw()
+        submitted = time.perf_counter()
+        window.ctx.finish()
+        submits.append(submitted - start)
+        totals.append(time.perf_counter() - start)
+    return statistics.median(submits) * 1000, statistics.median(totals) * 1000
+
+
+def bench(window, name, level_data, frames):
+    tile_map = CompiledTileMap(level_data)
+    scene = arcade.Scene.from_tilemap(tile_map)
+    chunks = ChunkedTileLayers(tile_map, static_tile_layer_names(level_data))
+    camera = arcade.Camera(SCREEN_WIDTH, SCREEN_HEIGHT)
+    map_width = tile_map.width * tile_map.tile_width
+    sprite_count = sum(len(sprite_list) for sprite_list in scene.sprite_lists)
+
+    def draw_chunked():
+        left = camera.position[0]
+        chunks.draw_scene(scene, left, left + SCREEN_WIDTH)
+
+    # Warm-up: upload both sets of sprite buffers before timing
+    time_frames(window, camera, map_width, 3, scene.draw)
+    time_frames(window, camera, map_width, 3, draw_chunked)
+    full = time_frames(window, camera, map_width, frames, scene.draw)
+    culled = time_frames(window, camera, map_width, frames, draw_chunked)
+    print(f"{name:<16}{map_width:>9}{sprite_count:>9}"
+          f"{full[0]:>10.3f}{full[1]:>10.3f}{culled[0]:>10.3f}{culled[1]:>10.3f}")
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    window = arcade.Window(SCREEN_WIDTH, SCREEN_HEIGHT, "bench_render", visible=False)
+    with open(get_resource_path("config/levels.json"), "r", encoding="utf-8") as f:
+        levels = [level for level in json.load(f) if level.get("type") == "level"]
+
+    print(f"{'':<34}{'scene (ms)':>20}{'chunked (ms)':>20}")
+    print(f"{'level':<16}{'width':>9}{'sprites':>9}{'submit':>10}{'frame':>10}{'submit':>10}{'frame':>10}")
+    for level in levels:
+        bench(window, level["id"], load_level_data(get_resource_path(level["map"])), frames)
+    first = levels[0]
+    level_data = load_level_data(get_resource_path(first["map"]))
+    bench(window, f"{first['id']} x{STRETCH}", stretched(level_data, STRETCH), frames)
+    window.close()
+
+
+if __name__ == "__main__":
+    main()
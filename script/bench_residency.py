@@ -0,0 +1,122 @@
+"""
+Play laps of the level chain with and without resident levels.
+
+Follows config/levels.json's "next" chain (start -> Forest -> ... -> end ->
+start) for a number of laps in a hidden window, playing each level for a few
+seconds (run right and jump, picking up apples), with the residency manager
+(src/level_residency.py) keeping 0 (every visit rebuilds), 1 and 3 levels.
+Per lap it reports:
+ - enter ms: mean time from load_current_level to a level's first frame, the
+   preparation waited for instead of the 3 s transition screen
+ - RSS MB: resident memory of the process at the end of the lap (Linux)
+ - cached: textures in arcade's load_texture cache
+ - atlas: textures in the GPU atlas
+ - resident: levels kept, their estimated CPU + GPU MB, evictions so far
+
+    ARCADE_HEADLESS=1 python script/bench_residency.py [--laps 10] [--frames 240]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import arcade
+
+# Project root is the parent of the script directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from main import SCREEN_HEIGHT, SCREEN_TITLE, SCREEN_WIDTH  # noqa: E402
+from src.game import PelucheExpress  # noqa: E402
+from src.level_manager import load_current_level  # noqa: E402
+from src.clock import STEP  # noqa: E402
+
+RESIDENT_LEVELS = (0, 1, 3)
+
+
+def rss_mb():
+    """Resident set size of this process, or nan where /proc isn't available."""
+    try:
+        with open("/proc/self/statm", "r", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return float("nan")
+
+
+def enter(game, level_id):
+    """Go to a level or screen the way the game does; return the ms until its first frame."""
+    start = time.perf_counter()
+    game.current_level_id = level_id
+    load_current_level(game)
+    if game.state == "transition_screen":
+        if level_id not in game.level_residency:
+            game.level_loader.request(level_id).future.result()
+        game.on_update(3.0)
+    game.on_draw()
+    return (time.perf_counter() - start) * 1000
+
+
+def play(game, frames):
+    """Run right, jumping every half second."""
+    game.on_key_press(arcade.key.RIGHT, 0)
+    for frame in range(frames):
+        if frame % 30 == 0:
+            game.on_key_press(arcade.key.UP, 0)
+        elif frame % 30 == 5:
+            game.on_key_release(arcade.key.UP, 0)
+        game.on_update(STEP * 2)
+        if frame % 4 == 0:
+            game.on_draw()
+        if game.state != "game":
+            break
+    game.on_key_release(arcade.key.RIGHT, 0)
+
+
+def run(game, laps, frames):
+    chain = []
+    level_id = "start"
+    while level_id not in chain:
+        chain.append(level_id)
+        level_id = game.levels[level_id].get("next")
+    for lap in range(laps):
+        entries = []
+        for level_id in chain:
+            ms = enter(game, level_id)
+            if game.levels[level_id]["type"] == "level":
+                entries.append(ms)
+                play(game, frames)
+        residency = game.level_residency.stats()
+        yield {
+            "lap": lap + 1,
+            "enter_ms": statistics.mean(entries),
+            "rss_mb": rss_mb(),
+            "cached": len(arcade.load_texture.texture_cache),
+            "atlas": len(game.ctx.default_atlas._textures),
+            "resident": len(residency["levels"]),
+            "resident_mb": (residency["cpu_bytes"] + residency["gpu_bytes"]) / 2**20,
+            "evictions": residency["evictions"],
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--laps", type=int, default=10, help="laps of the level chain per setting")
+    parser.add_argument("--frames", type=int, default=240, help="frames played per level visit")
+    args = parser.parse_args()
+
+    game = PelucheExpress(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE)
+    print(f"{'resident':<10}{'lap':>4}{'enter ms':>10}{'RSS MB':>9}{'cached':>8}{'atlas':>7}"
+          f"{'kept':>6}{'kept MB':>9}{'evicted':>9}")
+    for max_levels in RESIDENT_LEVELS:
+        game.level_residency.clear()
+        game.level_residency.max_levels = max_levels
+        for result in run(game, args.laps, args.frames):
+            print(f"{max_levels:<10}{result['lap']:>4}{result['enter_ms']:>10.1f}{result['rss_mb']:>9.1f}"
+                  f"{result['cached']:>8}{result['atlas']:>7}{result['resident']:>6}{result['resident_mb']:>9.1f}"
+                  f"{result['evictions']:>9}")
+    game.close()
+
+
+if __name__ == "__main__":
+    main()
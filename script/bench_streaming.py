@@ -0,0 +1,104 @@
+"""
+Compare loading a level whole and streamed as its map gets longer.
+
+For a level (Forest by default) this writes its map repeated 1, 10 and 50
+times (src.stress_levels.stretched) as compiled files in a temporary
+directory, then, for each length, loads it whole and streamed
+(src.level_streaming) the way the game does and reports:
+ - load: reading the compiled file and setting the level up (a Simulation)
+ - memory: Python heap held by the loaded level (tracemalloc, separate load)
+ - sprites: tile and object sprites resident after loading, and the most
+   resident while the run-right-jump bot plays
+ - tick: mean update time per frame during that run
+
+    ARCADE_HEADLESS=1 python script/bench_streaming.py [--level Forest] [--lengths 1 10 50]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Project root is the parent of the script directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.level_compiler import load_level_data, read_compiled, write_compiled  # noqa: E402
+from src.level_manager import load_levels_config  # noqa: E402
+from src.profiler import sprite_count  # noqa: E402
+from src.resource_utils import get_resource_path  # noqa: E402
+from src.simulation import Simulation, run_right_jump_bot  # noqa: E402
+from src.stress_levels import stretched  # noqa: E402
+
+MODES = (("whole", False), ("streamed", True))
+
+
+def resident_sprites(sim):
+    """Sprites in the scene plus those in the live chunks of a streamed level."""
+    count = sprite_count(sim.scene)
+    if sim.level_stream:
+        count += sum(len(sprites) for live in sim.level_stream.live.values() for _, sprites in live.tiles)
+    return count
+
+
+def load(level_id, levels, path):
+    level_data = read_compiled(path, mapped=True)
+    return Simulation(level_id, levels, level_data=level_data)
+
+
+def bench(level_id, path, streaming, frames):
+    levels = load_levels_config()
+    levels[level_id] = dict(levels[level_id], streaming=streaming)
+    start = time.perf_counter()
+    sim = load(level_id, levels, path)
+    load_ms = (time.perf_counter() - start) * 1000
+    loaded = most = resident_sprites(sim)
+    ticks = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        sim.step(run_right_jump_bot(sim))
+        ticks.append(time.perf_counter() - start)
+        most = max(most, resident_sprites(sim))
+        if sim.finished:
+            break
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sim = load(level_id, levels, path)
+    memory = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return {
+        "load_ms": load_ms,
+        "memory_mb": memory / 2**20,
+        "sprites": loaded,
+        "most_sprites": most,
+        "tick_ms": statistics.mean(ticks) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--level", default="Forest", help="level id to stretch")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[1, 10, 50], help="map repeats to try")
+    parser.add_argument("--frames", type=int, default=1200, help="frames the bot plays per run")
+    args = parser.parse_args()
+
+    level = load_levels_config()[args.level]
+    base = load_level_data(get_resource_path(level["map"]))
+    print(f"{'length':<10}{'columns':>8}{'mode':>10}{'load ms':>10}{'memory MB':>11}{'sprites':>9}"
+          f"{'most':>7}{'tick ms':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for length in args.lengths:
+            path = os.path.join(directory, f"{args.level}_x{length}.lvl")
+            write_compiled(stretched(base, length) if length > 1 else base, path)
+            for mode, streaming in MODES:
+                result = bench(args.level, path, streaming, args.frames)
+                print(f"{'x' + str(length):<10}{base.width * length:>8}{mode:>10}{result['load_ms']:>10.1f}"
+                      f"{result['memory_mb']:>11.1f}{result['sprites']:>9}{result['most_sprites']:>7}"
+                      f"{result['tick_ms']:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Time the trigger volumes' per-step update against the old end-zone check.
+
+Players walk right across a level-sized map (MAP_WIDTH px, at slightly
+different speeds and heights) for a number of steps, while either:
+ - single check: the old rule, Player 1's center_x compared to end_zone_avg_x
+ - triggers: src/triggers.Triggers.update over the level's finish line plus
+   0, 99 or 999 tile-sized volumes scattered over the map
+and reports:
+ - us/step: mean time of one update for every player
+ - enters: volumes entered by a player over the run
+
+    python script/bench_triggers.py [--steps 20000] [--players 2 8]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+# Project root is the parent of the script directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.triggers import TriggerVolume, Triggers  # noqa: E402
+
+MAP_WIDTH = 12600
+MAP_HEIGHT = 840
+FINISH_X = 11794.66
+TILE = 70
+VOLUME_COUNTS = (1, 100, 1000)
+
+
+def scattered_volumes(count, seed=1):
+    """The finish line and count - 1 tile-sized goal volumes at random places."""
+    rng = random.Random(seed)
+    volumes = [TriggerVolume("level_exit", "EndZone", "", FINISH_X, float("inf"), float("-inf"), float("inf"), {})]
+    for index in range(count - 1):
+        x = rng.uniform(0, FINISH_X - TILE)
+        y = rng.uniform(0, MAP_HEIGHT - TILE)
+        volumes.append(TriggerVolume("goal", "goals", f"goal{index}", x, x + TILE, y, y + TILE, {}))
+    return volumes
+
+
+def walkers(count):
+    """Players walking right, each a bit slower and higher than the one before; moved by walk."""
+    return [SimpleNamespace(center_x=100.0, center_y=200.0 + 60 * index, speed=2.5 - 0.1 * index) for index in range(count)]
+
+
+def walk(players, step):
+    for player in players:
+        player.center_x = (100.0 + player.speed * step) % FINISH_X
+        player.center_y += 1.0 if step % 240 < 120 else -1.0
+
+
+def time_single_check(players, steps):
+    """Mean us per step of the old comparison."""
+    end_zone_avg_x = FINISH_X
+    reached = 0
+    total = 0.0
+    for step in range(steps):
+        walk(players, step)
+        start = time.perf_counter()
+        if end_zone_avg_x is not None and players:
+            if players[0].center_x >= end_zone_avg_x:
+                reached += 1
+        total += time.perf_counter() - start
+    return total / steps * 1e6, reached
+
+
+def time_triggers(players, steps, count):
+    """Mean us per step of Triggers.update, and the volumes entered."""
+    # No actions: every callback is looked up but none runs, as for a layer nobody handles
+    triggers = Triggers(scattered_volumes(count), {})
+    total = 0.0
+    for step in range(steps):
+        walk(players, step)
+        start = time.perf_counter()
+        triggers.update(None, players)
+        total += time.perf_counter() - start
+    return total / steps * 1e6, triggers.enters
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--steps", type=int, default=20000, help="steps per case")
+    parser.add_argument("--players", type=int, nargs="+", default=[2, 8], help="player counts")
+    args = parser.parse_args()
+
+    print(f"{'players':>7}  {'case':<18}{'us/step':>9}{'enters':>8}")
+    for count in args.players:
+        us, _ = time_single_check(walkers(count), args.steps)
+        print(f"{count:>7}  {'single check':<18}{us:>9.3f}{'-':>8}")
+        for volumes in VOLUME_COUNTS:
+            us, enters = time_triggers(walkers(count), args.steps, volumes)
+            print(f"{count:>7}  {f'triggers ({volumes})':<18}{us:>9.3f}{enters:>8}")
+
+
+if __name__ == "__main__":
+    main()
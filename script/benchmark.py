@@ -0,0 +1,261 @@
+"""
+Benchmark level load, update tick and draw for every configured level.
+
+For every level of type "level" in config/levels.json (and any synthetic stress
+levels asked for) this measures, in a real PelucheExpress window:
+ - load: cold (empty texture cache, atlas closed) and warm (everything cached)
+   level load, split into texture, tilemap, scene and physics phases
+ - tick: mean and p99 of PelucheExpress.on_update over a fixed input script
+ - draw: mean and p99 of PelucheExpress.on_draw, waiting for the GPU each frame
+
+Results are printed and can be saved as JSON; --compare checks them against a
+saved baseline and exits with status 1 on regressions.
+
+Examples:
+    python script/benchmark.py --output baseline.json
+    python script/benchmark.py --compare baseline.json
+    python script/benchmark.py --levels Forest --long 10 --apples 5 --players 8
+
+Set ARCADE_HEADLESS=1 on machines without a display (draw times then come from
+the software renderer, so only compare them against baselines from the same machine).
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+import arcade
+
+# Project root is the parent of the script directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from compare_physics import scripted_input  # noqa: E402
+from src import atlas  # noqa: E402
+from src.atlas import decode_texture_images, install_textures  # noqa: E402
+from src.backgrounds import ParallaxBackground, background_image_paths, background_layers  # noqa: E402
+from src.game import PelucheExpress  # noqa: E402
+from src.gameplay import build_scene, build_tile_map, setup_goals, setup_physics, setup_stream  # noqa: E402
+from src.level_compiler import load_level_data  # noqa: E402
+from src.level_streaming import stream_settings  # noqa: E402
+from src.resource_utils import get_resource_path  # noqa: E402
+from src.stress_levels import stretched, with_more_apples, with_more_players  # noqa: E402
+from src.tile_chunks import ChunkedTileLayers, static_tile_layer_names  # noqa: E402
+
+SCREEN_WIDTH = 1260
+SCREEN_HEIGHT = 840
+PHASES = ("texture", "tilemap", "scene", "physics")
+
+
+class Case:
+    """A level to benchmark: a configured level, possibly made bigger."""
+
+    def __init__(self, name, level_id, long=1, apples=1, players=0):
+        self.name = name
+        self.level_id = level_id
+        self.long = long
+        self.apples = apples
+        self.players = players
+
+    def level_data(self, level):
+        level_data = load_level_data(get_resource_path(level["map"]))
+        if self.long > 1:
+            level_data = stretched(level_data, self.long)
+        if self.apples > 1:
+            level_data = with_more_apples(level_data, self.apples)
+        if self.players:
+            level_data = with_more_players(level_data, self.players)
+        return level_data
+
+
+def _cold_start():
+    arcade.cleanup_texture_cache()
+    atlas._atlas = None
+
+
+def load_case(game, case):
+    """Load a case the way PelucheExpress._start_gameplay does, timing each phase (ms)."""
+    level = game.levels[case.level_id]
+    game.current_level_id = case.level_id
+    # As load_current_level leaves it (a streamed level starts around the view)
+    game.camera.move_to((0, 0), 1.0)
+    timings = {}
+
+    start = time.perf_counter()
+    level_data = case.level_data(level)
+    tilemap_read = time.perf_counter() - start
+
+    start = time.perf_counter()
+    atlas.load_atlas()
+    background_paths = background_image_paths(level)
+    decoded = [(name, image, None) for name, image, _ in decode_texture_images(background_paths, include_loose=True)]
+    decoded += decode_texture_images(level_data.tile_image_paths(), include_loose=True)
+    install_textures(decoded)
+    map_height = level_data.height * level_data.tile_height
+    game.map_background = ParallaxBackground(game.ctx, background_layers(level), map_height)
+    timings["texture"] = time.perf_counter() - start
+
+    # Long maps stream like they do in game (only the first chunks are built here)
+    streaming = stream_settings(level, level_data)
+    start = time.perf_counter()
+    build_tile_map(game, level_data, streamed=streaming is not None)
+    timings["tilemap"] = tilemap_read + time.perf_counter() - start
+
+    start = time.perf_counter()
+    build_scene(game, level_data)
+    setup_goals(game, level_data)
+    setup_stream(game, streaming)
+    if game.level_stream:
+        game.tile_chunks = game.level_stream.tile_chunks
+    else:
+        game.tile_chunks = ChunkedTileLayers(game.tile_map, static_tile_layer_names(level_data))
+    timings["scene"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    setup_physics(game, level_data)
+    timings["physics"] = time.perf_counter() - start
+
+    game.state = "game"
+    timings = {phase: round(seconds * 1000, 3) for phase, seconds in timings.items()}
+    timings["total"] = round(sum(timings.values()), 3)
+    return timings
+
+
+def _stats(samples):
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return {"mean_ms": round(statistics.mean(ordered) * 1000, 4), "p99_ms": round(p99 * 1000, 4)}
+
+
+def play_case(game, frames):
+    """Tick and draw the loaded case with the scripted input; returns (tick, draw) stats."""
+    ticks = []
+    draws = []
+    for frame in range(frames):
+        for key, pressed in scripted_input(frame):
+            if pressed:
+                game.on_key_press(key, 0)
+            else:
+                game.on_key_release(key, 0)
+        start = time.perf_counter()
+        game.on_update(1 / 60)
+        ticks.append(time.perf_counter() - start)
+        if game.state != "game":
+            break
+        start = time.perf_counter()
+        game.on_draw()
+        game.ctx.finish()
+        draws.append(time.perf_counter() - start)
+    return _stats(ticks), _stats(draws)
+
+
+def run_case(game, case, frames):
+    _cold_start()
+    cold = load_case(game, case)
+    warm = load_case(game, case)
+    tick, draw = play_case(game, frames)
+    game.pressed_keys.clear()
+    return {"load": {"cold": cold, "warm": warm}, "tick": tick, "draw": draw}
+
+
+def flatten(results):
+    """{"Forest/load/cold/texture": ms, ...} for every number in the results."""
+    flat = {}
+
+    def _walk(prefix, value):
+        if isinstance(value, dict):
+            for key, item in value.items():
+                _walk(f"{prefix}/{key}" if prefix else key, item)
+        else:
+            flat[prefix] = value
+    _walk("", results)
+    return flat
+
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """Metrics that got slower than the baseline by more than threshold (and min_delta_ms)."""
+    current = flatten(results)
+    regressions = []
+    for key, before in flatten(baseline["results"]).items():
+        after = current.get(key)
+        if after is None or not before:
+            continue
+        if after > before * (1 + threshold) and after - before > min_delta_ms:
+            regressions.append((key, before, after))
+    return regressions
+
+
+def print_results(results):
+    print(f"{'case':<20}{'cold load':>10}{'warm load':>10}{'tick mean':>11}{'tick p99':>10}"
+          f"{'draw mean':>11}{'draw p99':>10}   cold phases ({'/'.join(PHASES)})")
+    for name, result in results.items():
+        cold, warm = result["load"]["cold"], result["load"]["warm"]
+        phases = " / ".join(f"{cold[phase]:.1f}" for phase in PHASES)
+        print(f"{name:<20}{cold['total']:>10.1f}{warm['total']:>10.1f}"
+              f"{result['tick']['mean_ms']:>11.3f}{result['tick']['p99_ms']:>10.3f}"
+              f"{result['draw']['mean_ms']:>11.3f}{result['draw']['p99_ms']:>10.3f}   {phases}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--levels", nargs="+", help="level ids (default: every playable level)")
+    parser.add_argument("--frames", type=int, default=600, help="frames of scripted input per case")
+    parser.add_argument("--long", type=int, default=1, help="also run each level with its map repeated N times")
+    parser.add_argument("--apples", type=int, default=1, help="also run each level with N times the apples")
+    parser.add_argument("--players", type=int, default=0, help="also run each level with N extra players")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON to check the results against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown (0.2 = 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05, help="ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    game = PelucheExpress(SCREEN_WIDTH, SCREEN_HEIGHT, "benchmark")
+    game.set_visible(False)
+    playable = [level_id for level_id, level in game.levels.items() if level.get("type") == "level"]
+    cases = []
+    for level_id in args.levels or playable:
+        cases.append(Case(level_id, level_id))
+        if args.long > 1:
+            cases.append(Case(f"{level_id} long x{args.long}", level_id, long=args.long))
+        if args.apples > 1:
+            cases.append(Case(f"{level_id} apples x{args.apples}", level_id, apples=args.apples))
+        if args.players:
+            cases.append(Case(f"{level_id} +{args.players} players", level_id, players=args.players))
+
+    results = {case.name: run_case(game, case, args.frames) for case in cases}
+    game.level_loader.shutdown()
+    print_results(results)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "arcade": arcade.version.VERSION,
+            "renderer": game.ctx.info.RENDERER,
+            "platform": platform.platform(),
+            "frames": args.frames,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        for key in ("renderer", "frames"):
+            if baseline["meta"].get(key) != report["meta"][key]:
+                print(f"Note: baseline {key} was {baseline['meta'].get(key)!r}, now {report['meta'][key]!r}")
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+        for key, before, after in regressions:
+            print(f"REGRESSION {key}: {before} -> {after} ({after / before - 1:+.0%})")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Pack the tile, player and HUD images used by the game into texture atlas pages.
+
+This script:
+ - reads every level map listed in config/levels.json
+ - collects the tile images those maps actually place (tile layers and tile objects)
+ - adds the player and HUD sprites listed in src/atlas.py
+ - reads each image from the baked asset tree when it has been baked
+ - shelf-packs everything into PAGE_SIZE x PAGE_SIZE pages under assets/atlas
+ - writes assets/atlas/manifest.json with pixel rects, UVs and the precomputed
+   "Simple" hit box for each image
+
+Run it from the project root (the build scripts do this before PyInstaller):
+    python script/build_atlas.py
+"""
+import json
+import os
+import sys
+from pathlib import Path
+
+from PIL import Image
+import pytiled_parser
+from arcade.hitbox import calculate_hit_box_points_simple
+
+# Project root is the parent of the script directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.atlas import ATLAS_MANIFEST, SPRITE_RESOURCES, used_tile_images  # noqa: E402
+from src.resource_utils import get_resource_path  # noqa: E402
+
+ATLAS_DIR = os.path.dirname(os.path.join(ROOT, ATLAS_MANIFEST))
+PAGE_SIZE = 2048
+# Transparent gutter between packed images so filtering never bleeds neighbours
+PADDING = 2
+
+
+def collect_images():
+    """Return the sorted, project-relative paths of every image to pack."""
+    with open(os.path.join(ROOT, "config", "levels.json"), "r", encoding="utf-8") as f:
+        levels = json.load(f)
+    paths = set(SPRITE_RESOURCES)
+    for level in levels:
+        if level.get("type") != "level":
+            continue
+        tiled_map = pytiled_parser.parse_map(Path(ROOT, level["map"]))
+        for image in used_tile_images(tiled_map):
+            rel = os.path.relpath(os.path.normpath(os.path.abspath(image)), ROOT)
+            paths.add(rel.replace(os.sep, "/"))
+    return sorted(paths)
+
+
+def pack(images):
+    """
+    Shelf-pack (path, image) pairs, tallest first.
+
+    Returns a list of page sizes and a dict of path -> (page, x, y, w, h).
+    """
+    order = sorted(images, key=lambda item: (-item[1].height, -item[1].width, item[0]))
+    placements = {}
+    pages = []
+    x = y = shelf_height = 0
+    for path, img in order:
+        w, h = img.size
+        if w + PADDING > PAGE_SIZE or h + PADDING > PAGE_SIZE:
+            raise ValueError(f"{path} ({w}x{h}) does not fit in a {PAGE_SIZE}px atlas page")
+        if not pages:
+            pages.append([0, 0])
+        if x + w + PADDING > PAGE_SIZE:
+            x = 0
+            y += shelf_height
+            shelf_height = 0
+        if y + h + PADDING > PAGE_SIZE:
+            pages.append([0, 0])
+            x = y = shelf_height = 0
+        page = len(pages) - 1
+        placements[path] = (page, x, y, w, h)
+        pages[page][0] = max(pages[page][0], x + w)
+        pages[page][1] = max(pages[page][1], y + h)
+        x += w + PADDING
+        shelf_height = max(shelf_height, h + PADDING)
+    return pages, placements
+
+
+def main():
+    paths = collect_images()
+    images = []
+    for path in paths:
+        # The baked copy when script/bake_assets.py made one
+        img = Image.open(get_resource_path(path)).convert("RGBA")
+        images.append((path, img))
+    page_sizes, placements = pack(images)
+
+    os.makedirs(ATLAS_DIR, exist_ok=True)
+    page_images = [Image.new("RGBA", tuple(size), (0, 0, 0, 0)) for size in page_sizes]
+    for path, img in images:
+        page, x, y, _, _ = placements[path]
+        page_images[page].paste(img, (x, y))
+
+    page_files = []
+    for index, page_img in enumerate(page_images):
+        name = f"atlas_{index}.png"
+        # Light compression: pages are decoded at every launch, size matters less
+        page_img.save(os.path.join(ATLAS_DIR, name), compress_level=1)
+        page_files.append(name)
+
+    entries = {}
+    for path, img in images:
+        page, x, y, w, h = placements[path]
+        pw, ph = page_sizes[page]
+        entries[path] = {
+            "page": page,
+            "x": x, "y": y, "w": w, "h": h,
+            "uv": [x / pw, y / ph, (x + w) / pw, (y + h) / ph],
+            "hit_box": [list(point) for point in calculate_hit_box_points_simple(img)],
+        }
+    manifest = {"version": 1, "pages": page_files, "entries": entries}
+    with open(os.path.join(ROOT, ATLAS_MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+
+    print(f"Packed {len(images)} images into {len(page_files)} page(s):")
+    for name, (pw, ph) in zip(page_files, page_sizes):
+        print(f"  {name}: {pw}x{ph}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Pack every file the game reads at runtime into the asset archive (assets.pack).
+
+This script:
+ - collects config/levels.json, the character clips (config/characters/), each level's compiled map, the texture atlas
+   pages and manifest, and every image the game references (its baked copy
+   when script/bake_assets.py made one, with the bake manifest)
+ - writes them to assets.pack (src/asset_pack.py) under the paths
+   get_resource_path resolves them to
+ - reports the file count and sizes
+
+Run it from the project root after baking, packing the atlas and compiling the
+levels (the build scripts do this before PyInstaller):
+    python script/build_pack.py
+"""
+import json
+import os
+import sys
+
+# Project root is the parent of the script directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bake_assets import collect_references  # noqa: E402
+from src.asset_pack import ASSET_PACK, LOOSE_ENV, pack_key, write_pack  # noqa: E402
+from src.animation import CHARACTERS_DIR  # noqa: E402
+from src.atlas import ATLAS_MANIFEST  # noqa: E402
+from src.level_compiler import compiled_path, load_level_data  # noqa: E402
+from src.resource_utils import BAKED_MANIFEST, get_resource_path  # noqa: E402
+
+
+def collect_files():
+    """Sorted (index name, absolute path) of every file to pack."""
+    paths = [get_resource_path("config/levels.json")]
+    with open(paths[0], "r", encoding="utf-8") as f:
+        levels = json.load(f)
+    characters = get_resource_path(CHARACTERS_DIR)
+    paths.extend(os.path.join(characters, name) for name in sorted(os.listdir(characters)) if name.endswith(".json"))
+    for level in levels:
+        if level.get("type") == "level":
+            # Recompiles a stale map first
+            load_level_data(get_resource_path(level["map"]))
+            paths.append(compiled_path(get_resource_path(level["map"])))
+    atlas_manifest = get_resource_path(ATLAS_MANIFEST)
+    if os.path.exists(atlas_manifest):
+        paths.append(atlas_manifest)
+        with open(atlas_manifest, "r", encoding="utf-8") as f:
+            pages = json.load(f)["pages"]
+        paths.extend(os.path.join(os.path.dirname(atlas_manifest), page) for page in pages)
+    if os.path.exists(get_resource_path(BAKED_MANIFEST)):
+        paths.append(get_resource_path(BAKED_MANIFEST))
+    paths.extend(get_resource_path(image) for image in collect_references())
+    return sorted({pack_key(path): path for path in paths}.items())
+
+
+def main():
+    # Pack what is on disk, not a previous archive's copies
+    os.environ[LOOSE_ENV] = "1"
+    files = collect_files()
+    size = write_pack(files, os.path.join(ROOT, ASSET_PACK))
+    loose = sum(os.path.getsize(path) for _, path in files)
+    print(f"Packed {len(files)} files ({loose / 2**20:.1f} MB) into {ASSET_PACK} ({size / 2**20:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
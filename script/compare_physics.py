@@ -0,0 +1,178 @@
+"""
+Replay scripted movement through the physics engines and compare the results.
+
+For every level in config/levels.json this spawns three identical players at
+the Player1 spawn, one driven by arcade.PhysicsEnginePlatformer against the
+collidable sprite lists (the reference), one by src.grid_physics.GridPhysicsEngine
+against the tile grid and one by src.player_physics.PlayerPhysics (what the
+game runs), feeds them the same input script and reports for each engine:
+ - the largest position difference from the reference seen on any step
+ - how often can_jump() disagreed with the reference
+ - the mean update cost
+
+Exits with status 1 if an engine drifts further than TOLERANCE pixels from
+the reference.
+    ARCADE_HEADLESS=1 python script/compare_physics.py
+"""
+import json
+import os
+import sys
+import time
+
+import arcade
+
+# Project root is the parent of the script directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src import gameplay  # noqa: E402
+from src.clock import per_step, per_step_squared  # noqa: E402
+from src.grid_physics import CollisionGrid, GridPhysicsEngine  # noqa: E402
+from src.input_handler import keys_to_inputs  # noqa: E402
+from src.level_compiler import load_level_data  # noqa: E402
+from src.level_data import CompiledTileMap  # noqa: E402
+from src.player import Player  # noqa: E402
+from src.player_physics import JUMP, MOVE_LEFT, MOVE_RIGHT, LevelHulls, PlayerPhysics  # noqa: E402
+from src.resource_utils import get_resource_path  # noqa: E402
+
+FRAMES = 1800
+TOLERANCE = 2.0
+# Per step, as the game sets it up (gameplay.setup_physics)
+GRAVITY = per_step_squared(gameplay.GRAVITY)
+
+
+def scripted_input(frame):
+    """(key, pressed) events for a frame: run right, hop regularly, turn back now and then."""
+    events = []
+    phase = frame % 600
+    if phase == 0:
+        events.append((arcade.key.RIGHT, True))
+    elif phase == 480:
+        events += [(arcade.key.RIGHT, False), (arcade.key.LEFT, True)]
+    elif phase == 540:
+        events += [(arcade.key.LEFT, False), (arcade.key.RIGHT, True)]
+    if frame % 45 == 0:
+        events.append((arcade.key.UP, True))
+    elif frame % 45 == 20:
+        events.append((arcade.key.UP, False))
+    return events
+
+
+class KeyDriver:
+    """Moves a player driven by a single-sprite engine from Player1's held keys."""
+
+    def __init__(self, player, engine):
+        self.player = player
+        self.engine = engine
+        self._jump_held = False
+
+    def apply(self, keys):
+        bits = keys_to_inputs(keys, 1)[0]
+        direction = bool(bits & MOVE_RIGHT) - bool(bits & MOVE_LEFT)
+        self.player.change_x = direction * per_step(self.player.speed)
+        jump = bool(bits & JUMP)
+        # Jump on the press, not while the key is held
+        if jump and not self._jump_held and self.engine.can_jump():
+            self.player.change_y = per_step(self.player.jump_speed)
+        self._jump_held = jump
+
+
+def make_player(spawn):
+    return Player(
+        get_resource_path("assets/images/Base pack/Player/p2_stand.png"),
+        scale=0.96,
+        start_x=spawn[0],
+        start_y=spawn[1],
+    )
+
+
+def compare_level(level):
+    level_data = load_level_data(get_resource_path(level["map"]))
+    tile_map = CompiledTileMap(level_data)
+    names = level_data.collidable_layer_names
+    walls = [tile_map.sprite_lists[name] for name in names]
+    grid = CollisionGrid.from_tile_map(tile_map, names)
+    spawn = level_data.spawns["Player1"]
+
+    arcade_player = make_player(spawn)
+    grid_player = make_player(spawn)
+    batch_player = make_player(spawn)
+    arcade_engine = arcade.PhysicsEnginePlatformer(arcade_player, walls, gravity_constant=GRAVITY)
+    grid_engine = GridPhysicsEngine(grid_player, grid, gravity_constant=GRAVITY)
+    batch_engine = PlayerPhysics(LevelHulls.from_grid(grid), [batch_player], gravity_constant=GRAVITY)
+    drivers = (KeyDriver(arcade_player, arcade_engine), KeyDriver(grid_player, grid_engine))
+
+    keys = set()
+    max_delta = {"grid": 0.0, "batch": 0.0}
+    jump_mismatches = {"grid": 0, "batch": 0}
+    elapsed = {"arcade": 0.0, "grid": 0.0, "batch": 0.0}
+    for frame in range(FRAMES):
+        for key, pressed in scripted_input(frame):
+            if pressed:
+                keys.add(key)
+            else:
+                keys.discard(key)
+        for driver in drivers:
+            driver.apply(keys)
+        batch_engine.inputs[0] = keys_to_inputs(keys, 1)[0]
+
+        start = time.perf_counter()
+        arcade_engine.update()
+        elapsed["arcade"] += time.perf_counter() - start
+        start = time.perf_counter()
+        grid_engine.update()
+        elapsed["grid"] += time.perf_counter() - start
+        start = time.perf_counter()
+        batch_engine.step()
+        batch_engine.sync_sprites()
+        elapsed["batch"] += time.perf_counter() - start
+
+        for player in (arcade_player, grid_player):
+            if player.center_x < 0:
+                player.center_x = 0
+            player.update()
+        batch_player.update()
+        batch_engine.refresh_shapes()
+
+        reference_jump = arcade_engine.can_jump()
+        for name, player, can_jump in (
+            ("grid", grid_player, grid_engine.can_jump()),
+            ("batch", batch_player, batch_engine.can_jump(0)),
+        ):
+            if can_jump != reference_jump:
+                jump_mismatches[name] += 1
+            delta = max(
+                abs(arcade_player.center_x - player.center_x),
+                abs(arcade_player.center_y - player.center_y),
+            )
+            max_delta[name] = max(max_delta[name], delta)
+    return {
+        "max_delta": max_delta,
+        "jump_mismatches": jump_mismatches,
+        "us": {name: seconds / FRAMES * 1e6 for name, seconds in elapsed.items()},
+        "final": tuple(
+            (round(player.center_x, 1), round(player.center_y, 1))
+            for player in (arcade_player, grid_player, batch_player)
+        ),
+    }
+
+
+def main():
+    window = arcade.Window(64, 64, "compare_physics", visible=False)
+    with open(get_resource_path("config/levels.json"), "r", encoding="utf-8") as f:
+        levels = [level for level in json.load(f) if level.get("type") == "level"]
+    failed = False
+    for level in levels:
+        result = compare_level(level)
+        delta, mismatches, cost = result["max_delta"], result["jump_mismatches"], result["us"]
+        failed |= delta["grid"] > TOLERANCE or delta["batch"] > TOLERANCE
+        print(f"{level['id']:<14} max delta grid {delta['grid']:6.2f}px batch {delta['batch']:6.2f}px  "
+              f"can_jump mismatches {mismatches['grid']:4d} / {mismatches['batch']:4d}  "
+              f"arcade {cost['arcade']:7.1f}us  grid {cost['grid']:6.1f}us  batch {cost['batch']:6.1f}us  "
+              f"final {' vs '.join(map(str, result['final']))}")
+    window.close()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Compile every level map listed in config/levels.json ahead of time.
+
+This script:
+ - parses each level's .tmx (and its .tsx tilesets) once
+ - writes the compact compiled level to tilemaps/compiled/<map>.lvl
+ - reports the source and compiled sizes
+
+The game rebuilds stale compiled levels by itself during development; the build
+scripts run this before PyInstaller so the bundled game never parses XML:
+    python script/compile_levels.py
+"""
+import json
+import os
+import sys
+
+# Project root is the parent of the script directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.level_compiler import compile_level, compiled_path, write_compiled  # noqa: E402
+
+
+def main():
+    with open(os.path.join(ROOT, "config", "levels.json"), "r", encoding="utf-8") as f:
+        levels = json.load(f)
+    for level in levels:
+        if level.get("type") != "level":
+            continue
+        map_path = os.path.join(ROOT, level["map"])
+        out_path = compiled_path(map_path)
+        compiled = compile_level(map_path)
+        write_compiled(compiled, out_path)
+        source_size = sum(source["size"] for source in compiled.sources)
+        print(f"{level['map']} -> {os.path.relpath(out_path, ROOT)} "
+              f"({source_size // 1024} KB XML -> {os.path.getsize(out_path) // 1024} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Recolor sprite images by hue rules, with NumPy, over any set of asset folders.
+
+This script:
+ - finds the PNG/JPEG images in the given folders (recursively)
+ - applies the hue rules (src/recolor.py) to each image, in a process pool
+ - writes the results in place (after backing the originals up to
+   assets/backup/...) or into --out, keeping the folder layout
+ - records every processed file in a content-hash manifest, so files that
+   didn't change since the last run (same input, same rules) are skipped
+
+Rules are "min:max:shift" in hue degrees; the first matching rule wins. The
+default is the green-to-blue shift (80:160:80, then 150:200:48).
+    python script/recolor.py assets/images/advanced/Player/shp1 --out build/blue
+    python script/recolor.py some/folder --rule 0:30:200 --rule 330:360:230
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+# Project root is the parent of the script directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.recolor import GREEN_TO_BLUE, parse_rule, recolor_image  # noqa: E402
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+MANIFEST = os.path.join(ROOT, "assets", "backup", "recolor_manifest.json")
+BACKUP_DIR = os.path.join(ROOT, "assets", "backup")
+
+
+def _sha1(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _rel(path):
+    return os.path.relpath(os.path.abspath(path), ROOT).replace(os.sep, "/")
+
+
+def find_images(directories):
+    for directory in directories:
+        for folder, _, files in os.walk(directory):
+            for name in sorted(files):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    yield os.path.join(folder, name)
+
+
+def recolor_file(job):
+    """Worker: recolor one image. Returns (source, destination, changed)."""
+    source, destination, rules = job
+    with Image.open(source) as image:
+        image.load()
+        result = recolor_image(image, rules)
+    changed = result is not image
+    if changed or source != destination:
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        result.save(destination)
+    return source, destination, changed
+
+
+def _is_done(entry, source, destination, rules_key):
+    """True when the manifest says this exact input was already processed with these rules."""
+    if not entry or entry["rules"] != rules_key or not os.path.exists(destination):
+        return False
+    if source == destination:
+        # In place: the file on disk must still be the one we wrote
+        return _sha1(destination) == entry["output_sha1"]
+    return _sha1(source) == entry["source_sha1"] and _sha1(destination) == entry["output_sha1"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directories", nargs="+", help="asset folders to recolor")
+    parser.add_argument("--rule", action="append", type=parse_rule, help="min:max:shift (repeatable)")
+    parser.add_argument("--out", help="write results under this folder instead of in place")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--manifest", default=MANIFEST)
+    parser.add_argument("--force", action="store_true", help="ignore the manifest")
+    args = parser.parse_args()
+
+    rules = tuple(args.rule) if args.rule else GREEN_TO_BLUE
+    rules_key = [list(rule) for rule in rules]
+    manifest = {}
+    if os.path.exists(args.manifest) and not args.force:
+        with open(args.manifest, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+    jobs = []
+    skipped = 0
+    for source in find_images(args.directories):
+        if args.out:
+            destination = os.path.join(args.out, _rel(source))
+        else:
+            destination = source
+        if _is_done(manifest.get(_rel(destination)), source, destination, rules_key):
+            skipped += 1
+            continue
+        if destination == source:
+            backup = os.path.join(BACKUP_DIR, _rel(source))
+            if not os.path.exists(backup):
+                os.makedirs(os.path.dirname(backup), exist_ok=True)
+                shutil.copy2(source, backup)
+        jobs.append((source, destination, rules))
+
+    modified = []
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for source, destination, changed in pool.map(recolor_file, jobs):
+            manifest[_rel(destination)] = {
+                "source": _rel(source),
+                "rules": rules_key,
+                "source_sha1": _sha1(source) if source != destination else None,
+                "output_sha1": _sha1(destination),
+            }
+            if changed:
+                modified.append(destination)
+
+    os.makedirs(os.path.dirname(args.manifest), exist_ok=True)
+    with open(args.manifest, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    print(f"{len(jobs)} processed, {len(modified)} modified, {skipped} unchanged since the last run")
+    for path in modified:
+        print(" Modified:", path)
+
+
+if __name__ == "__main__":
+    main()
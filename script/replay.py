@@ -0,0 +1,60 @@
+"""
+Replay recorded input logs, headless at full speed or in the game window.
+
+An input log (src/input_recording.py) holds the input bits of every step of a
+level played, recorded by the game (python main.py --record DIR) or by bots
+(python script/simulate.py --record DIR). Headless, each log's level is played
+again step for step without a window as fast as the CPU allows, and this
+reports:
+ - steps: steps replayed, of the steps recorded
+ - match: whether the players ended exactly where they did when recorded
+ - steps/s: simulation speed, and the mean ms per frame of each update phase,
+   so real play traces can serve as performance workloads
+
+    python script/replay.py logs/001-Castle.pinput [more logs...]
+    python script/replay.py --windowed logs/001-Castle.pinput
+
+--windowed opens the game on the log's level and plays it at normal speed
+(the same as python main.py --replay LOG). Exits with status 1 if any
+headless replay doesn't match its recording.
+"""
+import argparse
+import os
+import sys
+
+# Project root is the parent of the script directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.input_recording import InputLog  # noqa: E402
+from src.simulation import replay_level  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("logs", nargs="+", help="input logs (.pinput)")
+    parser.add_argument("--windowed", action="store_true", help="play the first log in the game window")
+    args = parser.parse_args()
+
+    if args.windowed:
+        import main as game_main
+        sys.argv = [sys.argv[0], "--replay", args.logs[0]]
+        game_main.main()
+        return
+
+    print(f"{'log':<34}{'level':<14}{'steps':>13}{'match':>7}{'steps/s':>9}{'physics':>9}{'player':>8}{'apples':>8}")
+    mismatches = 0
+    for path in args.logs:
+        result = replay_level(InputLog.load(path))
+        mismatches += not result["matches"]
+        phases = result["phases"]
+        steps = f"{result['steps']}/{result['recorded_steps']}"
+        print(f"{os.path.basename(path):<34}{result['level']:<14}{steps:>13}{str(result['matches']):>7}"
+              f"{result['steps_per_second']:>9}{phases.get('update/physics', 0.0):>9.3f}"
+              f"{phases.get('update/player', 0.0):>8.3f}{phases.get('update/apples', 0.0):>8.3f}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
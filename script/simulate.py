@@ -0,0 +1,110 @@
+"""
+Play levels headless with bots, spread over a process pool.
+
+For every (level, bot, run) combination this plays the level without a window
+as fast as possible (src/simulation.py) and reports whether the bot reached the
+end zone, after how many frames, and how many apples it picked up.
+
+Examples:
+    python script/simulate.py
+    python script/simulate.py --levels Forest Castle --bots run-right random-jump --runs 8
+    python script/simulate.py --json results.json
+    python script/simulate.py --levels Forest --script forest_run.json
+    python script/simulate.py --levels Castle --bots random-jump --runs 4 --record logs/
+    python script/simulate.py --scripts script/runs --require-finish
+
+A key script is a JSON list of [frame, [key names]] entries, each meaning
+"from this frame on, hold these keys", e.g. [[0, ["RIGHT"]], [40, ["RIGHT", "UP"]]].
+--scripts plays DIR/<level>.json on each level; script/runs holds a script
+that finishes every level, which the bots don't (they get stuck on the way),
+so `--scripts script/runs --require-finish` is the check that levels can be
+completed. A physics or map change that breaks one needs the script redone.
+
+Exits with status 1 if any run failed to finish when --require-finish is given.
+No display or GL context is needed.
+"""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+# Project root is the parent of the script directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.level_manager import load_levels_config  # noqa: E402
+from src.input_recording import INPUT_LOG_EXT  # noqa: E402
+from src.simulation import BOTS, MAX_FRAMES, run_level  # noqa: E402
+
+
+def _run(job):
+    level_id, bot, seed, max_frames, script, record = job
+    return run_level(level_id, bot=bot, seed=seed, max_frames=max_frames, script=script, record=record)
+
+
+def _record_path(record_dir, level_id, bot, seed):
+    if not record_dir:
+        return None
+    return os.path.join(record_dir, f"{level_id}-{bot or 'script'}-{seed}{INPUT_LOG_EXT}")
+
+
+def _load_script(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    levels = load_levels_config()
+    playable = [level_id for level_id, level in levels.items() if level.get("type") == "level"]
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--levels", nargs="+", default=playable, choices=playable)
+    parser.add_argument("--bots", nargs="+", default=["run-right-jump"], choices=sorted(BOTS))
+    parser.add_argument("--runs", type=int, default=1, help="runs per level and bot (seeds 0..runs-1)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--max-frames", type=int, default=MAX_FRAMES)
+    parser.add_argument("--script", help="JSON key script to play instead of the bots")
+    parser.add_argument("--scripts", metavar="DIR", help="play DIR/<level>.json on each level instead of the bots")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--record", metavar="DIR", help="save each run's input log to DIR (script/replay.py plays them)")
+    parser.add_argument("--require-finish", action="store_true", help="exit 1 if any run didn't finish")
+    args = parser.parse_args()
+
+    if args.script or args.scripts:
+        paths = {
+            level_id: args.script or os.path.join(args.scripts, f"{level_id}.json")
+            for level_id in args.levels
+        }
+        missing = [path for path in paths.values() if not os.path.isfile(path)]
+        if missing:
+            parser.error(f"no key script {', '.join(missing)}")
+        jobs = [
+            (level_id, None, 0, args.max_frames, _load_script(path), _record_path(args.record, level_id, None, 0))
+            for level_id, path in paths.items()
+        ]
+    else:
+        jobs = [
+            (level_id, bot, seed, args.max_frames, None, _record_path(args.record, level_id, bot, seed))
+            for level_id in args.levels
+            for bot in args.bots
+            for seed in range(args.runs)
+        ]
+    if args.record:
+        os.makedirs(args.record, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        results = list(pool.map(_run, jobs))
+
+    print(f"{'level':<14}{'bot':<16}{'seed':>5}{'finished':>10}{'frames':>8}{'apples':>8}{'sim fps':>10}")
+    for result in results:
+        print(f"{result['level']:<14}{result['bot']:<16}{result['seed']:>5}"
+              f"{str(result['finished']):>10}{result['frames']:>8}"
+              f"{result['apples']:>5}/{result['total_apples']:<2}{result['frames_per_second']:>10}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.require_finish and not all(result["finished"] for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
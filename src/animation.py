@@ -0,0 +1,144 @@
+# Animation clips for Peluche Express
+#
+# A character's animation is data: config/characters/<name>.json names its
+# frame images and its clips. A clip is a list of frames played at "fps" frames
+# per second (a still clip has none), with facing-left variants when "flip" is
+# set. Clips of the same "stance" (default: the clip's own name) share one hit
+# box: it is taken from the frame shown when the stance is entered and kept
+# while the stance lasts, so walking doesn't reshape the physics body every
+# frame. Every clip plays from one frame clock per sprite, so a walk cycle
+# resumes where it left off after a jump; a clip with "rewind" resets it.
+#
+# A color variant (e.g. Player 2's "blue") swaps in its own images for some
+# frames, listed under "variants" in the same file.
+#
+# load_character builds a character once per color variant: its textures come
+# from the texture registry (GLOBAL, they live as long as the window) and each
+# clip's scaled hit boxes are made once per sprite scale, all shared by every
+# sprite playing it. An Animator holds a sprite's place in its clips and only
+# touches the sprite when the texture shown or the stance changes.
+from src.asset_pack import load_json
+from src.resource_utils import get_resource_path
+from src.textures import GLOBAL, texture_registry
+
+CHARACTERS_DIR = "config/characters"
+# Frame timers add up fixed steps; a frame ends when its time is reached within rounding
+FRAME_EPSILON = 1e-9
+
+_characters = {}
+
+
+def character_path(name):
+    return get_resource_path(f"{CHARACTERS_DIR}/{name}.json")
+
+
+def variant_frames(definition, variant=None):
+    """Frame name -> image path of a character definition, with a color variant's images swapped in."""
+    frames = dict(definition["frames"])
+    if variant is not None:
+        frames.update(definition["variants"][variant])
+    return frames
+
+
+def character_textures(name, variant=None):
+    """(path, flipped_horizontally) of every texture a character uses, for texture_registry.warm_up."""
+    definition = load_json(character_path(name))
+    frames = variant_frames(definition, variant)
+    flips = {}
+    for clip in definition["clips"].values():
+        for frame in clip["frames"]:
+            flips.setdefault(frame, {False})
+            if clip.get("flip"):
+                flips[frame].add(True)
+    return [
+        (get_resource_path(frames[frame]), flipped)
+        for frame, flipped_set in flips.items()
+        for flipped in sorted(flipped_set)
+    ]
+
+
+def load_character(name, variant=None):
+    """The shared Character for config/characters/<name>.json, in one of its color variants."""
+    key = (name, variant)
+    character = _characters.get(key)
+    if character is None:
+        character = _characters[key] = Character(load_json(character_path(name)), variant)
+    return character
+
+
+class Clip:
+    """One clip's textures (facing right, then left) and hit boxes."""
+
+    def __init__(self, name, definition, frames):
+        self.name = name
+        fps = definition.get("fps")
+        self.frame_time = 1 / fps if fps else 0.0
+        self.rewind = bool(definition.get("rewind"))
+        self.flip = bool(definition.get("flip"))
+        self.stance = definition.get("stance", name)
+        paths = [get_resource_path(frames[frame]) for frame in definition["frames"]]
+        self.length = len(paths)
+        right = tuple(texture_registry.get(path, owner=GLOBAL) for path in paths)
+        left = tuple(
+            texture_registry.get(path, flipped_horizontally=True, owner=GLOBAL) for path in paths
+        ) if self.flip else right
+        # Indexed [facing left][frame]
+        self.textures = (right, left)
+        self._hit_boxes = {}
+
+    def hit_boxes(self, scale):
+        """The frames' hit boxes scaled to a sprite scale, indexed like textures."""
+        hit_boxes = self._hit_boxes.get(scale)
+        if hit_boxes is None:
+            hit_boxes = self._hit_boxes[scale] = tuple(
+                tuple(
+                    tuple((x * scale, y * scale) for x, y in texture.hit_box_points)
+                    if texture.hit_box_points else None
+                    for texture in textures
+                )
+                for textures in self.textures
+            )
+        return hit_boxes
+
+
+class Character:
+    """A character's clips, by name."""
+
+    def __init__(self, definition, variant=None):
+        frames = variant_frames(definition, variant)
+        self.clips = {
+            name: Clip(name, clip, frames)
+            for name, clip in definition["clips"].items()
+        }
+
+
+class Animator:
+    """Where one sprite is in its character's clips."""
+
+    def __init__(self, character):
+        self.character = character
+        self.frame = 0
+        self.timer = 0.0
+        self.stance = None
+
+    def play(self, sprite, name, facing_left, delta_time):
+        """Show a clip's current frame on the sprite after delta_time seconds of it."""
+        clip = self.character.clips[name]
+        if clip.rewind:
+            self.frame = 0
+            self.timer = 0.0
+        elif clip.frame_time:
+            self.timer += delta_time
+            if self.timer >= clip.frame_time - FRAME_EPSILON:
+                self.timer = 0.0
+                self.frame = (self.frame + 1) % clip.length
+        index = self.frame % clip.length
+        flipped = facing_left and clip.flip
+        texture = clip.textures[flipped][index]
+        if texture is not sprite.texture:
+            sprite.texture = texture
+        if clip.stance != self.stance:
+            self.stance = clip.stance
+            hit_box = clip.hit_boxes(sprite.scale)[flipped][index]
+            if hit_box is not None:
+                sprite.set_hit_box(hit_box)
@@ -0,0 +1,216 @@
+# Packed asset archive for Peluche Express
+#
+# script/build_pack.py writes every file the game reads at runtime (levels.json,
+# compiled levels, baked images, atlas pages and manifests) into one archive,
+# assets.pack: a header, a JSON index of project-relative path -> (offset, size)
+# and the files themselves, each starting on an ALIGNMENT boundary. The archive
+# is memory-mapped once at startup and resources are handed out as memoryviews
+# into the mapping, so reading an asset is a slice instead of a file open (and
+# a one-file build extracts one file instead of hundreds).
+#
+# Paths are the ones get_resource_path returns (or project-relative). Anything
+# not in the archive, or everything when there is no archive or LOOSE_ENV is
+# set, comes from the loose files, so development works without building one.
+# In a checkout, files edited since the archive was built are read loose too.
+import io
+import json
+import mmap
+import os
+import struct
+import sys
+
+from src.resource_utils import resource_root
+
+ASSET_PACK = "assets.pack"
+# Set (to anything) to ignore the archive and read loose files
+LOOSE_ENV = "PELUCHE_LOOSE_ASSETS"
+
+MAGIC = b"PEPK"
+VERSION = 1
+# magic, version, index length
+HEADER = struct.Struct("<4sII")
+# Blobs start on this boundary so views can be cast to wider types
+ALIGNMENT = 16
+
+_pack = None
+
+
+class AssetPack:
+    """An opened archive: the memory map and its index of path -> (offset, size)."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, index_len = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not an asset pack of the current version")
+        start = HEADER.size
+        index = json.loads(self._map[start:start + index_len].decode("utf-8"))
+        self.path = path
+        self.entries = {name: (entry["offset"], entry["size"]) for name, entry in index.items()}
+        if not getattr(sys, "frozen", False):
+            root = resource_root()
+            self.entries = {
+                name: self.entries[name] for name, entry in index.items()
+                if _unchanged(os.path.join(root, name), entry["mtime_ns"], entry["size"])
+            }
+        self._view = memoryview(self._map)
+
+    def view(self, name):
+        """A read-only memoryview of a packed file, or None if it isn't packed."""
+        entry = self.entries.get(name)
+        if entry is None:
+            return None
+        offset, size = entry
+        return self._view[offset:offset + size]
+
+
+def _unchanged(path, mtime_ns, size):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return True
+    return stat.st_size == size and stat.st_mtime_ns == mtime_ns
+
+
+def _pack_paths():
+    if getattr(sys, "frozen", False):
+        # Next to the executable first: a one-file build needn't carry (and extract) it
+        yield os.path.join(os.path.dirname(sys.executable), ASSET_PACK)
+    yield os.path.join(resource_root(), ASSET_PACK)
+
+
+def load_pack():
+    """Map the archive once and return it, or None when there is none (or LOOSE_ENV is set)."""
+    global _pack
+    if _pack is not None:
+        return _pack or None
+    _pack = False
+    if os.environ.get(LOOSE_ENV):
+        return None
+    for path in _pack_paths():
+        if os.path.exists(path):
+            _pack = AssetPack(path)
+            break
+    return _pack or None
+
+
+def pack_key(path):
+    """The index name of a path: project-relative, forward slashes."""
+    path = os.path.normpath(str(path))
+    if os.path.isabs(path):
+        path = os.path.relpath(path, resource_root())
+    return path.replace(os.sep, "/")
+
+
+def packed_view(path):
+    """A memoryview of a resource inside the archive, or None if it must be read loose."""
+    pack = load_pack()
+    if pack is None:
+        return None
+    return pack.view(pack_key(path))
+
+
+def resource_exists(path):
+    if packed_view(path) is not None:
+        return True
+    return os.path.exists(path)
+
+
+def resource_bytes(path):
+    """
+    A resource's contents: a view into the archive (no copy), or the loose
+    file's bytes. Either supports the buffer protocol; call bytes() only for
+    APIs that need a bytes object.
+    """
+    view = packed_view(path)
+    if view is not None:
+        return view
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def open_resource(path):
+    """A binary file object reading a resource from the archive or from disk (for PIL, json...)."""
+    view = packed_view(path)
+    if view is not None:
+        return io.BufferedReader(PackedFile(view))
+    return open(path, "rb")
+
+
+def load_json(path):
+    with open_resource(path) as f:
+        return json.load(f)
+
+
+class PackedFile(io.RawIOBase):
+    """Read-only, seekable file over a memoryview, copying only what is read."""
+
+    def __init__(self, view):
+        super().__init__()
+        self._view = view
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._view[self._position:self._position + len(buffer)]
+        count = len(data)
+        buffer[:count] = data
+        self._position += count
+        return count
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._position = max(0, offset)
+        return self._position
+
+    def tell(self):
+        return self._position
+
+
+def write_pack(files, path):
+    """
+    Write an archive of (name, source path) pairs: name is the project-relative
+    index name, source the file to copy in. Returns the archive's size.
+    """
+    files = list(files)
+    index = {}
+    for name, source in files:
+        stat = os.stat(source)
+        index[name] = {"offset": 0, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def aligned(offset):
+        return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+    # Offsets depend on the index length, which depends on the offsets' digits:
+    # lay out with a placeholder index until the length settles
+    index_len = -1
+    while True:
+        offset = aligned(HEADER.size + max(index_len, 0))
+        for name, _ in files:
+            index[name]["offset"] = offset
+            offset = aligned(offset + index[name]["size"])
+        index_bytes = json.dumps(index, separators=(",", ":"), sort_keys=True).encode("utf-8")
+        if len(index_bytes) == index_len:
+            break
+        index_len = len(index_bytes)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, index_len))
+        f.write(index_bytes)
+        for name, source in files:
+            f.write(b"\0" * (index[name]["offset"] - f.tell()))
+            with open(source, "rb") as blob:
+                f.write(blob.read())
+        size = f.tell()
+    os.replace(tmp_path, path)
+    return size
@@ -0,0 +1,249 @@
+# Texture atlas support for Peluche Express
+#
+# script/build_atlas.py packs every tile image referenced by the levels, plus the
+# player and HUD sprites, into a few atlas pages described by a UV manifest.
+# At runtime the pages are opened once and each packed image is handed to
+# arcade's texture cache under the exact name arcade would otherwise read from
+# disk, so arcade.load_texture and the tilemap loader never touch the loose PNGs.
+#
+# Images are decoded in batches on a pool of DECODE_WORKERS threads (PIL lets
+# go of the GIL while it inflates a PNG) and installed into arcade's cache in
+# one pass on the main thread, the only one allowed to touch arcade and OpenGL.
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+from pathlib import Path
+
+import arcade
+import PIL.Image
+import pytiled_parser
+from arcade.hitbox import calculate_hit_box_points_simple
+
+from src.asset_pack import load_json, open_resource, resource_exists
+from src.resource_utils import BAKED_DIR, get_resource_path
+
+ATLAS_MANIFEST = "assets/atlas/manifest.json"
+
+# Sprites loaded by resource path outside of the tilemaps
+SPRITE_RESOURCES = [
+    "assets/images/Base pack/Player/p1_stand.png",
+    "assets/images/Base pack/Player/p2_stand.png",
+    "assets/images/advanced/Player/shp1/face.png",
+    "assets/images/advanced/Player/shp1/glide.png",
+    "assets/images/advanced/Player/shp1/side.png",
+    "assets/images/advanced/Player/shp2/face.png",
+    "assets/images/advanced/Player/shp2/glide.png",
+    "assets/images/advanced/Player/shp2/side.png",
+    "assets/images/Candy expansion/Tiles/cherry.png",
+]
+
+# Bits Tiled stores in the top of a gid to mark flipped tiles
+_GID_FLAGS = 0xE0000000
+
+# Threads decoding a batch of images (1: decode on the calling thread)
+DECODE_WORKERS = min(8, os.cpu_count() or 1)
+
+_atlas = None
+_decode_pool = None
+
+
+def _resource_key(path):
+    """Normalize an absolute path (baked or original) to the project-relative form used in the manifest."""
+    root = get_resource_path("")
+    key = os.path.relpath(os.path.normpath(str(path)), root).replace(os.sep, "/")
+    return key[len(BAKED_DIR) + 1:] if key.startswith(BAKED_DIR + "/") else key
+
+
+def load_atlas():
+    """Open the atlas pages once and return the atlas, or None if it hasn't been built."""
+    global _atlas
+    if _atlas is not None:
+        return _atlas or None
+    manifest_path = get_resource_path(ATLAS_MANIFEST)
+    if not resource_exists(manifest_path):
+        _atlas = {}
+        return None
+    manifest = load_json(manifest_path)
+    manifest_dir = os.path.dirname(manifest_path)
+    pages = []
+    for page_file in manifest["pages"]:
+        with open_resource(os.path.join(manifest_dir, page_file)) as f:
+            page = PIL.Image.open(f).convert("RGBA")
+        pages.append(page)
+    _atlas = {"pages": pages, "entries": manifest["entries"]}
+    return _atlas
+
+
+def get_atlas_entry(path):
+    """Return (image, hit_box) for an absolute asset path, or None if it isn't in the atlas."""
+    atlas = load_atlas()
+    if not atlas:
+        return None
+    entry = atlas["entries"].get(_resource_key(path))
+    if entry is None:
+        return None
+    x, y, w, h = entry["x"], entry["y"], entry["w"], entry["h"]
+    image = atlas["pages"][entry["page"]].crop((x, y, x + w, y + h))
+    hit_box = entry.get("hit_box")
+    return image, tuple(tuple(point) for point in hit_box) if hit_box else None
+
+
+def _cache_name(name, width, height, flipped_horizontally=False):
+    """The key arcade.load_texture stores a (possibly cropped) texture under."""
+    return f"{name}-0-0-{width}-{height}-{flipped_horizontally}-False-False-Simple "
+
+
+def _decode_pool_executor():
+    global _decode_pool
+    if _decode_pool is None:
+        _decode_pool = ThreadPoolExecutor(max_workers=DECODE_WORKERS, thread_name_prefix="texture-decode")
+    return _decode_pool
+
+
+def _decode_texture_image(name, include_loose):
+    """(name, image, hit_box) for one cache name, or None if it can't be found."""
+    found = get_atlas_entry(name)
+    if found is None:
+        if not include_loose or not resource_exists(name):
+            return None
+        with open_resource(name) as f:
+            image = PIL.Image.open(f).convert("RGBA")
+        found = (image, calculate_hit_box_points_simple(image))
+    return (name, *found)
+
+
+def _decode_all(names, include_loose, workers):
+    """_decode_texture_image of every name, in order, decoded on up to `workers` threads."""
+    if workers <= 1 or len(names) <= 1:
+        return (_decode_texture_image(name, include_loose) for name in names)
+    if workers == DECODE_WORKERS:
+        return _decode_pool_executor().map(_decode_texture_image, names, repeat(include_loose))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_decode_texture_image, names, repeat(include_loose)))
+
+
+def decode_texture_images(cache_names, include_loose=False, workers=None, progress=None):
+    """
+    Decode the images behind arcade texture cache names without touching arcade.
+
+    Images come from the atlas when packed; with include_loose, anything else is
+    read from the asset archive or disk and its hit box computed here. The
+    images are decoded in parallel on up to `workers` threads (default
+    DECODE_WORKERS); progress, if given, is called with the fraction done.
+    Safe to call from a worker thread; hand the result to install_textures on
+    the main thread.
+    Returns a list of (name, image, hit_box) tuples, in cache_names order.
+    """
+    cache = arcade.load_texture.texture_cache
+    names = list(dict.fromkeys(str(name) for name in cache_names if str(name) not in cache))
+    if not names:
+        return []
+    # Opened once here rather than raced for by the decoding threads
+    load_atlas()
+    decoded = []
+    results = _decode_all(names, include_loose, DECODE_WORKERS if workers is None else workers)
+    for index, found in enumerate(results):
+        if found is not None:
+            decoded.append(found)
+        if progress is not None:
+            progress((index + 1) / len(names))
+    return decoded
+
+
+def install_textures(decoded):
+    """
+    Put decoded images into arcade's load_texture cache. Call from the main thread.
+
+    Besides the whole-file entry, the plain and horizontally flipped full-frame
+    textures are seeded with their hit box, so neither the PNG decode nor the
+    per-pixel hit box scan happens when sprites are created.
+    Returns the number of images installed.
+    """
+    cache = arcade.load_texture.texture_cache
+    installed = 0
+    for name, image, hit_box in decoded:
+        if name in cache:
+            continue
+        cache[name] = arcade.Texture(name, image=image)
+        if hit_box:
+            flipped = image.transpose(PIL.Image.FLIP_LEFT_RIGHT)
+            flipped_hit_box = tuple((-x, y) for x, y in reversed(hit_box))
+            # Sprites pass either no crop or the tile's full size
+            for width, height in ((0, 0), image.size):
+                texture = arcade.Texture(_cache_name(name, width, height), image=image)
+                texture._hit_box_points = hit_box
+                cache[texture.name] = texture
+                texture = arcade.Texture(_cache_name(name, width, height, True), image=flipped)
+                texture._hit_box_points = flipped_hit_box
+                cache[texture.name] = texture
+        installed += 1
+    return installed
+
+
+def seed_texture_cache(cache_names):
+    """
+    Put atlas-backed textures into arcade's load_texture cache.
+
+    Each name must be the exact file name arcade will later pass to load_texture;
+    names that are already cached or not in the atlas are left alone.
+    Returns the number of images seeded.
+    """
+    return install_textures(decode_texture_images(cache_names))
+
+
+def _tile_image_source(tile, tileset, map_directory):
+    """Mirror arcade's tile image lookup so our cache names match its own."""
+    image_file = tile.image or tileset.image
+    if not image_file:
+        return None
+    if os.path.exists(image_file):
+        return image_file
+    return Path(map_directory, image_file)
+
+
+def used_tile_gids(tiled_map):
+    """Return the set of gids placed on any tile or object layer of the map."""
+    gids = set()
+
+    def _walk(layers):
+        for layer in layers:
+            if isinstance(layer, pytiled_parser.TileLayer) and layer.data:
+                for row in layer.data:
+                    gids.update(gid & ~_GID_FLAGS for gid in row if gid)
+            elif isinstance(layer, pytiled_parser.ObjectLayer):
+                for obj in layer.tiled_objects:
+                    if isinstance(obj, pytiled_parser.tiled_object.Tile):
+                        gids.add(obj.gid & ~_GID_FLAGS)
+            elif isinstance(layer, pytiled_parser.LayerGroup):
+                _walk(layer.layers)
+
+    _walk(tiled_map.layers)
+    return gids
+
+
+def used_tile_images(tiled_map):
+    """Return the image path (as arcade will resolve it) for every tile the map places."""
+    map_directory = os.path.dirname(tiled_map.map_file)
+    firstgids = sorted(tiled_map.tilesets)
+    images = []
+    for gid in sorted(used_tile_gids(tiled_map)):
+        firstgid = max((f for f in firstgids if f <= gid), default=None)
+        if firstgid is None:
+            continue
+        tileset = tiled_map.tilesets[firstgid]
+        tile = tileset.tiles.get(gid - firstgid) if tileset.tiles else None
+        if tile is None:
+            if tileset.image is not None:
+                images.append(_tile_image_source(pytiled_parser.Tile(id=0), tileset, map_directory))
+            continue
+        source = _tile_image_source(tile, tileset, map_directory)
+        if source is not None:
+            images.append(source)
+    return images
+
+
+def preload_sprite_textures(resource_paths=SPRITE_RESOURCES):
+    """Seed the texture cache for sprites loaded by resource path (players, HUD icons)."""
+    if not load_atlas():
+        return 0
+    return seed_texture_cache(get_resource_path(path) for path in resource_paths)
@@ -0,0 +1,127 @@
+# Backgrounds for Peluche Express
+#
+# Repeating (and parallax) backgrounds drawn as one screen-covering quad per
+# layer. The layer image is uploaded once as its own GL texture with repeat
+# wrapping, and the fragment shader maps each screen pixel to the world
+# position the camera sees (scaled by the layer's scroll factor), so the
+# texture tiles itself: drawing costs one quad per layer, however long the map.
+#
+# Levels declare their layers in config/levels.json:
+#     "background_layers": [
+#         {"image": "assets/.../far.png", "scroll": 0.3},
+#         {"image": "assets/.../near.png", "scroll": 0.7}
+#     ]
+# listed back to front. scroll 1.0 moves with the tiles, 0 stays still.
+# Without background_layers the level's "background" is one layer at scroll 1.
+import weakref
+from collections import namedtuple
+
+from arcade.gl import geometry
+from PIL import Image
+
+from src.resource_utils import get_resource_path
+from src.textures import texture_registry
+
+BackgroundLayer = namedtuple("BackgroundLayer", ["texture", "scroll"])
+
+VERTEX_SHADER = """
+#version 330
+in vec2 in_vert;
+in vec2 in_uv;
+out vec2 v_uv;
+void main() {
+    gl_Position = vec4(in_vert, 0.0, 1.0);
+    v_uv = in_uv;
+}
+"""
+
+FRAGMENT_SHADER = """
+#version 330
+uniform sampler2D layer_texture;
+// World position of the bottom left of the view (already scaled by the layer's scroll)
+uniform vec2 origin;
+uniform vec2 view_size;
+// Size of one repetition of the image in world units
+uniform vec2 tile_size;
+in vec2 v_uv;
+out vec4 f_color;
+void main() {
+    vec2 uv = (origin + v_uv * view_size) / tile_size;
+    // Repeats horizontally only, like a row of images standing on y = 0
+    if (uv.y < 0.0 || uv.y > 1.0) {
+        discard;
+    }
+    f_color = texture(layer_texture, uv);
+}
+"""
+
+# GL textures by arcade texture name, shared while any background uses them
+_gl_textures = weakref.WeakValueDictionary()
+_programs = weakref.WeakKeyDictionary()
+
+
+def _program(ctx):
+    program = _programs.get(ctx)
+    if program is None:
+        program = (ctx.program(vertex_shader=VERTEX_SHADER, fragment_shader=FRAGMENT_SHADER), geometry.quad_2d_fs())
+        _programs[ctx] = program
+    return program
+
+
+def _gl_texture(ctx, texture):
+    gl_texture = _gl_textures.get(texture.name)
+    if gl_texture is None:
+        # GL rows go bottom to top
+        image = texture.image.convert("RGBA").transpose(Image.FLIP_TOP_BOTTOM)
+        gl_texture = ctx.texture(
+            image.size,
+            components=4,
+            data=image.tobytes(),
+            wrap_x=ctx.REPEAT,
+            wrap_y=ctx.CLAMP_TO_EDGE,
+        )
+        _gl_textures[texture.name] = gl_texture
+    return gl_texture
+
+
+def _declared_layers(level):
+    return level.get("background_layers") or [{"image": level["background"], "scroll": 1.0}]
+
+
+def background_image_paths(level):
+    """Resolved image paths of every background layer of a levels.json entry."""
+    return [get_resource_path(layer["image"]) for layer in _declared_layers(level)]
+
+
+def background_layers(level, owner=None):
+    """BackgroundLayers of a levels.json entry, back to front, textures from the registry."""
+    return [
+        BackgroundLayer(
+            texture_registry.get(get_resource_path(layer["image"]), owner=owner),
+            float(layer.get("scroll", 1.0)),
+        )
+        for layer in _declared_layers(level)
+    ]
+
+
+class ParallaxBackground:
+    """Layers repeated side by side, each scaled to `height` and scrolled by its own factor."""
+
+    def __init__(self, ctx, layers, height):
+        self.ctx = ctx
+        self.height = height
+        self.program, self.quad = _program(ctx)
+        self.layers = []
+        for layer in layers:
+            tile_width = layer.texture.width * height / layer.texture.height
+            self.layers.append((_gl_texture(ctx, layer.texture), layer.scroll, (tile_width, height)))
+
+    def draw(self, left, bottom, width, height):
+        """Draw the layers as seen by a view whose bottom left is at (left, bottom) in world units."""
+        program = self.program
+        program["view_size"] = width, height
+        for gl_texture, scroll, tile_size in self.layers:
+            program["origin"] = left * scroll, bottom * scroll
+            program["tile_size"] = tile_size
+            gl_texture.use(0)
+            self.quad.render(program)
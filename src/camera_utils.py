@@ -1,14 +1,19 @@
 # Camera utility functions for Peluche Express
+from src.clock import STEP
 
-def update_camera(game):
-    """Camera always follows Player 1."""
+# Share of the way to its target the camera covers in 1/60 s
+CAMERA_FOLLOW = 0.2
+
+def update_camera(game, delta_time=STEP):
+    """Camera always follows Player 1, easing toward it at the same pace at any step rate."""
     if not game.players:
         return
     player = game.players[0]
     left_deadzone = game.camera.viewport_width * 0.4
     right_deadzone = game.camera.viewport_width * 0.6
-    cam_left = game.camera.position[0]
-    target_x = game.camera.position[0]
+    # goal_position is where the simulation has the camera; position lags until it is drawn
+    cam_left = game.camera.goal_position[0]
+    target_x = cam_left
     if player.center_x < cam_left + left_deadzone:
         target_x = player.center_x - left_deadzone
     elif player.center_x > cam_left + right_deadzone:
@@ -16,4 +21,6 @@ def update_camera(game):
     if game.tile_map:
         map_width = game.tile_map.width * game.tile_map.tile_width
         target_x = max(0, min(target_x, map_width - game.camera.viewport_width))
-    game.camera.move_to((target_x, game.camera.position[1]), 0.2)
+    follow = 1 - (1 - CAMERA_FOLLOW) ** (delta_time * 60)
+    camera_x = cam_left + (target_x - cam_left) * follow
+    game.camera.move_to((camera_x, game.camera.goal_position[1]), 1.0)
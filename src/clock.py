@@ -0,0 +1,108 @@
+# Simulation clock for Peluche Express
+#
+# Game logic advances in fixed steps of STEP seconds (SIM_RATE per second),
+# whatever the display refresh rate: each rendered frame runs as many steps as
+# the elapsed time covers and carries the rest over. Catch-up is capped at
+# MAX_STEPS per frame so one slow frame can't make the next one slower still;
+# past that the game slows down instead. Drawing happens between steps, so
+# sprite positions are interpolated between the last two steps (Interpolation).
+#
+# Tunables are per second (speeds in px/s, gravity in px/s²) and converted to
+# the per-step amounts the physics engine works with by per_step() and
+# per_step_squared().
+
+SIM_RATE = 120
+STEP = 1 / SIM_RATE
+# At most this many steps per rendered frame (below SIM_RATE / MAX_STEPS FPS the game slows down)
+MAX_STEPS = 8
+# Absorbs float error so that e.g. 1/60 s is exactly two 1/120 s steps
+_EPSILON = 1e-9
+
+
+def per_step(per_second):
+    """Amount per step of a per-second rate (a speed in px/s becomes px per step)."""
+    return per_second * STEP
+
+
+def per_step_squared(per_second_squared):
+    """Per-step amount of a per-second² rate (gravity in px/s² becomes px/step²)."""
+    return per_second_squared * STEP * STEP
+
+
+class FixedStepClock:
+    """Turns rendered-frame times into a number of fixed simulation steps."""
+
+    def __init__(self, step=STEP, max_steps=MAX_STEPS):
+        self.step = step
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        # Steps dropped because a frame took longer than max_steps would cover
+        self.dropped_steps = 0
+
+    def reset(self):
+        self.accumulator = 0.0
+
+    def advance(self, delta_time):
+        """Add a frame's elapsed time; returns how many steps to run now."""
+        self.accumulator += delta_time
+        steps = int((self.accumulator + _EPSILON) // self.step)
+        if steps > self.max_steps:
+            self.dropped_steps += steps - self.max_steps
+            self.accumulator = 0.0
+            return self.max_steps
+        self.accumulator = max(0.0, self.accumulator - steps * self.step)
+        return steps
+
+    @property
+    def alpha(self):
+        """How far the present is between the last step and the next one (0 to 1)."""
+        return min(1.0, self.accumulator / self.step)
+
+
+def _lerp(previous, current, alpha):
+    return previous + (current - previous) * alpha
+
+
+class Interpolation:
+    """Positions of moving sprites (and the camera) at the previous step, to draw them between steps."""
+
+    def __init__(self):
+        self._previous = []
+        self._camera = None
+
+    def reset(self):
+        self._previous = []
+        self._camera = None
+
+    def record(self, sprites, camera=None):
+        """Call before each step with the sprites that move and the camera following them."""
+        self._previous = [(sprite, sprite.center_x, sprite.center_y) for sprite in sprites]
+        self._camera = (camera, camera.goal_position) if camera is not None else None
+
+    def apply(self, alpha):
+        """
+        Move the sprites and camera to where they were `alpha` of the way
+        through the last step; returns the current state for restore().
+        """
+        sprites = []
+        for sprite, previous_x, previous_y in self._previous:
+            x, y = sprite.center_x, sprite.center_y
+            sprites.append((sprite, x, y))
+            sprite.center_x = _lerp(previous_x, x, alpha)
+            sprite.center_y = _lerp(previous_y, y, alpha)
+        camera = None
+        if self._camera:
+            camera, previous = self._camera
+            goal = camera.goal_position
+            camera.move_to((_lerp(previous[0], goal[0], alpha), _lerp(previous[1], goal[1], alpha)), 1.0)
+            camera = (camera, goal)
+        return sprites, camera
+
+    @staticmethod
+    def restore(current):
+        sprites, camera = current
+        for sprite, x, y in sprites:
+            sprite.center_x = x
+            sprite.center_y = y
+        if camera:
+            camera[0].move_to(camera[1], 1.0)
@@ -0,0 +1,126 @@
+# Collectibles for Peluche Express
+#
+# Object layers whose sprites get picked up on touch (apples, and any layer
+# given a `collectible` property in Tiled). Levels are long and only 12 tiles
+# high, so each layer is indexed by x alone: every sprite is filed under the
+# fixed-width columns its bounds cover, a player only checks the sprites in
+# the columns it overlaps, and picked-up sprites leave the index as they go.
+# The cost per frame depends on how many items are near the players, not on
+# how many the level has.
+import arcade
+
+DEFAULT_LAYERS = ("Apples",)
+COLUMN_WIDTH = 140
+
+
+class ColumnIndex:
+    """Sprites bucketed by the x columns their bounds cover."""
+
+    def __init__(self, sprites=(), column_width=COLUMN_WIDTH):
+        self.column_width = column_width
+        self._columns = {}
+        # sprite -> (first column, last column) it was filed under
+        self._spans = {}
+        for sprite in sprites:
+            self.add(sprite)
+
+    def __len__(self):
+        return len(self._spans)
+
+    def __contains__(self, sprite):
+        return sprite in self._spans
+
+    def _span(self, left, right):
+        return int(left // self.column_width), int(right // self.column_width)
+
+    def add(self, sprite):
+        first, last = self._span(sprite.left, sprite.right)
+        self._spans[sprite] = (first, last)
+        for column in range(first, last + 1):
+            self._columns.setdefault(column, []).append(sprite)
+
+    def remove(self, sprite):
+        first, last = self._spans.pop(sprite)
+        for column in range(first, last + 1):
+            bucket = self._columns[column]
+            bucket.remove(sprite)
+            if not bucket:
+                del self._columns[column]
+
+    def near(self, left, right):
+        """Sprites filed in the columns overlapping [left, right]."""
+        first, last = self._span(left, right)
+        if first == last:
+            return list(self._columns.get(first, ()))
+        found = {}
+        for column in range(first, last + 1):
+            for sprite in self._columns.get(column, ()):
+                found[id(sprite)] = sprite
+        return list(found.values())
+
+
+class Collectibles:
+    """The collectible layers of a level, with per-layer collected/total counts."""
+
+    def __init__(self, scene, layer_names, totals=None):
+        """totals overrides the item counts of a layer (streamed levels start with few of their sprites)."""
+        self.indexes = {}
+        self.totals = {}
+        self.collected = {}
+        for name in layer_names:
+            if name not in scene.name_mapping:
+                continue
+            sprite_list = scene.name_mapping[name]
+            self.indexes[name] = ColumnIndex(sprite_list)
+            self.totals[name] = totals[name] if totals else len(sprite_list)
+            self.collected[name] = 0
+
+    def add(self, layer_name, sprite):
+        """Index an item that was just made live (its sprite is already in the layer's list)."""
+        self.indexes[layer_name].add(sprite)
+
+    def discard(self, layer_name, sprite):
+        """Take an item out of play; False if it had been picked up already."""
+        index = self.indexes[layer_name]
+        if sprite not in index:
+            return False
+        index.remove(sprite)
+        sprite.remove_from_sprite_lists()
+        return True
+
+    def collect(self, players, layer_name):
+        """Pick up every item of a layer touched by a player; returns how many were picked up."""
+        index = self.indexes.get(layer_name)
+        if not index:
+            return 0
+        picked = 0
+        for player in players:
+            for sprite in index.near(player.left, player.right):
+                if arcade.check_for_collision(player, sprite):
+                    index.remove(sprite)
+                    sprite.remove_from_sprite_lists()
+                    picked += 1
+        self.collected[layer_name] += picked
+        return picked
+
+    def collect_all(self, players):
+        return {name: self.collect(players, name) for name in self.indexes}
+
+
+def collectible_totals(level_data, layer_names):
+    """Items of each collectible layer in the level data."""
+    return {
+        name: sum(1 for obj in level_data.object_layer(name) if obj["kind"] == "tile") for name in layer_names
+    }
+
+
+def collectible_layer_names(level_data):
+    """Apples plus every object layer with a true `collectible` property."""
+    names = []
+    for layer in level_data.layers:
+        if layer["kind"] != "objects":
+            continue
+        flag = layer["properties"].get("collectible", False)
+        if layer["name"] in DEFAULT_LAYERS or flag is True or str(flag).lower() == "true":
+            names.append(layer["name"])
+    return names
@@ -0,0 +1,149 @@
+# Dogs for Peluche Express
+#
+# The family's dogs sit where a level's Dogs (or EndDog) objects put them until
+# a player comes within WAKE_DISTANCE, then follow the nearest player around.
+# They never test tiles: a dog stands on a span of the level's NavGraph
+# (src/navigation.py), walks along it to the take-off point of the next link
+# towards the span under its player, follows the link's arc and lands on the
+# link's target span. Next links come from the graph's per-goal cache, so
+# dogs following the same player share one search and the cost per step is a
+# few dictionary lookups and some arithmetic per dog.
+import arcade
+
+from src.navigation import level_nav_graph
+from src.player import RUN_SPEED
+from src.resource_utils import get_resource_path
+from src.textures import texture_registry
+
+DOG_IMAGE = "assets/images/dogs/shepard.png"
+# Object layers whose points are where dogs start
+DOG_LAYERS = ("Dogs", "EndDog")
+DOG_HEIGHT = 64  # px
+# A bit slower than the players on the ground, as fast in the air
+DOG_SPEED = RUN_SPEED * 0.8
+# How close a player must come to wake a dog, and how close a dog follows
+# (each dog of a pack a little further back than the one before)
+WAKE_DISTANCE = 900
+FOLLOW_DISTANCE = 80
+FOLLOW_SPACING = 40
+PACK_SIZE = 4
+
+
+def dog_positions(level_data):
+    """Where the level's dog objects are: (x, y) of every point object of the dog layers."""
+    positions = []
+    for name in DOG_LAYERS:
+        for obj in level_data.object_layer(name):
+            if obj["kind"] == "shape" and obj["shape"] and isinstance(obj["shape"][0], (int, float)):
+                positions.append(tuple(obj["shape"]))
+    return positions
+
+
+class Dog(arcade.Sprite):
+    """A dog's sprite and where it is on the navigation graph."""
+
+    def __init__(self, textures, span, x, y, follow_distance=FOLLOW_DISTANCE):
+        super().__init__(texture=textures[0])
+        self.scale = DOG_HEIGHT / textures[0].height
+        self.half_height = DOG_HEIGHT / 2
+        # Facing left (as drawn) and right
+        self.facing_textures = textures
+        self.span = span
+        self.follow_distance = follow_distance
+        self.awake = False
+        # Link being jumped or dropped along, the time spent on it and where it started
+        self.link = None
+        self.air_time = 0.0
+        self.start_y = y
+        self.position = x, y + self.half_height
+
+    def face(self, direction):
+        texture = self.facing_textures[direction > 0]
+        if self.texture is not texture:
+            self.texture = texture
+
+
+class Dogs:
+    """Every dog of a level, stepped together against its NavGraph."""
+
+    def __init__(self, level_data, owner=None, linked=True):
+        """Dogs at the level's dog objects; linked=False leaves linking the graph to the level stream."""
+        self.sprites = arcade.SpriteList()
+        self.graph = None
+        positions = dog_positions(level_data)
+        if not positions:
+            return
+        self.graph = level_nav_graph(level_data, linked)
+        path = get_resource_path(DOG_IMAGE)
+        textures = (
+            texture_registry.get(path, owner=owner),
+            texture_registry.get(path, flipped_horizontally=True, owner=owner),
+        )
+        for index, (x, y) in enumerate(positions):
+            span = self.graph.locate(x, y)
+            if span >= 0:
+                follow_distance = FOLLOW_DISTANCE + FOLLOW_SPACING * (index % PACK_SIZE)
+                self.sprites.append(Dog(textures, span, x, self.graph.surface[span], follow_distance))
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def update(self, players, delta_time):
+        """One simulation step of every dog, towards the nearest player."""
+        if not self.sprites or not players:
+            return
+        graph = self.graph
+        targets = [(player.center_x, graph.locate(player.center_x, player.bottom)) for player in players]
+        for dog in self.sprites:
+            if dog.link is not None:
+                self._fly(dog, delta_time)
+                continue
+            x, goal = min(targets, key=lambda target: abs(target[0] - dog.center_x))
+            if not dog.awake:
+                if abs(x - dog.center_x) > WAKE_DISTANCE:
+                    continue
+                dog.awake = True
+            if goal < 0:
+                continue
+            if goal == dog.span:
+                # On the player's platform: stay close behind
+                stop_x = x - dog.follow_distance if x > dog.center_x else x + dog.follow_distance
+                self._walk(dog, min(max(stop_x, graph.left[goal]), graph.right[goal]), delta_time)
+                continue
+            link = graph.next_link(dog.span, goal)
+            if link is not None and self._walk(dog, graph.takeoff_x[link], delta_time):
+                dog.link = link
+                dog.air_time = 0.0
+                dog.start_y = dog.center_y - dog.half_height
+                dog.face(graph.landing_x[link] - graph.takeoff_x[link])
+
+    @staticmethod
+    def _walk(dog, x, delta_time):
+        """Walk towards x; True once there."""
+        distance = x - dog.center_x
+        step = DOG_SPEED * delta_time
+        if abs(distance) <= step:
+            dog.center_x = x
+            return True
+        dog.face(distance)
+        dog.center_x += step if distance > 0 else -step
+        return False
+
+    def _fly(self, dog, delta_time):
+        graph = self.graph
+        link = dog.link
+        dog.air_time += delta_time
+        duration = graph.duration[link]
+        if dog.air_time >= duration:
+            dog.link = None
+            dog.span = graph.link_target[link]
+            dog.position = graph.landing_x[link], graph.surface[dog.span] + dog.half_height
+            return
+        t = dog.air_time
+        climb = graph.climb[link]
+        across = max(0.0, t - climb) / (duration - climb)
+        takeoff_x = graph.takeoff_x[link]
+        dog.position = (
+            takeoff_x + (graph.landing_x[link] - takeoff_x) * across,
+            dog.start_y + graph.launch_speed[link] * t - graph.gravity / 2 * t * t + dog.half_height,
+        )
@@ -0,0 +1,112 @@
+# Frame pacing for Peluche Express
+#
+# The start and end screens and the transition screen show the same picture
+# until the state changes (or the loading bar moves), yet the event loop would
+# update and redraw them as often as gameplay. On the battery-powered tablets
+# and old laptops the game runs on, that keeps the CPU and GPU busy for
+# nothing. A FramePacer lowers the window's update and draw rates while
+# state_manager.static_scene reports a static scene, and goes back to the full
+# rates on a state change or for WAKE_SECONDS after any input.
+#
+# The policy (main.py --frame-pacing) says how slow static scenes run:
+#   full       never slow down
+#   adaptive   update and redraw static scenes STATIC_RATE times a second
+#   on-demand  update them STATIC_RATE times a second, redraw them only when
+#              invalidated (what they show changed, the window was exposed or resized)
+# Gameplay always runs at the full rates. Without pyglet's event loop (the
+# headless arcade.run loop, the benchmarks) there are no rates to change and
+# the pacer only tracks the scene.
+#
+# Changing the draw rate means rescheduling the redraw pyglet.app.run sets up
+# itself, EventLoop._redraw_windows, a private method (checked against pyglet
+# 2.0.dev23, what arcade 2.6.17 installs). A pyglet without it (or without
+# EventLoop.is_running) gets no pacing: the pacer tracks the scene, as headless.
+from collections import namedtuple
+import time
+
+import pyglet
+
+from src.state_manager import static_scene
+
+FULL_RATE = 60
+STATIC_RATE = 10
+# Seconds of full rate after an input event, so menus answer at once
+WAKE_SECONDS = 1.0
+
+# Updates and draws per second of a static scene; a draw rate of 0 draws only when invalidated
+PacingPolicy = namedtuple("PacingPolicy", ["update_rate", "draw_rate"])
+PACING_POLICIES = {
+    "full": None,
+    "adaptive": PacingPolicy(STATIC_RATE, STATIC_RATE),
+    "on-demand": PacingPolicy(STATIC_RATE, 0),
+}
+DEFAULT_PACING = "adaptive"
+
+
+def _redraw_windows():
+    # What pyglet.app.run schedules at its own interval to draw and flip every window (None if missing)
+    return getattr(pyglet.app.event_loop, "_redraw_windows", None)
+
+
+def _redraw(delta_time=0.0):
+    _redraw_windows()(delta_time)
+
+
+def _set_draw_rate(rate):
+    """Reschedule pyglet's window redraws at rate per second (0: stop them)."""
+    redraw_windows = _redraw_windows()
+    pyglet.clock.unschedule(redraw_windows)
+    if rate:
+        pyglet.clock.schedule_interval(redraw_windows, 1 / rate)
+
+
+class FramePacer:
+    """Switches the window between the full rates and its policy's static-scene rates."""
+
+    def __init__(self, window, policy=DEFAULT_PACING):
+        self.window = window
+        self.policy = PACING_POLICIES[policy]
+        # What the current static scene shows (None while the picture moves), and whether it runs slowed down
+        self.scene = None
+        self.slow = False
+        self.awake_until = 0.0
+        self.switches = 0
+
+    def _running(self):
+        """pyglet's event loop runs the window and its rates can be changed."""
+        event_loop = pyglet.app.event_loop
+        return bool(getattr(event_loop, "is_running", False)) and _redraw_windows() is not None
+
+    def update(self, game):
+        """Call at the end of on_update: follow the scene and switch rates when it turns static or not."""
+        scene = static_scene(game)
+        changed = scene != self.scene
+        self.scene = scene
+        slow = self.policy is not None and scene is not None and time.perf_counter() >= self.awake_until
+        if slow != self.slow:
+            self._switch(slow)
+        elif changed:
+            self.invalidate()
+
+    def wake(self):
+        """Input arrived: run at the full rates for a while."""
+        self.awake_until = time.perf_counter() + WAKE_SECONDS
+        if self.slow:
+            self._switch(False)
+
+    def invalidate(self):
+        """What the window shows changed: draw it soon even if static draws are off."""
+        if self.slow and not self.policy.draw_rate and self._running():
+            pyglet.clock.schedule_once(_redraw, 0)
+
+    def _switch(self, slow):
+        self.slow = slow
+        self.switches += 1
+        if not self._running():
+            return
+        update_rate = self.policy.update_rate if slow else FULL_RATE
+        draw_rate = self.policy.draw_rate if slow else FULL_RATE
+        self.window.set_update_rate(1 / update_rate)
+        _set_draw_rate(draw_rate)
+        # The last full-rate frame may predate the scene's latest change
+        self.invalidate()
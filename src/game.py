@@ -1,14 +1,25 @@
 # -*- coding: utf-8 -*-
+import os
 import arcade
-from src.player import Player
 from src.resource_utils import get_resource_path
-from src.apple_manager import check_apple_collection
-from src.camera_utils import update_camera
-from src.ui_draw import draw_apple_counter, draw_transition_text, draw_repeating_background, draw_main_screen, draw_transition_screen, draw_game_screen
-from src.level_manager import load_levels_config, reset_gameplay_state, load_current_level, go_to_next_level
-from src.level_exit import check_end_zone_transition
-from src.input_handler import update_player_movement
-from src.state_manager import handle_level_exit_update
+from src.ui_draw import draw_apple_counter, draw_main_screen, draw_transition_screen, draw_game_screen, draw_profiler_overlay
+from src.level_manager import load_levels_config, reset_gameplay_state, load_current_level, go_to_next_level, prefetch_level
+from src.input_handler import update_player_movement, BOUND_KEYS
+from src.atlas import install_textures, preload_sprite_textures
+from src.level_loader import LevelLoader
+from src.tile_chunks import ChunkedTileLayers, static_tile_layer_names
+from src.gameplay import enter_resident_level, setup_level_world, update_gameplay
+from src.level_residency import LevelResidency, resident_level
+from src.level_streaming import stream_settings
+from src.profiler import FrameProfiler
+from src.textures import texture_registry, GLOBAL
+from src.animation import character_textures
+from src.player import CHARACTER
+from src.backgrounds import ParallaxBackground, background_layers
+from src.hud import build_game_hud, build_profiler_hud, build_transition_hud
+from src.clock import FixedStepClock, Interpolation, STEP
+from src.input_recording import INPUT_LOG_EXT, InputRecorder, before_step
+from src.frame_pacing import FramePacer
 
 class PelucheExpress(arcade.Window):
     """
@@ -19,185 +30,222 @@ class PelucheExpress(arcade.Window):
         super().__init__(screen_width, screen_height, screen_title)
         arcade.set_background_color(arcade.csscolor.CORNFLOWER_BLUE)
         self.levels = load_levels_config()
+        self.level_loader = LevelLoader(self.levels)
+        # Built levels kept for the next lap of the level chain (see level_residency.py)
+        self.level_residency = LevelResidency()
         self.current_level_id = None
-        self.background_texture = None
-        self.map_bg_texture = None
+        # Texture registry owner of the loaded level's textures
+        self.texture_owner = None
+        self.screen_background = None
+        self.map_background = None
         self.state = "main_screen"
         self.transition_text = None
         self.transition_timer = 0
         self.tile_map = None
         self.scene = None
+        self.tile_chunks = None
+        self.level_stream = None
         self.players = []
+        self.dogs = None
         self.camera = arcade.Camera(screen_width, screen_height)
-        self.pressed_keys_p1 = set()
-        self.pressed_keys_p2 = set()
+        # Screen-space camera for the HUD and overlays
+        self.ui_camera = arcade.Camera(screen_width, screen_height)
+        # Held keys of every local player (see input_handler.KEY_BINDINGS)
+        self.pressed_keys = set()
+        self.player_physics = None
+        # Per-step input of each level played is recorded to this folder when set (main.py --record)
+        self.record_dir = None
+        self.recorded_levels = 0
+        self.input_recorder = None
+        # InputReplay driving the players instead of the keyboard (main.py --replay)
+        self.input_replay = None
+        # Lowers the update and draw rates of static screens (main.py --frame-pacing)
+        self.frame_pacer = FramePacer(self)
         self.end_zone_sprites = None
+        # Game logic runs in fixed steps; drawing interpolates between the last two
+        self.clock = FixedStepClock()
+        self.interpolation = Interpolation()
+        # Per-phase frame timings (F3 shows them, main.py --profile-dump saves them)
+        self.profiler = FrameProfiler()
         
         # Apple collection system
+        self.collectibles = None
         self.apples_collected = 0
         self.total_apples = 0
+        # Serve player and HUD sprites from the texture atlas when it has been built
+        preload_sprite_textures()
+        # Player frames (both colors) are shared by every level; load them once up front
+        texture_registry.warm_up(character_textures(CHARACTER) + character_textures(CHARACTER, "blue"))
         # Load mini apple icon for counter display
-        self.apple_icon_texture = arcade.load_texture(get_resource_path("assets/images/Candy expansion/Tiles/cherry.png"))
+        self.apple_icon_texture = texture_registry.get(get_resource_path("assets/images/Candy expansion/Tiles/cherry.png"), owner=GLOBAL)
+        # Retained HUD layers (see hud.py)
+        self.hud = build_game_hud(self)
+        self.transition_hud = build_transition_hud(self)
+        self.profiler_hud = build_profiler_hud(self)
 
     def setup(self):
         """Set up the game. Call to restart."""
-        self.current_level_id = "start"
+        # A replay starts at its recorded level
+        self.current_level_id = self.input_replay.log.level_id if self.input_replay else "start"
         load_current_level(self)
 
-    def _start_gameplay(self):
-        """Load and initialize the actual gameplay for the current level."""
+    def _start_gameplay(self, prepared=None):
+        """
+        Initialize the actual gameplay for the current level, from its resident
+        build when it is still kept (prepared is None) or from its
+        background-prepared data.
+        """
         level = self.levels[self.current_level_id]
-        
-        # Load the map background and tilemap
-        self.map_bg_texture = arcade.load_texture(get_resource_path(level["background"]))
-        self.tile_map = arcade.load_tilemap(get_resource_path(level["map"]), scaling=1.0)
-        self.scene = arcade.Scene.from_tilemap(self.tile_map)
-        
-        # Clear existing players
-        if "Players" in self.scene.name_mapping:
-            self.scene.name_mapping["Players"].clear()
-        if "Spawns" in self.scene.name_mapping:
-            self.scene.name_mapping["Spawns"].clear()
-            
-        # Create players from spawn points (support two players)
-        self.players = []
-        p1_spawn = None
-        p2_spawn = None
-        if "Spawns" in self.tile_map.object_lists:
-            for obj in self.tile_map.object_lists["Spawns"]:
-                if obj.name == "Player1":
-                    p1_spawn = obj
-                elif obj.name == "Player2":
-                    p2_spawn = obj
-        # Always spawn Player1 at Player1 spawn, Player2 at Player2 spawn (if available)
-        if p1_spawn:
-            p1 = Player(
-                get_resource_path("assets/images/Base pack/Player/p2_stand.png"),
-                scale=0.96,
-                start_x=p1_spawn.shape[0],
-                start_y=p1_spawn.shape[1]
-            )
-            self.players.append(p1)
-        if p2_spawn:
-            p2 = Player(
-                get_resource_path("assets/images/Base pack/Player/p1_stand.png"),
-                scale=0.96,
-                start_x=p2_spawn.shape[0],
-                start_y=p2_spawn.shape[1]
-            )
-            self.players.append(p2)
-                    
-        # Add players to scene
-        if "Players" not in self.scene.name_mapping:
-            self.scene.add_sprite_list("Players")
-        for player in self.players:
-            self.scene.add_sprite("Players", player)
-            
-        # Set up physics
-        collidable_layers = []
-        for layer in self.tile_map.tiled_map.layers:
-            if hasattr(layer, "properties") and layer.properties and layer.properties.get("collides", False):
-                layer_name = layer.name
-                if layer_name in self.scene.name_mapping:
-                    collidable_layers.append(self.scene.name_mapping[layer_name])
-                    
-        self.physics_engines = []
-        if self.players and collidable_layers:
-            for player in self.players:
-                engine = arcade.PhysicsEnginePlatformer(
-                    player,
-                    collidable_layers,
-                    gravity_constant=1.0
-                )
-                self.physics_engines.append(engine)
-
-        # Calculate average x of EndZone objects for level completion
-        end_zone_xs = []
-        if "EndZone" in self.tile_map.object_lists:
-            for obj in self.tile_map.object_lists["EndZone"]:
-                end_zone_xs.append(obj.shape[0])
-        if end_zone_xs:
-            self.end_zone_avg_x = sum(end_zone_xs) / len(end_zone_xs)
+        resident = self.level_residency.get(self.current_level_id)
+        if resident is not None:
+            # Built on an earlier visit: only objects, players, goals and physics are made anew
+            enter_resident_level(self, resident)
+            self.map_background = resident.map_background
+            self.tile_chunks = resident.tile_chunks
         else:
-            self.end_zone_avg_x = None
+            # Textures were decoded on the loader thread; only sprite creation happens here
+            install_textures(prepared["textures"])
+            level_data = prepared["level_data"]
+            setup_level_world(self, level_data, stream_settings(level, level_data))
+            map_height = self.tile_map.height * self.tile_map.tile_height
+            self.map_background = ParallaxBackground(self.ctx, background_layers(level, self.texture_owner), map_height)
+            # Static tile layers are drawn in camera-culled chunks (filled as they stream in for streamed levels)
+            if self.level_stream:
+                self.tile_chunks = self.level_stream.tile_chunks
+            else:
+                self.tile_chunks = ChunkedTileLayers(self.tile_map, static_tile_layer_names(level_data))
+                if self.level_residency.max_levels:
+                    # Kept for the next visit (evicting the least recently used level past the limits)
+                    self.level_residency.add(self.current_level_id, resident_level(self, level_data))
+        # Everything this level uses is now held; drop what only the previous (or an evicted) one did
+        texture_registry.trim(self.ctx.default_atlas)
 
-        # Set up apple collection system
-        self.apples_collected = 0
-        if "Apples" in self.scene.name_mapping:
-            self.total_apples = len(self.scene.name_mapping["Apples"])
-        else:
-            self.total_apples = 0
-            
         # Switch to game state
         self.state = "game"
-        
+        self.clock.reset()
+        self.interpolation.reset()
+        if self.record_dir:
+            players = self.player_physics.count if self.player_physics else 0
+            self.input_recorder = InputRecorder(self.current_level_id, players)
+
+        # Get the following level ready while this one is played
+        prefetch_level(self, level.get("next"))
+
+    def _save_recording(self):
+        """Write the level's input log to record_dir (its steps so far when the window is closed mid-level)."""
+        log = self.input_recorder.finish(self)
+        self.input_recorder = None
+        self.recorded_levels += 1
+        path = os.path.join(self.record_dir, f"{self.recorded_levels:03d}-{log.level_id}{INPUT_LOG_EXT}")
+        log.save(path)
+        print(f"Recorded {log.steps} steps of {log.level_id} to {path}")
+
+    def _end_replay(self):
+        replay = self.input_replay
+        self.input_replay = None
+        result = "matches" if replay.matches(self) else "does NOT match"
+        print(f"Replayed {replay.step} steps of {replay.log.level_id}: end position {result} the recording")
+        # Back to the keyboard
+        self.pressed_keys.clear()
+        update_player_movement(self)
+
+    def on_close(self):
+        if self.input_recorder is not None:
+            self._save_recording()
+        self.level_loader.shutdown()
+        super().on_close()
+
     def on_draw(self):
-        self.clear()
+        with self.profiler.section("draw"):
+            self.clear()
         
-        if self.state == "main_screen":
-            draw_main_screen(self)
-        elif self.state == "transition_screen":
-            draw_transition_screen(self)
-        elif self.state == "game":
-            draw_game_screen(self)
-        elif self.state == "level_exit":
-            # Draw game as usual, but freeze camera
-            if not self.exit_camera_pos:
-                self.exit_camera_pos = self.camera.position
-            self.camera.move_to(self.exit_camera_pos, 1.0)
-            draw_game_screen(self)
-            # Fade out overlay
-            if hasattr(self, 'exit_fade') and self.exit_fade > 0.0:
-                arcade.draw_lrtb_rectangle_filled(0, self.width, self.height, 0, (0,0,0,int(255*self.exit_fade)))
+            if self.state == "main_screen":
+                draw_main_screen(self)
+            elif self.state == "transition_screen":
+                draw_transition_screen(self)
+            elif self.state == "game":
+                current = self.interpolation.apply(self.clock.alpha)
+                draw_game_screen(self)
+                self.interpolation.restore(current)
+            elif self.state == "level_exit":
+                # Draw game as usual, but freeze camera
+                if not self.exit_camera_pos:
+                    self.exit_camera_pos = self.camera.position
+                self.camera.move_to(self.exit_camera_pos, 1.0)
+                current = self.interpolation.apply(self.clock.alpha)
+                draw_game_screen(self)
+                self.interpolation.restore(current)
+                # Fade out overlay
+                if hasattr(self, 'exit_fade') and self.exit_fade > 0.0:
+                    self.ui_camera.use()
+                    arcade.draw_lrtb_rectangle_filled(0, self.width, self.height, 0, (0,0,0,int(255*self.exit_fade)))
+
+        if self.profiler.overlay_visible and self.state in ("game", "level_exit"):
+            draw_profiler_overlay(self)
+        self.profiler.end_frame()
 
     def on_update(self, delta_time):
+        self._update_state(delta_time)
+        # Slow down or speed up for what the next frames show
+        self.frame_pacer.update(self)
+
+    def _update_state(self, delta_time):
         # Handle transition screen logic
         if self.state == "transition_screen":
             self.transition_timer += delta_time
             
-            if self.transition_timer < 3.0:
+            resident = self.current_level_id in self.level_residency
+            if self.transition_timer < 3.0 or not (resident or self.level_loader.is_ready(self.current_level_id)):
                 return
-            # After 3 seconds, start gameplay
-            self._start_gameplay()
+            # After 3 seconds (and once the level is prepared, unless it is still built), start gameplay
+            self._start_gameplay(None if resident else self.level_loader.take(self.current_level_id))
             return
 
         # Only run game logic if in game state or level_exit
         if self.state not in ("game", "level_exit"):
             return
 
-        # Main game update logic
-        if hasattr(self, 'physics_engines') and self.physics_engines:
-            for engine in self.physics_engines:
-                engine.update()
-        for idx, player in enumerate(self.players):
-            # Prevent player from moving out of the map on the left side
-            if self.tile_map and player.center_x < 0:
-                player.center_x = 0
-            engine = self.physics_engines[idx] if idx < len(self.physics_engines) else None
-            player.update(physics_engine=engine)
-
-        if self.state == "game":
-            check_end_zone_transition(self)
-            check_apple_collection(self)
-            update_camera(self)
-        elif self.state == "level_exit":
-            handle_level_exit_update(self, delta_time)
+        with self.profiler.section("update"):
+            for _ in range(self.clock.advance(delta_time)):
+                if self.input_replay is not None and self.input_replay.done:
+                    self._end_replay()
+                moving = self.players + list(self.dogs.sprites) if self.dogs else self.players
+                self.interpolation.record(moving, self.camera)
+                before_step(self)
+                update_gameplay(self, STEP)
+                if self.state != "game":
+                    # Input no longer steers the level past its end zone
+                    if self.input_recorder is not None:
+                        self._save_recording()
+                    if self.input_replay is not None:
+                        self._end_replay()
+                if self.state not in ("game", "level_exit"):
+                    # The level is over; the next one starts on a fresh clock
+                    self.interpolation.reset()
+                    break
+
+    def on_resize(self, width, height):
+        super().on_resize(width, height)
+        self.frame_pacer.invalidate()
+
+    def on_expose(self):
+        self.frame_pacer.invalidate()
 
     def on_key_press(self, key, modifiers):
-        if self.state == "main_screen" and key == arcade.key.SPACE:
+        self.frame_pacer.wake()
+        if key == arcade.key.F3:
+            self.profiler.toggle_overlay()
+        elif self.state == "main_screen" and key == arcade.key.SPACE:
             go_to_next_level(self)
-        elif self.state == "game":
-            # Arrow keys for Player1, AWSD for Player2
-            if key in (arcade.key.LEFT, arcade.key.RIGHT, arcade.key.UP, arcade.key.DOWN, arcade.key.SPACE):
-                self.pressed_keys_p1.add(key)
-            if key in (arcade.key.A, arcade.key.D, arcade.key.W, arcade.key.S, arcade.key.E):
-                self.pressed_keys_p2.add(key)
-            update_player_movement(self)
+        elif self.state == "game" and self.input_replay is None:
+            # Arrow keys for Player1, AWSD for Player2, ... (input_handler.KEY_BINDINGS)
+            if key in BOUND_KEYS:
+                self.pressed_keys.add(key)
+                update_player_movement(self)
 
     def on_key_release(self, key, modifiers):
-        if self.state == "game":
-            if key in (arcade.key.LEFT, arcade.key.RIGHT, arcade.key.UP, arcade.key.DOWN, arcade.key.SPACE):
-                self.pressed_keys_p1.discard(key)
-            if key in (arcade.key.A, arcade.key.D, arcade.key.W, arcade.key.S, arcade.key.E):
-                self.pressed_keys_p2.discard(key)
-            update_player_movement(self)
\ No newline at end of file
+        self.frame_pacer.wake()
+        if self.state == "game" and self.input_replay is None:
+            if key in BOUND_KEYS:
+                self.pressed_keys.discard(key)
+                update_player_movement(self)
\ No newline at end of file
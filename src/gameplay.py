@@ -0,0 +1,214 @@
+# Gameplay world and tick for Peluche Express
+#
+# Level setup and the per-frame game logic, shared by the window (src/game.py)
+# and the headless simulation (src/simulation.py). Both take any object with
+# the game's gameplay attributes (players, scene, player_physics, camera...).
+import arcade
+from src.player import CHARACTER, GRAVITY, Player
+from src.animation import character_textures
+from src.resource_utils import get_resource_path
+from src.apple_manager import check_apple_collection
+from src.camera_utils import update_camera
+from src.level_exit import enter_end_zone
+from src.state_manager import handle_level_exit_update
+from src.level_data import CompiledTileMap
+from src.textures import texture_registry
+from src.grid_physics import CollisionGrid
+from src.player_physics import BATCH_MIN_PLAYERS, GridPlayerPhysics, LevelHulls, PlayerPhysics
+from src.collectibles import Collectibles, collectible_layer_names, collectible_totals
+from src.level_streaming import LevelStream
+from src.clock import per_step_squared
+from src.dogs import Dogs
+from src.triggers import TriggerAction, Triggers, trigger_volumes
+
+def reach_goal(game, volume, player_index):
+    game.goals_reached.add(volume.name or volume.layer)
+
+# What the volumes of a layer with a `trigger` property do (src/triggers.py)
+TRIGGER_ACTIONS = {
+    "level_exit": TriggerAction(enter=enter_end_zone),
+    "goal": TriggerAction(enter=reach_goal),
+}
+
+def setup_level_world(game, level_data, streaming=None):
+    """
+    Build the tile map, scene, players and physics of a level from its LevelData,
+    streamed chunk by chunk when given StreamSettings (src/level_streaming.py).
+    """
+    build_tile_map(game, level_data, streamed=streaming is not None)
+    build_scene(game, level_data)
+    setup_dogs(game, level_data, streamed=streaming is not None)
+    setup_goals(game, level_data)
+    setup_stream(game, streaming)
+    setup_physics(game, level_data)
+
+def enter_resident_level(game, resident):
+    """
+    Set up a level kept built by the residency manager (src/level_residency.py):
+    its tile map, chunks and collision hulls are reused, only its objects,
+    players, goals and physics are made anew.
+    """
+    game.tile_map = resident.tile_map
+    game.tile_map.reset_objects()
+    game.collision_grid = resident.collision_grid
+    build_scene(game, resident.level_data)
+    setup_dogs(game, resident.level_data)
+    setup_goals(game, resident.level_data)
+    setup_stream(game, None)
+    setup_physics(game, resident.level_data, resident.solid)
+
+def build_tile_map(game, level_data, streamed=False):
+    """Tile and object sprites of the level (none yet when it is streamed)."""
+    game.tile_map = CompiledTileMap(level_data, scaling=1.0, owner=game.current_level_id, streamed=streamed)
+
+def player_spawns(level_data):
+    """Positions of the Player1, Player2, ... spawn objects, in player order."""
+    numbered = []
+    for name, position in level_data.spawns.items():
+        suffix = name[len("Player"):]
+        if name.startswith("Player") and suffix.isdigit():
+            numbered.append((int(suffix), position))
+    return [position for _, position in sorted(numbered)]
+
+def scene_from_tile_map(tile_map):
+    """
+    arcade.Scene.from_tilemap, except that empty sprite lists stay the tile map's
+    own (arcade swaps them for new ones; a streamed level fills them later).
+    """
+    scene = arcade.Scene()
+    for name, sprite_list in tile_map.sprite_lists.items():
+        scene.name_mapping[name] = sprite_list
+        scene.sprite_lists.append(sprite_list)
+    return scene
+
+def build_scene(game, level_data):
+    """Scene of the tile map's layers plus the players at their spawn points."""
+    game.scene = scene_from_tile_map(game.tile_map)
+
+    # Clear existing players
+    if "Players" in game.scene.name_mapping:
+        game.scene.name_mapping["Players"].clear()
+    if "Spawns" in game.scene.name_mapping:
+        game.scene.name_mapping["Spawns"].clear()
+
+    # One player per PlayerN spawn point, in N order
+    game.players = []
+    spawns = player_spawns(level_data)
+    # Players alternate between the base sprite and the blue one
+    images = [
+        get_resource_path(f"assets/images/Base pack/Player/{'p2_stand.png' if index % 2 == 0 else 'p1_stand.png'}")
+        for index in range(len(spawns))
+    ]
+    # Their images and animation frames decoded in one parallel batch (no-op once cached)
+    frames = character_textures(CHARACTER) + character_textures(CHARACTER, "blue")
+    texture_registry.preload(images + [path for path, _ in frames])
+    for image, (x, y) in zip(images, spawns):
+        player = Player(
+            image,
+            scale=0.96,
+            start_x=x,
+            start_y=y
+        )
+        game.players.append(player)
+
+    # Add players to scene
+    if "Players" not in game.scene.name_mapping:
+        game.scene.add_sprite_list("Players")
+    for player in game.players:
+        game.scene.add_sprite("Players", player)
+
+def setup_dogs(game, level_data, streamed=False):
+    """The level's dogs (src/dogs.py), drawn behind the players; a streamed level's stream links their graph."""
+    game.dogs = Dogs(level_data, owner=game.current_level_id, linked=not streamed)
+    if game.dogs:
+        game.scene.add_sprite_list_before("Dogs", "Players", sprite_list=game.dogs.sprites)
+
+def setup_physics(game, level_data, solid=None):
+    """
+    All players in one physics state against the level's collidable tiles
+    (solid: their CollisionGrid or LevelHulls when already built): a
+    GridPhysicsEngine per player for a few players, batched NumPy physics
+    from BATCH_MIN_PLAYERS on.
+    """
+    # Set up physics (collidable tiles are bucketed into a grid once per level)
+    collidable_layer_names = [
+        name for name in level_data.collidable_layer_names if name in game.scene.name_mapping
+    ]
+
+    game.player_physics = None
+    if game.players and collidable_layer_names:
+        if solid is None and game.level_stream:
+            # The stream keeps the live chunks' solid tiles up to date
+            solid = game.level_stream.solid
+        elif solid is None:
+            game.collision_grid = CollisionGrid.from_tile_map(game.tile_map, collidable_layer_names)
+            solid = game.collision_grid
+        gravity_constant = per_step_squared(GRAVITY)
+        if isinstance(solid, CollisionGrid):
+            if len(game.players) < BATCH_MIN_PLAYERS:
+                game.player_physics = GridPlayerPhysics(solid, game.players, gravity_constant)
+                return
+            solid = LevelHulls.from_grid(solid)
+        game.player_physics = PlayerPhysics(solid, game.players, gravity_constant)
+
+def setup_goals(game, level_data):
+    """Trigger volumes (the end zone, goals...) and the apple counter."""
+    game.triggers = Triggers(trigger_volumes(level_data), TRIGGER_ACTIONS)
+    game.goals_reached = set()
+
+    # Set up apple (and other collectible) collection, indexed by x for quick lookups
+    names = collectible_layer_names(level_data)
+    totals = collectible_totals(level_data, names) if game.tile_map.streamed else None
+    game.collectibles = Collectibles(game.scene, names, totals)
+    game.apples_collected = 0
+    game.total_apples = game.collectibles.totals.get("Apples", 0)
+
+def setup_stream(game, streaming):
+    """Make the first chunks of a streamed level live: the view, the players and the look-ahead."""
+    game.level_stream = None
+    if streaming is not None:
+        nav_graph = game.dogs.graph if game.dogs else None
+        # Collision tiles kept in the form setup_physics steps this many players against
+        batched = len(game.players) >= BATCH_MIN_PLAYERS
+        game.level_stream = LevelStream(game.tile_map, game.collectibles, streaming, nav_graph, batched)
+        update_level_stream(game, build_ahead=2 * streaming.look_ahead)
+
+def update_level_stream(game, build_ahead=1):
+    view_left = game.camera.goal_position[0]
+    game.level_stream.update(
+        view_left,
+        view_left + game.camera.viewport_width,
+        [player.center_x for player in game.players],
+        build_ahead
+    )
+
+def update_gameplay(game, delta_time):
+    """One fixed step (clock.STEP) of game logic while playing (state "game") or exiting a level ("level_exit")."""
+    profiler = game.profiler
+    if game.level_stream:
+        with profiler.section("stream"):
+            update_level_stream(game)
+    # Main game update logic
+    with profiler.section("physics"):
+        if game.player_physics:
+            game.player_physics.step()
+            game.player_physics.sync_sprites()
+    with profiler.section("player"):
+        for player in game.players:
+            player.update(delta_time)
+        if game.player_physics:
+            # Animation frames can change the hit box
+            game.player_physics.refresh_shapes()
+    if game.dogs:
+        with profiler.section("dogs"):
+            game.dogs.update(game.players, delta_time)
+
+    if game.state == "game":
+        with profiler.section("triggers"):
+            game.triggers.update(game, game.players)
+        with profiler.section("apples"):
+            check_apple_collection(game)
+        with profiler.section("camera"):
+            update_camera(game, delta_time)
+    elif game.state == "level_exit":
+        handle_level_exit_update(game, delta_time)
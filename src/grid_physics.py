@@ -0,0 +1,265 @@
+# Tile-grid collision for Peluche Express
+#
+# Static level tiles sit on a regular grid, so instead of testing the player
+# against every sprite of every collidable layer (what PhysicsEnginePlatformer
+# does), CollisionGrid files each tile's hit box under the cells it covers and
+# GridPhysicsEngine only tests the handful of tiles in the cells the player
+# overlaps. The cost per update is the same on a 20-tile map and a 2000-tile one.
+#
+# GridPhysicsEngine runs the same movement rules as PhysicsEnginePlatformer
+# (gravity, bonk back 1px at a time, land in 0.25px steps, binary search on x,
+# ramp up small steps) with an equivalent polygon test, and offers the same
+# update()/can_jump() surface that Player and the input handler use.
+import math
+
+
+def _bounds(points):
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+class CollisionGrid:
+    """Static tile hit boxes bucketed by grid cell."""
+
+    def __init__(self, columns, rows, cell_width, cell_height):
+        self.columns = columns
+        self.rows = rows
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        # Each cell holds None or a list of (bounds, points, own_axes) for the tiles covering it
+        self.cells = [None] * (columns * rows)
+        # group -> its entries, for hit boxes filed with add_group (a streamed level's chunks)
+        self._groups = {}
+
+    @classmethod
+    def from_tile_map(cls, tile_map, layer_names):
+        """Build the grid from the tiles of the named (collidable) layers."""
+        scaling = getattr(tile_map, "scaling", 1.0)
+        grid = cls(
+            tile_map.width,
+            tile_map.height,
+            tile_map.tile_width * scaling,
+            tile_map.tile_height * scaling,
+        )
+        for name in layer_names:
+            for sprite in tile_map.sprite_lists.get(name, ()):
+                grid.add(sprite.get_adjusted_hit_box())
+        return grid
+
+    def _cell_range(self, left, bottom, right, top):
+        first_col = max(0, int(left // self.cell_width))
+        last_col = min(self.columns - 1, int(right // self.cell_width))
+        first_row = max(0, int(bottom // self.cell_height))
+        last_row = min(self.rows - 1, int(top // self.cell_height))
+        return first_col, last_col, first_row, last_row
+
+    def add(self, points):
+        """File a hit box polygon (absolute points) under every cell it covers; returns its entry."""
+        points = [tuple(point) for point in points]
+        bounds = _bounds(points)
+        # The polygon's own slanted axes never change, so neither does its extent on them
+        own_axes = []
+        for nx, ny in _slanted_axes(points):
+            projected = [nx * x + ny * y for x, y in points]
+            own_axes.append((nx, ny, min(projected), max(projected)))
+        entry = (bounds, points, own_axes)
+        first_col, last_col, first_row, last_row = self._cell_range(*bounds)
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                index = row * self.columns + col
+                if self.cells[index] is None:
+                    self.cells[index] = [entry]
+                else:
+                    self.cells[index].append(entry)
+        return entry
+
+    def add_group(self, group, polygons):
+        """File hit box polygons as one group, which remove_group(group) takes out again."""
+        self._groups.setdefault(group, []).extend(self.add(points) for points in polygons)
+
+    def remove_group(self, group):
+        for entry in self._groups.pop(group, ()):
+            first_col, last_col, first_row, last_row = self._cell_range(*entry[0])
+            for row in range(first_row, last_row + 1):
+                for col in range(first_col, last_col + 1):
+                    index = row * self.columns + col
+                    entries = [other for other in self.cells[index] if other is not entry]
+                    self.cells[index] = entries or None
+
+    def colliding(self, points, bounds, axes):
+        """Hit boxes intersecting a convex polygon (see intersects)."""
+        left, bottom, right, top = bounds
+        hits = []
+        first_col, last_col, first_row, last_row = self._cell_range(left, bottom, right, top)
+        cells = self.cells
+        columns = self.columns
+        for row in range(first_row, last_row + 1):
+            base = row * columns
+            for col in range(first_col, last_col + 1):
+                entries = cells[base + col]
+                if entries is None:
+                    continue
+                for entry in entries:
+                    if entry not in hits and intersects(points, bounds, axes, entry):
+                        hits.append(entry)
+        return hits
+
+
+def _slanted_axes(points):
+    """Edge normals of a polygon, skipping horizontal and vertical edges."""
+    axes = []
+    for i in range(len(points)):
+        (x1, y1), (x2, y2) = points[i], points[(i + 1) % len(points)]
+        normal = (y2 - y1, x1 - x2)
+        if normal[0] and normal[1]:
+            axes.append(normal)
+    return axes
+
+
+def intersects(points, bounds, axes, entry):
+    """
+    Separating axis test between a convex polygon and a grid entry, same result as
+    arcade.are_polygons_intersecting (touching isn't intersecting).
+
+    Horizontal and vertical edges all project onto the x and y axes, which the
+    bounds comparison covers, so only the slanted axes of either polygon (axes for
+    points, precomputed ones for the entry) are projected.
+    """
+    box, box_points, own_axes = entry
+    if box[0] >= bounds[2] or bounds[0] >= box[2] or box[1] >= bounds[3] or bounds[1] >= box[3]:
+        return False
+    for nx, ny, box_min, box_max in own_axes:
+        projected = [nx * x + ny * y for x, y in points]
+        if max(projected) <= box_min or box_max <= min(projected):
+            return False
+    for nx, ny in axes:
+        projected = [nx * x + ny * y for x, y in points]
+        projected_box = [nx * x + ny * y for x, y in box_points]
+        if max(projected) <= min(projected_box) or max(projected_box) <= min(projected):
+            return False
+    return True
+
+
+class GridPhysicsEngine:
+    """Drop-in replacement for PhysicsEnginePlatformer against a CollisionGrid."""
+
+    def __init__(self, player_sprite, grid, gravity_constant=0.5):
+        self.player_sprite = player_sprite
+        self.grid = grid
+        self.gravity_constant = gravity_constant
+        self.jumps_since_ground = 0
+        self.allow_multi_jump = False
+        self.allowed_jumps = 1
+        self._shape = None
+
+    def _load_shape(self):
+        """Player hit box relative to its center, its bounds and its slanted edge normals."""
+        sprite = self.player_sprite
+        cx, cy = sprite.center_x, sprite.center_y
+        points = [(x - cx, y - cy) for x, y in sprite.get_adjusted_hit_box()]
+        self._shape = (points, _bounds(points), _slanted_axes(points))
+
+    def _hits_at(self, x, y):
+        points, (left, bottom, right, top), axes = self._shape
+        moved = [(px + x, py + y) for px, py in points]
+        return self.grid.colliding(moved, (left + x, bottom + y, right + x, top + y), axes)
+
+    def _collides_at(self, x, y, entry):
+        points, (left, bottom, right, top), axes = self._shape
+        moved = [(px + x, py + y) for px, py in points]
+        return intersects(moved, (left + x, bottom + y, right + x, top + y), axes, entry)
+
+    def _unstick(self, x, y):
+        """Arcade's circular search out of an overlap we started the update in."""
+        vary = 1
+        while True:
+            for dx, dy in ((0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1)):
+                if not self._hits_at(x + dx * vary, y + dy * vary):
+                    return x + dx * vary, y + dy * vary
+            vary *= 2
+
+    def update(self):
+        """Apply gravity, move the player and resolve collisions. Returns the hit boxes touched."""
+        sprite = self.player_sprite
+        sprite.change_y -= self.gravity_constant
+        self._load_shape()
+        x, y = sprite.center_x, sprite.center_y
+        if self._hits_at(x, y):
+            x, y = self._unstick(x, y)
+        original_x, original_y = x, y
+
+        # --- Move in the y direction
+        change_y = sprite.change_y
+        y += change_y
+        complete_hit_list = self._hits_at(x, y)
+        if complete_hit_list:
+            if change_y > 0:
+                while self._hits_at(x, y):
+                    y -= 1
+            elif change_y < 0:
+                for entry in complete_hit_list:
+                    while self._collides_at(x, y, entry):
+                        y += 0.25
+            sprite.change_y = 0.0
+        y = round(y, 2)
+
+        # --- Move in the x direction
+        if sprite.change_x:
+            almost_original_y = y
+            direction = math.copysign(1, sprite.change_x)
+            cur_x_change = abs(sprite.change_x)
+            upper_bound = cur_x_change
+            lower_bound = 0
+            cur_y_change = 0
+            while True:
+                x = original_x + cur_x_change * direction
+                collision_check = self._hits_at(x, y)
+                for entry in collision_check:
+                    if entry not in complete_hit_list:
+                        complete_hit_list.append(entry)
+                if collision_check:
+                    # Can we ramp up and not collide?
+                    cur_y_change = cur_x_change
+                    y = original_y + cur_y_change
+                    collision_check = self._hits_at(x, y)
+                    if collision_check:
+                        cur_y_change -= cur_x_change
+                    else:
+                        while not collision_check and cur_y_change > 0:
+                            cur_y_change -= 1
+                            y = almost_original_y + cur_y_change
+                            collision_check = self._hits_at(x, y)
+                        cur_y_change += 1
+                        collision_check = []
+                    if collision_check:
+                        upper_bound = cur_x_change - 1
+                        if upper_bound - lower_bound <= 0:
+                            cur_x_change = lower_bound
+                            break
+                        cur_x_change = (upper_bound + lower_bound) // 2
+                    else:
+                        break
+                else:
+                    lower_bound = cur_x_change
+                    if upper_bound - lower_bound <= 0:
+                        break
+                    cur_x_change = (upper_bound + lower_bound) // 2 + (upper_bound + lower_bound) % 2
+            x = original_x + cur_x_change * direction
+            y = almost_original_y + cur_y_change
+
+        sprite.center_x = x
+        sprite.center_y = y
+        return complete_hit_list
+
+    def can_jump(self, y_distance=5):
+        """True when there is ground within y_distance below the player."""
+        self._load_shape()
+        sprite = self.player_sprite
+        on_ground = bool(self._hits_at(sprite.center_x, sprite.center_y - y_distance))
+        if on_ground:
+            self.jumps_since_ground = 0
+        return on_ground or (self.allow_multi_jump and self.jumps_since_ground < self.allowed_jumps)
+
+    def is_on_ladder(self):
+        return False
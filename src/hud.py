@@ -0,0 +1,160 @@
+# HUD for Peluche Express
+#
+# Retained-mode screen overlay: panels, icons and text labels are created once
+# and drawn with a persistent screen-space camera, all panels/icons as one
+# sprite list and all labels as one pyglet batch. A label only re-lays out its
+# glyphs when its text actually changes, so a counter that stays at "3/12"
+# costs nothing per frame but the two batched draws.
+from itertools import zip_longest
+
+import arcade
+import pyglet
+
+HUD_FONT = "Arial"
+# Profiler overlay (F3): most lines shown, their spacing, and how often a second its figures are refreshed
+PROFILER_LINES = 24
+PROFILER_LINE_HEIGHT = 16
+PROFILER_REFRESH_RATE = 4
+
+
+class TextWidget:
+    """A label in a HUD batch that rebuilds only when its text changes."""
+
+    def __init__(self, batch, x, y, text="", color=arcade.color.WHITE, font_size=16,
+                 anchor_x="left", anchor_y="baseline", font_name=HUD_FONT):
+        self.label = pyglet.text.Label(
+            text=text,
+            x=x,
+            y=y,
+            font_name=font_name,
+            font_size=font_size,
+            anchor_x=anchor_x,
+            anchor_y=anchor_y,
+            color=arcade.get_four_byte_color(color),
+            batch=batch,
+        )
+        # Times the glyph layout was rebuilt after creation
+        self.rebuilds = 0
+
+    @property
+    def value(self):
+        return self.label.text
+
+    def set(self, value):
+        """Show value; returns True when the text changed (and was re-laid out)."""
+        value = str(value)
+        if value == self.label.text:
+            return False
+        self.label.text = value
+        self.rebuilds += 1
+        return True
+
+
+class Hud:
+    """Panels, icons and labels in screen coordinates, drawn in two batched calls."""
+
+    def __init__(self, camera):
+        self.camera = camera
+        self.sprites = arcade.SpriteList()
+        self.batch = pyglet.graphics.Batch()
+        self.texts = []
+
+    def add_panel(self, center_x, center_y, width, height, color=(0, 0, 0, 128)):
+        """Semi-transparent rectangle, a sprite so it is drawn with the icons."""
+        panel = arcade.SpriteSolidColor(int(width), int(height), color[:3])
+        panel.position = center_x, center_y
+        if len(color) == 4:
+            panel.alpha = color[3]
+        self.sprites.append(panel)
+        return panel
+
+    def add_icon(self, texture, center_x, center_y, width, height):
+        icon = arcade.Sprite(texture=texture)
+        icon.position = center_x, center_y
+        icon.width = width
+        icon.height = height
+        self.sprites.append(icon)
+        return icon
+
+    def add_text(self, x, y, text="", **style):
+        widget = TextWidget(self.batch, x, y, text, **style)
+        self.texts.append(widget)
+        return widget
+
+    def draw(self):
+        self.camera.use()
+        self.sprites.draw()
+        with arcade.get_window().ctx.pyglet_rendering():
+            self.batch.draw()
+
+
+def build_game_hud(game):
+    """Apple counter with its mini apple icon in the top-left corner."""
+    hud = Hud(game.ui_camera)
+    hud.add_panel(65, game.height - 30, 100, 40)
+    hud.apple_counter = hud.add_text(20, game.height - 40)
+    hud.add_icon(game.apple_icon_texture, 80, game.height - 30, 24, 24)
+    return hud
+
+
+def update_game_hud(game):
+    game.hud.apple_counter.set(f"{game.apples_collected}/{game.total_apples}")
+
+
+def build_transition_hud(game):
+    """Level title in the middle of the transition screen, and the loading bar under it."""
+    hud = Hud(game.ui_camera)
+    hud.title_panel = hud.add_panel(game.width // 2, game.height // 2, 1, 60)
+    hud.title = hud.add_text(
+        game.width // 2, game.height // 2, font_size=36, anchor_x="center", anchor_y="center"
+    )
+    bar_width = game.width // 3
+    hud.add_panel(game.width // 2, 54, bar_width, 12)
+    hud.loading_bar = hud.add_panel(game.width // 2, 54, bar_width, 12, arcade.color.WHITE)
+    hud.loading_bar_width = bar_width
+    return hud
+
+
+def update_transition_hud(game):
+    hud = game.transition_hud
+    text = game.transition_text or ""
+    if hud.title.set(text) and text:
+        hud.title_panel.width = len(text) * 25
+    # Hidden through alpha: Sprite.visible would make the panel opaque again
+    _show(hud.title_panel, 128 if text else 0)
+    width = hud.loading_bar_width * game.level_loader.progress(game.current_level_id)
+    _show(hud.loading_bar, 255 if width > 0 else 0)
+    if width > 0 and width != hud.loading_bar.width:
+        hud.loading_bar.width = width
+        hud.loading_bar.left = (game.width - hud.loading_bar_width) // 2
+
+
+def build_profiler_hud(game):
+    """Profiler overlay: a panel in the top-right corner with monospaced lines of figures."""
+    hud = Hud(game.ui_camera)
+    hud.top = game.height - 70
+    hud.panel = hud.add_panel(game.width - 170, hud.top, 320, PROFILER_LINE_HEIGHT, (0, 0, 0, 160))
+    hud.lines = [
+        hud.add_text(game.width - 322, hud.top - PROFILER_LINE_HEIGHT * (index + 1), font_size=10, font_name="Courier New")
+        for index in range(PROFILER_LINES)
+    ]
+    # perf_counter() time from which the figures may be refreshed
+    hud.refresh_at = 0.0
+    return hud
+
+
+def update_profiler_hud(game, lines):
+    """Show the overlay's lines, the panel sized to fit them."""
+    hud = game.profiler_hud
+    lines = lines[:len(hud.lines)]
+    for widget, line in zip_longest(hud.lines, lines, fillvalue=""):
+        widget.set(line)
+    height = PROFILER_LINE_HEIGHT * len(lines) + 8
+    if hud.panel.height != height:
+        hud.panel.height = height
+        hud.panel.top = hud.top + 4
+
+
+def _show(sprite, alpha):
+    if sprite.alpha != alpha:
+        sprite.alpha = alpha
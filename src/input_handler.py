@@ -1,35 +1,47 @@
 # Input handling for Peluche Express
 import arcade
+from src.player_physics import MOVE_LEFT, MOVE_RIGHT, JUMP, CROUCH, ACTION
+
+# Keyboard layout of each local player (key -> input bit); players past these
+# have no keyboard controls
+KEY_BINDINGS = [
+    # Player 1: arrow keys
+    {arcade.key.LEFT: MOVE_LEFT, arcade.key.RIGHT: MOVE_RIGHT, arcade.key.UP: JUMP,
+     arcade.key.DOWN: CROUCH, arcade.key.SPACE: ACTION},
+    # Player 2: AWSD
+    {arcade.key.A: MOVE_LEFT, arcade.key.D: MOVE_RIGHT, arcade.key.W: JUMP,
+     arcade.key.S: CROUCH, arcade.key.E: ACTION},
+    # Player 3: IJKL
+    {arcade.key.J: MOVE_LEFT, arcade.key.L: MOVE_RIGHT, arcade.key.I: JUMP,
+     arcade.key.K: CROUCH, arcade.key.O: ACTION},
+    # Player 4: numeric keypad
+    {arcade.key.NUM_4: MOVE_LEFT, arcade.key.NUM_6: MOVE_RIGHT, arcade.key.NUM_8: JUMP,
+     arcade.key.NUM_5: CROUCH, arcade.key.NUM_0: ACTION},
+]
+BOUND_KEYS = frozenset(key for bindings in KEY_BINDINGS for key in bindings)
+
+
+def keys_to_inputs(keys, count):
+    """Input bits of the first `count` players for a set of held keys."""
+    inputs = [0] * count
+    for index, bindings in enumerate(KEY_BINDINGS[:count]):
+        for key in keys:
+            inputs[index] |= bindings.get(key, 0)
+    return inputs
+
+
+def inputs_to_keys(inputs):
+    """Keys to hold for each player's input bits (keys_to_inputs' inverse)."""
+    keys = set()
+    for bits, bindings in zip(inputs, KEY_BINDINGS):
+        keys.update(key for key, bit in bindings.items() if bits & bit)
+    return keys
+
 
 def update_player_movement(game):
-    # Player 1: Arrow keys
-    if len(game.players) > 0:
-        p1 = game.players[0]
-        engine1 = game.physics_engines[0] if len(game.physics_engines) > 0 else None
-        if arcade.key.LEFT in game.pressed_keys_p1 and arcade.key.RIGHT in game.pressed_keys_p1:
-            p1.change_x = 0
-        elif arcade.key.LEFT in game.pressed_keys_p1:
-            p1.handle_input(arcade.key.LEFT, True, physics_engine=engine1)
-        elif arcade.key.RIGHT in game.pressed_keys_p1:
-            p1.handle_input(arcade.key.RIGHT, True, physics_engine=engine1)
-        else:
-            p1.handle_input(arcade.key.LEFT, False, physics_engine=engine1)
-            p1.handle_input(arcade.key.RIGHT, False, physics_engine=engine1)
-        p1.handle_input(arcade.key.UP, arcade.key.UP in game.pressed_keys_p1, physics_engine=engine1)
-        p1.handle_input(arcade.key.DOWN, arcade.key.DOWN in game.pressed_keys_p1, physics_engine=engine1)
-        p1.handle_input(arcade.key.SPACE, arcade.key.SPACE in game.pressed_keys_p1, physics_engine=engine1)
-    if len(game.players) > 1:
-        p2 = game.players[1]
-        engine2 = game.physics_engines[1] if len(game.physics_engines) > 1 else None
-        if arcade.key.A in game.pressed_keys_p2 and arcade.key.D in game.pressed_keys_p2:
-            p2.change_x = 0
-        elif arcade.key.A in game.pressed_keys_p2:
-            p2.handle_input(arcade.key.LEFT, True, physics_engine=engine2)
-        elif arcade.key.D in game.pressed_keys_p2:
-            p2.handle_input(arcade.key.RIGHT, True, physics_engine=engine2)
-        else:
-            p2.handle_input(arcade.key.LEFT, False, physics_engine=engine2)
-            p2.handle_input(arcade.key.RIGHT, False, physics_engine=engine2)
-        p2.handle_input(arcade.key.UP, arcade.key.W in game.pressed_keys_p2, physics_engine=engine2)
-        p2.handle_input(arcade.key.DOWN, arcade.key.S in game.pressed_keys_p2, physics_engine=engine2)
-        p2.handle_input(arcade.key.SPACE, arcade.key.E in game.pressed_keys_p2, physics_engine=engine2)
+    """Hand the held keys to the players' physics as input bits."""
+    physics = game.player_physics
+    if physics is None:
+        return
+    for index, bits in enumerate(keys_to_inputs(game.pressed_keys, min(physics.count, len(KEY_BINDINGS)))):
+        physics.inputs[index] = bits
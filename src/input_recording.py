@@ -0,0 +1,174 @@
+# Input recording and replay for Peluche Express
+#
+# Game logic only depends on the players' input bits at each fixed step (see
+# clock.py): frame times, draw rate and dropped steps change how often steps
+# run, never what a step does. Recording the input bits of every step played
+# therefore reproduces a level bit for bit, windowed or headless.
+#
+# An InputLog holds one level's steps as runs of identical input: each run is a
+# step count and one bitmask byte per player (input_handler's MOVE_LEFT,
+# JUMP...). Steps are recorded from a level's start until it is left for its
+# exit ("level_exit" is a cutscene driven by the game, not by input), followed
+# by the players' final positions so a replay can check it ended in the same
+# place. On disk:
+#   header      magic, version, steps per second, players, level id length
+#   level id    UTF-8
+#   counts      steps, runs
+#   run counts  uint16 per run
+#   run masks   one byte per player per run
+#   positions   x, y float64 per player
+# A replay feeds the bits back the way the keyboard does: as held keys handed
+# to input_handler.update_player_movement before each step.
+import struct
+
+import numpy as np
+
+from src.clock import SIM_RATE
+from src.input_handler import inputs_to_keys, update_player_movement
+
+MAGIC = b"PEIN"
+VERSION = 1
+HEADER = struct.Struct("<4sHHBB")
+COUNTS = struct.Struct("<II")
+# Longest run one count holds; longer stretches of the same input take several runs
+MAX_RUN = 0xFFFF
+INPUT_LOG_EXT = ".pinput"
+
+
+def player_positions(game):
+    """The players' (x, y) as float64 bytes, what a replay must reproduce exactly."""
+    physics = game.player_physics
+    if physics is None:
+        return b""
+    return np.column_stack((physics.x, physics.y)).astype("<f8").tobytes()
+
+
+class InputLog:
+    """One level's input bits per step, run-length encoded, and where its players ended up."""
+
+    def __init__(self, level_id, players, counts, masks, positions=b"", sim_rate=SIM_RATE):
+        self.level_id = level_id
+        self.players = players
+        # Steps of each run, and each run's bits (runs x players)
+        self.counts = np.asarray(counts, dtype="<u2")
+        self.masks = np.asarray(masks, dtype=np.uint8).reshape(len(self.counts), players)
+        self.positions = positions
+        self.sim_rate = sim_rate
+
+    @property
+    def steps(self):
+        return int(self.counts.sum(dtype=np.int64))
+
+    def __iter__(self):
+        """Input bits of every step, as a list per player."""
+        for count, mask in zip(self.counts.tolist(), self.masks.tolist()):
+            for _ in range(count):
+                yield mask
+
+    def to_bytes(self):
+        level_id = self.level_id.encode("utf-8")
+        return b"".join((
+            HEADER.pack(MAGIC, VERSION, self.sim_rate, self.players, len(level_id)),
+            level_id,
+            COUNTS.pack(self.steps, len(self.counts)),
+            self.counts.tobytes(),
+            self.masks.tobytes(),
+            self.positions,
+        ))
+
+    @classmethod
+    def from_bytes(cls, blob):
+        magic, version, sim_rate, players, id_length = HEADER.unpack_from(blob)
+        if magic != MAGIC:
+            raise ValueError("Not a Peluche Express input log")
+        if version != VERSION:
+            raise ValueError(f"Input log version {version}, expected {VERSION}")
+        if sim_rate != SIM_RATE:
+            # Its steps would last a different time, so the same bits no longer replay the run
+            raise ValueError(f"Input log recorded at {sim_rate} steps per second, the game steps at {SIM_RATE}")
+        offset = HEADER.size
+        level_id = bytes(blob[offset:offset + id_length]).decode("utf-8")
+        offset += id_length
+        steps, runs = COUNTS.unpack_from(blob, offset)
+        offset += COUNTS.size
+        counts = np.frombuffer(blob, dtype="<u2", count=runs, offset=offset)
+        offset += counts.nbytes
+        masks = np.frombuffer(blob, dtype=np.uint8, count=runs * players, offset=offset)
+        offset += masks.nbytes
+        log = cls(level_id, players, counts, masks, bytes(blob[offset:offset + players * 16]), sim_rate)
+        if log.steps != steps:
+            raise ValueError(f"Input log holds {log.steps} steps, its header says {steps}")
+        return log
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+class InputRecorder:
+    """Collects the input bits of each step of a level into runs."""
+
+    def __init__(self, level_id, players):
+        self.level_id = level_id
+        self.players = players
+        self._counts = []
+        self._masks = []
+
+    def record(self, inputs):
+        """Call before each step with the bits the players' physics is about to use."""
+        mask = bytes(inputs[:self.players])
+        if self._masks and self._masks[-1] == mask and self._counts[-1] < MAX_RUN:
+            self._counts[-1] += 1
+        else:
+            self._counts.append(1)
+            self._masks.append(mask)
+
+    def finish(self, game):
+        """The InputLog of the steps recorded, ending at the game's current player positions."""
+        return InputLog(
+            self.level_id, self.players, self._counts,
+            np.frombuffer(b"".join(self._masks), dtype=np.uint8), player_positions(game),
+        )
+
+
+class InputReplay:
+    """Plays an InputLog's steps back as held keys."""
+
+    def __init__(self, log):
+        self.log = log
+        self.step = 0
+        self._steps = iter(log)
+        self._next = next(self._steps, None)
+
+    @property
+    def done(self):
+        return self._next is None
+
+    def apply(self, game):
+        """Hold the keys of the next step, as the window does on key presses and releases."""
+        if game.player_physics is None or game.player_physics.count != self.log.players:
+            players = game.player_physics.count if game.player_physics else 0
+            raise ValueError(f"Input log of {self.log.players} players replayed on a level with {players}")
+        game.pressed_keys = inputs_to_keys(self._next)
+        update_player_movement(game)
+        self.step += 1
+        self._next = next(self._steps, None)
+
+    def matches(self, game):
+        """The players are where they were at the end of the recording."""
+        return player_positions(game) == self.log.positions
+
+
+def before_step(game):
+    """Per step, while playing: feed the replay's input (if replaying), then record it (if recording)."""
+    if game.state != "game":
+        return
+    if game.input_replay is not None:
+        game.input_replay.apply(game)
+    if game.input_recorder is not None and game.player_physics is not None:
+        game.input_recorder.record(game.player_physics.inputs.tobytes())
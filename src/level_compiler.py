@@ -0,0 +1,316 @@
+# Level compiler for Peluche Express
+#
+# Turns a Tiled .tmx map (finite or infinite, with its external .tsx tilesets)
+# into the compact LevelData format of src/level_data.py and keeps compiled
+# files next to the maps in tilemaps/compiled. A compiled file records the mtime, size and hash of
+# every source it was built from; stale files are rebuilt on load. The build
+# scripts compile every level ahead of time (script/compile_levels.py), and a
+# bundled build trusts its compiled files, so the shipped game never parses XML.
+import hashlib
+import math
+import mmap
+import os
+import re
+import sys
+from pathlib import Path
+
+from src.asset_pack import packed_view, resource_exists
+from src.level_data import LevelData, GID_FLAGS
+from src.resource_utils import get_resource_path
+
+COMPILED_DIR = "tilemaps/compiled"
+
+_TILESET_SOURCE = re.compile(rb'<tileset[^>]*\ssource="([^"]+)"')
+
+
+def _relative(path):
+    root = get_resource_path("")
+    return os.path.relpath(os.path.normpath(str(path)), root).replace(os.sep, "/")
+
+
+def compiled_path(map_path):
+    """Where the compiled version of a map lives."""
+    name = os.path.splitext(os.path.basename(map_path))[0] + ".lvl"
+    return get_resource_path(f"{COMPILED_DIR}/{name}")
+
+
+def _fingerprint(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    stat = os.stat(path)
+    return {
+        "path": _relative(path),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha1": hashlib.sha1(data).hexdigest(),
+    }, data
+
+
+def _source_fingerprints(map_path):
+    """Fingerprint the map and every external tileset it references."""
+    fingerprint, data = _fingerprint(map_path)
+    sources = [fingerprint]
+    map_directory = os.path.dirname(map_path)
+    for match in _TILESET_SOURCE.finditer(data):
+        tileset_path = os.path.join(map_directory, match.group(1).decode("utf-8"))
+        sources.append(_fingerprint(tileset_path)[0])
+    return sources
+
+
+def is_fresh(level):
+    """True when none of the level's sources changed since it was compiled."""
+    for source in level.sources:
+        path = get_resource_path(source["path"])
+        if not os.path.exists(path):
+            # Sources aren't shipped; the compiled file is all there is
+            continue
+        stat = os.stat(path)
+        if stat.st_mtime_ns == source["mtime_ns"] and stat.st_size == source["size"]:
+            continue
+        # Touched (checkout, copy) but maybe not changed: fall back to the content hash
+        with open(path, "rb") as f:
+            if hashlib.sha1(f.read()).hexdigest() != source["sha1"]:
+                return False
+    return True
+
+
+def _object_shape(obj, map_pixel_height, origin=(0, 0)):
+    """The arcade-space shape for a non-tile object, matching arcade.TileMap."""
+    import pytiled_parser.tiled_object as tiled_object
+
+    x, y = obj.coordinates.x - origin[0], obj.coordinates.y - origin[1]
+    if isinstance(obj, tiled_object.Point) or (
+        isinstance(obj, tiled_object.Rectangle) and not obj.size.width and not obj.size.height
+    ):
+        return [x, map_pixel_height - y]
+    if isinstance(obj, tiled_object.Rectangle):
+        ex, ey = x + obj.size.width, y + obj.size.height
+        return [[x, -y], [ex, -y], [ex, -ey], [x, -ey]]
+    if isinstance(obj, (tiled_object.Polygon, tiled_object.Polyline)):
+        shape = [[point.x + x, map_pixel_height - (point.y + y)] for point in obj.points]
+        if shape[0] == shape[-1]:
+            shape.pop()
+        return shape
+    if isinstance(obj, tiled_object.Ellipse):
+        hw, hh = obj.size.width / 2, obj.size.height / 2
+        cx, cy = x + hw, y + hh
+        return [
+            [hw * math.cos(angle) + cx, -(hh * math.sin(angle) + cy)]
+            for angle in (step / 8 * 2 * math.pi for step in range(8))
+        ]
+    return None
+
+
+def _is_true(value):
+    return value is True or str(value).lower() == "true"
+
+
+def _chunk_extent(map_layers):
+    """First column and row, width and height (in tiles) of the chunks of an infinite map's tile layers."""
+    import pytiled_parser
+
+    left = top = math.inf
+    right = bottom = -math.inf
+
+    def _walk(layers):
+        nonlocal left, top, right, bottom
+        for layer in layers:
+            if isinstance(layer, pytiled_parser.LayerGroup):
+                _walk(layer.layers)
+            elif isinstance(layer, pytiled_parser.TileLayer):
+                for chunk in layer.chunks or ():
+                    left = min(left, chunk.coordinates.x)
+                    top = min(top, chunk.coordinates.y)
+                    right = max(right, chunk.coordinates.x + chunk.size.width)
+                    bottom = max(bottom, chunk.coordinates.y + chunk.size.height)
+
+    _walk(map_layers)
+    if left == math.inf:
+        return 0, 0, 0, 0
+    return int(left), int(top), int(right - left), int(bottom - top)
+
+
+def _chunked_tiles(layer, first_column, first_row, width, height):
+    """Flat row-major gids of an infinite map's tile layer, its chunks placed in the map's extent."""
+    flat = [0] * (width * height)
+    for chunk in layer.chunks or ():
+        for row_index, row in enumerate(chunk.data):
+            start = (chunk.coordinates.y - first_row + row_index) * width + chunk.coordinates.x - first_column
+            flat[start:start + len(row)] = row
+    return flat
+
+
+def compile_level(map_path):
+    """
+    Parse a .tmx map and return its LevelData.
+
+    An infinite map becomes the smallest finite one holding all its chunks,
+    with its objects moved along.
+    """
+    import pytiled_parser
+
+    tiled_map = pytiled_parser.parse_map(Path(map_path))
+    map_directory = os.path.dirname(map_path)
+    tile_width = tiled_map.tile_size.width
+    tile_height = tiled_map.tile_size.height
+    if tiled_map.infinite:
+        first_column, first_row, width, height = _chunk_extent(tiled_map.layers)
+    else:
+        first_column = first_row = 0
+        width = tiled_map.map_size.width
+        height = tiled_map.map_size.height
+    map_pixel_height = height * tile_height
+    # Where the map's top-left tile is in Tiled's pixel coordinates
+    origin = (first_column * tile_width, first_row * tile_height)
+
+    used_gids = set()
+    layers = []
+    layer_data = {}
+
+    def _walk(map_layers):
+        for layer in map_layers:
+            if isinstance(layer, pytiled_parser.LayerGroup):
+                _walk(layer.layers)
+                continue
+            properties = dict(layer.properties or {})
+            common = {
+                "name": layer.name,
+                "visible": layer.visible,
+                "opacity": layer.opacity if layer.opacity is not None else 1.0,
+                "properties": properties,
+                "collides": _is_true(properties.get("collides", False)),
+            }
+            if isinstance(layer, pytiled_parser.TileLayer):
+                if tiled_map.infinite:
+                    flat = _chunked_tiles(layer, first_column, first_row, width, height)
+                else:
+                    flat = [gid for row in (layer.data or []) for gid in row]
+                used_gids.update(gid & ~GID_FLAGS for gid in flat if gid)
+                layer_data[layer.name] = flat
+                layers.append(dict(common, kind="tiles"))
+            elif isinstance(layer, pytiled_parser.ObjectLayer):
+                objects = []
+                for obj in layer.tiled_objects:
+                    record = {
+                        "id": obj.id,
+                        "name": obj.name,
+                        "type": obj.class_,
+                        "properties": dict(obj.properties or {}),
+                    }
+                    if isinstance(obj, pytiled_parser.tiled_object.Tile):
+                        used_gids.add(obj.gid & ~GID_FLAGS)
+                        record.update(
+                            kind="tile",
+                            gid=obj.gid,
+                            x=obj.coordinates.x - origin[0],
+                            y=map_pixel_height - (obj.coordinates.y - origin[1]),
+                            w=obj.size.width,
+                            h=obj.size.height,
+                            rotation=obj.rotation or 0,
+                        )
+                    else:
+                        shape = _object_shape(obj, map_pixel_height, origin)
+                        if shape is None:
+                            continue
+                        record.update(kind="shape", shape=shape)
+                    objects.append(record)
+                layers.append(dict(common, kind="objects", objects=objects))
+
+    _walk(tiled_map.layers)
+
+    tiles = {}
+    firstgids = sorted(tiled_map.tilesets)
+    for gid in sorted(used_gids):
+        firstgid = max((f for f in firstgids if f <= gid), default=None)
+        if firstgid is None:
+            raise ValueError(f"Couldn't find tile for gid {gid} in '{map_path}'")
+        tileset = tiled_map.tilesets[firstgid]
+        tile_id = gid - firstgid
+        tile = tileset.tiles.get(tile_id) if tileset.tiles else None
+        if tileset.image is not None and (tile is None or tile.image is None):
+            # Tile cut out of a single tileset image
+            margin = tileset.margin or 0
+            spacing = tileset.spacing or 0
+            row, column = divmod(tile_id, tileset.columns)
+            image = tileset.image
+            x = margin + column * (tileset.tile_width + spacing)
+            y = margin + row * (tileset.tile_height + spacing)
+            w, h = tileset.tile_width, tileset.tile_height
+        elif tile is not None and tile.image is not None:
+            image = tile.image
+            x, y, w, h = tile.x, tile.y, tile.width, tile.height
+        else:
+            raise ValueError(f"Tile {gid} in '{map_path}' has no image")
+        if not os.path.isabs(image):
+            image = os.path.join(map_directory, image)
+        tiles[str(gid)] = {"id": tile_id, "image": _relative(image), "x": x, "y": y, "w": w, "h": h}
+
+    spawns = {}
+    end_zone_xs = []
+    for layer in layers:
+        if layer["kind"] != "objects":
+            continue
+        for obj in layer["objects"]:
+            if obj["kind"] != "shape" or not isinstance(obj["shape"][0], (int, float)):
+                continue
+            if layer["name"] == "Spawns" and obj["name"]:
+                spawns[obj["name"]] = obj["shape"]
+            elif layer["name"] == "EndZone":
+                end_zone_xs.append(obj["shape"][0])
+
+    meta = {
+        "width": width,
+        "height": height,
+        "tile_width": tile_width,
+        "tile_height": tile_height,
+        "infinite": bool(tiled_map.infinite),
+        "tiles": tiles,
+        "layers": layers,
+        "spawns": spawns,
+        "end_zone_avg_x": sum(end_zone_xs) / len(end_zone_xs) if end_zone_xs else None,
+        "sources": _source_fingerprints(map_path),
+    }
+    return LevelData(meta, layer_data)
+
+
+def write_compiled(level, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(level.to_bytes())
+    os.replace(tmp_path, path)
+
+
+def read_compiled(path, mapped=False):
+    """LevelData of a compiled file; mapped leaves the tile layers in a memory map instead of reading them."""
+    view = packed_view(path)
+    if view is not None:
+        # Already mapped with the rest of the asset archive
+        return LevelData.from_bytes(view, copy=not mapped)
+    with open(path, "rb") as f:
+        if mapped:
+            return LevelData.from_bytes(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), copy=False)
+        return LevelData.from_bytes(f.read())
+
+
+def load_level_data(map_path, mapped=False):
+    """
+    Return LevelData for a map, from its compiled file when that is fresh.
+
+    A missing or stale compiled file is rebuilt from the .tmx and written back
+    (best effort: a read-only install just compiles in memory).
+    """
+    path = compiled_path(map_path)
+    if resource_exists(path):
+        try:
+            level = read_compiled(path, mapped)
+        except ValueError:
+            level = None
+        if level is not None and (getattr(sys, "frozen", False) or is_fresh(level)):
+            return level
+    level = compile_level(map_path)
+    try:
+        write_compiled(level, path)
+    except OSError:
+        pass
+    return level
@@ -0,0 +1,257 @@
+# Compiled level data for Peluche Express
+#
+# A compiled level (.lvl) holds everything gameplay needs from a Tiled map:
+# tile layers as flat uint32 gid arrays, the tile table, object layers with
+# coordinates already converted to arcade's y-up space, the resolved spawns and
+# end-zone position, and the collision flags. Reading one is a single file read
+# plus a small JSON header; no XML is parsed. See src/level_compiler.py.
+import json
+import struct
+import sys
+from array import array
+from collections import OrderedDict
+
+import arcade
+from arcade.arcade_types import TiledObject
+from arcade.geometry_generic import rotate_point
+
+from src.resource_utils import get_resource_path
+from src.textures import texture_registry
+
+MAGIC = b"PLVL"
+VERSION = 1
+_HEADER = struct.Struct("<4sHI")
+
+_FLIPPED_HORIZONTALLY_FLAG = 0x80000000
+_FLIPPED_VERTICALLY_FLAG = 0x40000000
+_FLIPPED_DIAGONALLY_FLAG = 0x20000000
+GID_FLAGS = 0xE0000000
+
+
+class LevelData:
+    """Everything gameplay reads from a level map, in compact form."""
+
+    def __init__(self, meta, layer_data):
+        self.meta = meta
+        self.width = meta["width"]
+        self.height = meta["height"]
+        self.tile_width = meta["tile_width"]
+        self.tile_height = meta["tile_height"]
+        # gid -> {"id", "image": project-relative path, "x", "y", "w", "h"}
+        self.tiles = {int(gid): tile for gid, tile in meta["tiles"].items()}
+        self.layers = meta["layers"]
+        # Tile layer name -> flat row-major array('I') (or 'I' memoryview) of gids (row 0 is the top row)
+        self.layer_data = layer_data
+        self.spawns = {name: tuple(pos) for name, pos in meta["spawns"].items()}
+        self.end_zone_avg_x = meta["end_zone_avg_x"]
+        self.sources = meta["sources"]
+        # Platform navigation of the dogs, built from the collidable layers on first use (src/navigation.py)
+        self.nav_graph = None
+
+    @property
+    def collidable_layer_names(self):
+        return [layer["name"] for layer in self.layers if layer.get("collides")]
+
+    def object_layer(self, name):
+        for layer in self.layers:
+            if layer["kind"] == "objects" and layer["name"] == name:
+                return layer["objects"]
+        return []
+
+    def tile_image_paths(self):
+        """Absolute image paths (texture cache names) for every tile the level places."""
+        return sorted({get_resource_path(tile["image"]) for tile in self.tiles.values()})
+
+    def to_bytes(self):
+        meta = dict(self.meta)
+        chunks = []
+        offset = 0
+        for layer in meta["layers"]:
+            if layer["kind"] != "tiles":
+                continue
+            data = array("I", self.layer_data[layer["name"]])
+            if sys.byteorder != "little":
+                data.byteswap()
+            raw = data.tobytes()
+            layer["offset"] = offset
+            layer["count"] = len(data)
+            chunks.append(raw)
+            offset += len(raw)
+        meta_bytes = json.dumps(meta, separators=(",", ":")).encode("utf-8")
+        return _HEADER.pack(MAGIC, VERSION, len(meta_bytes)) + meta_bytes + b"".join(chunks)
+
+    @classmethod
+    def from_bytes(cls, blob, copy=True):
+        """
+        Read a compiled level. With copy=False the tile layers stay views into
+        blob (a memory-mapped file, read only where tiles are looked up).
+        """
+        magic, version, meta_len = _HEADER.unpack_from(blob, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a compiled level of the current version")
+        start = _HEADER.size
+        meta = json.loads(bytes(blob[start:start + meta_len]).decode("utf-8"))
+        base = start + meta_len
+        layer_data = {}
+        for layer in meta["layers"]:
+            if layer["kind"] != "tiles":
+                continue
+            data = array("I")
+            begin = base + layer["offset"]
+            end = begin + layer["count"] * data.itemsize
+            if not copy and sys.byteorder == "little":
+                layer_data[layer["name"]] = memoryview(blob)[begin:end].cast("I")
+                continue
+            data.frombytes(blob[begin:end])
+            if sys.byteorder != "little":
+                data.byteswap()
+            layer_data[layer["name"]] = data
+        return cls(meta, layer_data)
+
+
+def _tile_sprite(level, gid, scaling, owner=None):
+    tile = level.tiles[gid & ~GID_FLAGS]
+    texture = texture_registry.get(
+        get_resource_path(tile["image"]),
+        flipped_horizontally=bool(gid & _FLIPPED_HORIZONTALLY_FLAG),
+        flipped_vertically=bool(gid & _FLIPPED_VERTICALLY_FLAG),
+        flipped_diagonally=bool(gid & _FLIPPED_DIAGONALLY_FLAG),
+        crop=(tile["x"], tile["y"], tile["w"], tile["h"]),
+        owner=owner,
+    )
+    sprite = arcade.Sprite(texture=texture, scale=scaling)
+    sprite.properties["tile_id"] = tile["id"]
+    return sprite
+
+
+class CompiledTileMap:
+    """
+    Sprite lists and objects built from LevelData.
+
+    Exposes the parts of arcade.TileMap the game uses (sizes, sprite_lists,
+    object_lists) so it works with arcade.Scene.from_tilemap. A streamed map
+    starts with every list empty (gameplay.scene_from_tile_map keeps them in
+    the scene); src/level_streaming.py fills them a chunk of columns at a time
+    with tile_sprites(), object_sprite() and object_shape().
+    """
+
+    def __init__(self, level, scaling=1.0, owner=None, streamed=False):
+        self.level = level
+        # Texture registry owner of the tile textures (the level id in game)
+        self.owner = owner
+        self.width = level.width
+        self.height = level.height
+        self.tile_width = level.tile_width
+        self.tile_height = level.tile_height
+        self.scaling = scaling
+        self.streamed = streamed
+        self.sprite_lists = OrderedDict()
+        self.object_lists = OrderedDict()
+        # One parallel decode of every tile image (a no-op when the level loader already did it)
+        texture_registry.preload(level.tile_image_paths())
+        for layer in level.layers:
+            if layer["kind"] == "tiles":
+                sprite_list = self._layer_sprite_list(layer)
+                if not streamed:
+                    sprite_list.extend(self.tile_sprites(layer, 0, level.width - 1))
+                self.sprite_lists[layer["name"]] = sprite_list
+            else:
+                sprite_list, objects = self._build_object_layer(layer)
+                if sprite_list is not None:
+                    self.sprite_lists[layer["name"]] = sprite_list
+                if objects is not None:
+                    self.object_lists[layer["name"]] = objects
+
+    @staticmethod
+    def _layer_sprite_list(layer):
+        sprite_list = arcade.SpriteList()
+        sprite_list.visible = layer["visible"]
+        if layer["properties"]:
+            sprite_list.properties = layer["properties"]
+        return sprite_list
+
+    def tile_sprites(self, layer, first_column, last_column):
+        """Sprites of a tile layer's tiles in columns first_column to last_column."""
+        level = self.level
+        scaling = self.scaling
+        data = level.layer_data[layer["name"]]
+        sprites = []
+        for row in range(level.height):
+            start = row * level.width
+            for column, gid in enumerate(data[start + first_column:start + last_column + 1], first_column):
+                if not gid:
+                    continue
+                sprite = _tile_sprite(level, gid, scaling, self.owner)
+                sprite.center_x = column * level.tile_width * scaling + sprite.width / 2
+                sprite.center_y = (level.height - row - 1) * level.tile_height * scaling + sprite.height / 2
+                if layer["opacity"] < 1:
+                    sprite.alpha = int(layer["opacity"] * 255)
+                sprites.append(sprite)
+        return sprites
+
+    def object_sprite(self, layer, obj):
+        """Sprite of a tile object."""
+        scaling = self.scaling
+        sprite = _tile_sprite(self.level, obj["gid"], scaling, self.owner)
+        sprite.width = width = obj["w"] * scaling
+        sprite.height = height = obj["h"] * scaling
+        angle = -obj["rotation"]
+        rotated_x, rotated_y = rotate_point(width / 2, height / 2, 0, 0, angle)
+        sprite.position = (obj["x"] * scaling + rotated_x, obj["y"] * scaling + rotated_y)
+        sprite.angle = angle
+        if layer["opacity"] < 1:
+            sprite.alpha = int(layer["opacity"] * 255)
+        sprite.properties.update(obj["properties"])
+        if obj["type"]:
+            sprite.properties["type"] = obj["type"]
+        if obj["name"]:
+            sprite.properties["name"] = obj["name"]
+        return sprite
+
+    def reset_objects(self):
+        """Refill the object layers as first built, bringing back picked-up items (not for streamed maps)."""
+        for layer in self.level.layers:
+            if layer["kind"] != "objects":
+                continue
+            sprite_list = self.sprite_lists.get(layer["name"])
+            objects = self.object_lists.get(layer["name"])
+            if sprite_list is not None:
+                sprite_list.clear()
+            if objects is not None:
+                objects.clear()
+            for obj in layer["objects"]:
+                if obj["kind"] == "tile":
+                    sprite_list.append(self.object_sprite(layer, obj))
+                else:
+                    objects.append(self.object_shape(obj))
+
+    def object_shape(self, obj):
+        """TiledObject of a shape (point, rectangle, polygon...) object."""
+        return TiledObject(_scale_shape(obj["shape"], self.scaling), obj["properties"], obj["name"], obj["type"])
+
+    def _build_object_layer(self, layer):
+        """The layer's sprite list (None without tile objects) and shape objects (None without any)."""
+        sprite_list = None
+        objects = None
+        for obj in layer["objects"]:
+            if obj["kind"] == "tile":
+                if sprite_list is None:
+                    sprite_list = arcade.SpriteList()
+                    sprite_list.visible = layer["visible"]
+                if not self.streamed:
+                    sprite_list.append(self.object_sprite(layer, obj))
+            else:
+                if objects is None:
+                    objects = []
+                if not self.streamed:
+                    objects.append(self.object_shape(obj))
+        return sprite_list, objects
+
+
+def _scale_shape(shape, scaling):
+    """Scale a point [x, y] or a list of points."""
+    if scaling == 1.0:
+        return shape
+    if shape and isinstance(shape[0], (int, float)):
+        return [coord * scaling for coord in shape]
+    return [[x * scaling, y * scaling] for x, y in shape]
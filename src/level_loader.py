@@ -0,0 +1,93 @@
+# Background level loading for Peluche Express
+#
+# File I/O, compiled-level reading, PNG decoding and the dogs' navigation graph
+# for a level run on a worker thread while the transition screen is up (or
+# while the previous level is being played); the level's images are decoded
+# in parallel on the texture-decode threads.
+# The main thread only installs the decoded textures and builds the sprites.
+from concurrent.futures import ThreadPoolExecutor
+
+from src.atlas import decode_texture_images, load_atlas
+from src.backgrounds import background_image_paths
+from src.dogs import dog_positions
+from src.level_compiler import load_level_data
+from src.level_streaming import stream_settings
+from src.navigation import level_nav_graph
+from src.resource_utils import get_resource_path
+
+
+class LevelLoad:
+    """A level being prepared in the background."""
+
+    def __init__(self, level_id):
+        self.level_id = level_id
+        self.progress = 0.0
+        self.future = None
+
+    def done(self):
+        return self.future is not None and self.future.done()
+
+
+def prepare_level(level, load):
+    """Worker-thread half of a level load: read the compiled map and decode its images."""
+    load_atlas()
+    textures = decode_texture_images(background_image_paths(level), include_loose=True)
+    # Backgrounds are drawn as quads, never used for collisions
+    textures = [(name, image, None) for name, image, _ in textures]
+    load.progress = 0.2
+
+    # Tile layers stay memory-mapped: a streamed level only reads the chunks it makes live
+    level_data = load_level_data(get_resource_path(level["map"]), mapped=True)
+    load.progress = 0.5
+
+    def tiles_progress(done):
+        load.progress = 0.5 + 0.4 * done
+
+    # Decoded in parallel on the texture-decode threads (src/atlas.py)
+    textures.extend(decode_texture_images(level_data.tile_image_paths(), include_loose=True, progress=tiles_progress))
+    load.progress = 0.9
+    if dog_positions(level_data):
+        # The dogs' platform graph, so entering the level doesn't build it (a streamed level's
+        # spans only: its stream links them chunk by chunk)
+        level_nav_graph(level_data, linked=stream_settings(level, level_data) is None)
+    return {"level_data": level_data, "textures": textures}
+
+
+class LevelLoader:
+    """Prepares levels on a single worker thread and keeps them until they are taken."""
+
+    def __init__(self, levels):
+        self.levels = levels
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="level-loader")
+        self._loads = {}
+
+    def request(self, level_id):
+        """Start preparing a level (no-op if it is already in flight) and return its load."""
+        load = self._loads.get(level_id)
+        if load is None:
+            load = LevelLoad(level_id)
+            load.future = self._executor.submit(prepare_level, self.levels[level_id], load)
+            self._loads[level_id] = load
+        return load
+
+    def prefetch(self, level_id):
+        """Prepare a level ahead of time if it is a playable one."""
+        level = self.levels.get(level_id) if level_id else None
+        if level and level.get("type") == "level":
+            self.request(level_id)
+
+    def progress(self, level_id):
+        load = self._loads.get(level_id)
+        return load.progress if load else 0.0
+
+    def is_ready(self, level_id):
+        load = self._loads.get(level_id)
+        return load is not None and load.done()
+
+    def take(self, level_id):
+        """Hand over a finished load; re-raises anything the worker raised."""
+        load = self._loads.pop(level_id)
+        return load.future.result()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -1,43 +1,67 @@
 # Level management for Peluche Express
 import arcade
-import json
+from src.asset_pack import load_json
 from src.resource_utils import get_resource_path
 from src.player import Player
+from src.textures import texture_registry
+from src.backgrounds import BackgroundLayer, ParallaxBackground
 
 def load_levels_config():
-    config_path = get_resource_path("config/levels.json")
-    with open(config_path, "r", encoding="utf-8") as f:
-        levels_list = json.load(f)
+    levels_list = load_json(get_resource_path("config/levels.json"))
     return {level["id"]: level for level in levels_list}
 
 def reset_gameplay_state(game):
-    game.map_bg_texture = None
+    game.map_background = None
     game.tile_map = None
     game.scene = None
+    game.tile_chunks = None
+    game.level_stream = None
     game.players = []
-    game.physics_engines = []
+    game.dogs = None
+    game.player_physics = None
     game.end_zone_sprites = None
-    game.end_zone_avg_x = None
+    game.triggers = None
+    game.collectibles = None
     game.apples_collected = 0
     game.total_apples = 0
-    game.pressed_keys_p1.clear()
-    game.pressed_keys_p2.clear()
+    game.pressed_keys.clear()
+
+def set_screen_background(game, background_path):
+    """Still, screen-sized background of the main/end and transition screens."""
+    texture = texture_registry.get(get_resource_path(background_path), owner=game.texture_owner)
+    game.screen_background = ParallaxBackground(game.ctx, [BackgroundLayer(texture, 0.0)], game.height)
+
+def prefetch_level(game, level_id):
+    """Prepare a level ahead of time, unless it is still built from an earlier visit."""
+    if level_id not in game.level_residency:
+        game.level_loader.prefetch(level_id)
 
 def load_current_level(game):
+    # The previous level's textures are only dropped (texture_registry.trim) once
+    # this one holds its own, so the ones they share are never reloaded; a level
+    # kept by game.level_residency holds them until it is evicted
+    if game.texture_owner not in game.level_residency:
+        texture_registry.release(game.texture_owner)
+    game.texture_owner = game.current_level_id
     game.end_zone_sprites = arcade.SpriteList()
-    game.end_zone_avg_x = None
+    game.triggers = None
     level = game.levels[game.current_level_id]
     if level["type"] == "screen":
         game.state = "main_screen"
-        game.background_texture = arcade.load_texture(get_resource_path(level["background"]))
+        set_screen_background(game, level["background"])
         game.camera.move_to((0, 0), 1.0)
         reset_gameplay_state(game)
+        texture_registry.trim(game.ctx.default_atlas)
+        prefetch_level(game, level.get("next"))
     elif level["type"] == "level":
         game.transition_text = level.get("Description", "")
         assert "Description" in level, "Level must have a Description for transition text"
         background_path = level.get("background")
         assert background_path, "Background texture must be specified"
-        game.background_texture = arcade.load_texture(get_resource_path(background_path))
+        set_screen_background(game, background_path)
+        # Parse and decode the level in the background while the transition screen shows
+        if game.current_level_id not in game.level_residency:
+            game.level_loader.request(game.current_level_id)
         game.state = "transition_screen"
         game.transition_timer = 0
         game.camera.move_to((0, 0), 1.0)
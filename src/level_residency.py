@@ -0,0 +1,150 @@
+# Level residency for Peluche Express
+#
+# The level chain in config/levels.json loops (start -> Forest -> snowmountain ->
+# Castle -> end -> start), so in kiosk play every level comes back each lap.
+# LevelResidency keeps up to `max_levels` built levels (their LevelData, tile
+# map with its sprite lists, drawing chunks, collision hulls, background and
+# the textures they hold in the texture registry) in least-recently-used order.
+# Entering a resident level only rebuilds what a visit changes: its objects
+# (picked-up items come back), players, goals and physics
+# (gameplay.enter_resident_level).
+#
+# Each level's CPU and GPU bytes are estimated when it is added. Past
+# `max_levels`, or once the resident levels add up to more than `budget_bytes`,
+# the least recently used ones are evicted: their texture owner is released and
+# the game's texture_registry.trim() then drops what no other level shares, from
+# arcade's texture cache and the GPU atlas alike. Memory then stays bounded
+# however many laps are played. Streamed levels build their chunks as they play
+# anyway and are not kept.
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from src.textures import texture_registry
+
+RESIDENT_LEVELS = 3
+RESIDENT_BUDGET = 256 * 2**20
+
+# Python heap of one tile or object sprite (arcade.Sprite, its properties and
+# hit box), measured with tracemalloc on whole-level loads
+SPRITE_CPU_BYTES = 4500
+# Per sprite slot of a SpriteList: CPU arrays (position, size, angle, color,
+# texture, index) and, once drawn, the matching GPU buffers
+SLOT_CPU_BYTES = 32
+SLOT_GPU_BYTES = 44
+
+ResidentLevel = namedtuple(
+    "ResidentLevel",
+    ["level_data", "tile_map", "tile_chunks", "collision_grid", "solid", "map_background", "cpu_bytes", "gpu_bytes"],
+)
+
+
+def _array_bytes(obj):
+    """Bytes of the NumPy arrays held directly by an object (collision grid, hulls...)."""
+    if obj is None:
+        return 0
+    total = 0
+    for value in vars(obj).values():
+        if isinstance(value, np.ndarray):
+            total += value.nbytes
+        elif isinstance(value, tuple):
+            total += sum(item.nbytes for item in value if isinstance(item, np.ndarray))
+    return total
+
+
+def _sprite_list_bytes(sprite_list):
+    """(CPU, GPU) bytes of a SpriteList's buffers."""
+    capacity = sprite_list._buf_capacity
+    gpu = capacity * SLOT_GPU_BYTES if sprite_list._sprite_pos_buf is not None else 0
+    return capacity * SLOT_CPU_BYTES, gpu
+
+
+def resident_level(game, level_data):
+    """A ResidentLevel of the level the game just built, with its estimated memory."""
+    tile_map = game.tile_map
+    sprites = sum(len(sprite_list) for sprite_list in tile_map.sprite_lists.values())
+    cpu = sprites * SPRITE_CPU_BYTES
+    gpu = 0
+    for sprite_list in list(tile_map.sprite_lists.values()) + game.tile_chunks.chunk_lists():
+        list_cpu, list_gpu = _sprite_list_bytes(sprite_list)
+        cpu += list_cpu
+        gpu += list_gpu
+    cpu += sum(len(data) * 4 for data in level_data.layer_data.values())
+    solid = game.player_physics.level if game.player_physics else None
+    cpu += _array_bytes(getattr(game, "collision_grid", None))
+    if solid is not getattr(game, "collision_grid", None):
+        # Batched physics' LevelHulls (a few players collide with the grid itself)
+        cpu += _array_bytes(solid)
+    # Decoded images in RAM, and their copy in the GPU atlas / background textures
+    image_bytes = texture_registry.owner_bytes(game.current_level_id)
+    cpu += image_bytes
+    gpu += image_bytes
+    return ResidentLevel(
+        level_data, tile_map, game.tile_chunks, getattr(game, "collision_grid", None), solid,
+        game.map_background, cpu, gpu,
+    )
+
+
+class LevelResidency:
+    """Built levels kept for re-entry, least recently used first, within a count and a byte budget."""
+
+    def __init__(self, max_levels=RESIDENT_LEVELS, budget_bytes=RESIDENT_BUDGET):
+        self.max_levels = max_levels
+        self.budget_bytes = budget_bytes
+        self._levels = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, level_id):
+        return level_id in self._levels
+
+    def get(self, level_id):
+        """The resident level (now the most recently used), or None."""
+        resident = self._levels.get(level_id)
+        if resident is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._levels.move_to_end(level_id)
+        return resident
+
+    def add(self, level_id, resident):
+        """Keep a built level (its textures stay held by its owner, the level id) and evict past the limits."""
+        self._levels[level_id] = resident
+        self._levels.move_to_end(level_id)
+        self.evict_over_budget(keep=level_id)
+
+    def evict_over_budget(self, keep=None):
+        """Evict least recently used levels (never `keep`) until within max_levels and budget_bytes."""
+        for level_id in list(self._levels):
+            if len(self._levels) <= self.max_levels and self.total_bytes() <= self.budget_bytes:
+                break
+            if level_id != keep:
+                self.evict(level_id)
+
+    def evict(self, level_id):
+        """Forget a level and release its textures (texture_registry.trim() frees what nothing else holds)."""
+        if self._levels.pop(level_id, None) is None:
+            return
+        texture_registry.release(level_id)
+        self.evictions += 1
+
+    def clear(self):
+        for level_id in list(self._levels):
+            self.evict(level_id)
+
+    def total_bytes(self):
+        return sum(resident.cpu_bytes + resident.gpu_bytes for resident in self._levels.values())
+
+    def stats(self):
+        return {
+            "levels": list(self._levels),
+            "max_levels": self.max_levels,
+            "cpu_bytes": sum(resident.cpu_bytes for resident in self._levels.values()),
+            "gpu_bytes": sum(resident.gpu_bytes for resident in self._levels.values()),
+            "budget_bytes": self.budget_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,220 @@
+# Level streaming for Peluche Express
+#
+# A level normally becomes sprites all at once when it starts, so its load time
+# and memory grow with the map's length. A streamed level (maps of
+# STREAM_MIN_COLUMNS or more, Tiled infinite maps, or any level with
+# "streaming" set in config/levels.json) starts empty and is made live a chunk
+# of CHUNK_TILES columns at a time:
+#  - the chunks the camera shows, and the ones around each player, right away
+#  - up to `look_ahead` chunks past either side of the view, one per update,
+#    while fewer than `max_sprites` tile and object sprites are live
+#  - chunks more than `keep_behind` chunks beyond that are released, and past
+#    the sprite budget the farthest of those go first
+# Load time and resident sprites then follow the window width, not the map
+# length.
+#
+# A chunk's tiles are read straight from the level's gid arrays (memory-mapped
+# by the level loader, so only the pages chunks touch are read), its collidable
+# tiles go into what the players collide with (a CollisionGrid for a few
+# players, LevelHulls for the batched physics of many, see player_physics.py)
+# and the objects of every object layer
+# (Spawns, Apples, EndZone...) filed under it by x come and go with it. Items
+# picked up stay gone when their chunk comes back. The dogs' NavGraph gets the
+# links of a chunk's columns the first time it is made live, rather than the
+# whole map's when the level loads.
+import math
+from collections import namedtuple
+
+import arcade
+
+from src.grid_physics import CollisionGrid
+from src.player_physics import LevelHulls
+from src.tile_chunks import CHUNK_TILES, ChunkedTileLayers, static_tile_layer_names
+
+# Maps at least this many columns wide stream unless their level says otherwise
+STREAM_MIN_COLUMNS = 512
+
+# chunk_tiles: columns per chunk; look_ahead: chunks loaded past either side of
+# the view; keep_behind: further chunks kept before releasing; max_sprites:
+# live tile and object sprites past which no more chunks are loaded ahead
+StreamSettings = namedtuple(
+    "StreamSettings",
+    ["chunk_tiles", "look_ahead", "keep_behind", "max_sprites"],
+    defaults=(CHUNK_TILES, 2, 2, 4000),
+)
+
+# What a live chunk made: (source list, chunk list) per tile layer, (layer name,
+# object index, sprite) per tile object, (layer name, TiledObject) per shape
+LiveChunk = namedtuple("LiveChunk", ["tiles", "objects", "shapes", "sprite_count"])
+
+
+def stream_settings(level, level_data):
+    """
+    StreamSettings for a level, or None to load it whole.
+
+    A level's "streaming" entry is true, false, or the StreamSettings fields to
+    change ({"look_ahead": 3, "max_sprites": 2500}); without one, long and
+    infinite maps stream.
+    """
+    option = level.get("streaming")
+    if option is None:
+        if level_data.width < STREAM_MIN_COLUMNS and not level_data.meta.get("infinite"):
+            return None
+        return StreamSettings()
+    if option is True:
+        return StreamSettings()
+    if not option:
+        return None
+    return StreamSettings()._replace(**option)
+
+
+def _object_x(obj):
+    if obj["kind"] == "tile":
+        return obj["x"]
+    shape = obj["shape"]
+    if isinstance(shape[0], (int, float)):
+        return shape[0]
+    return min(x for x, _ in shape)
+
+
+class LevelStream:
+    """The chunks of a streamed level that are live, made and released around the view and the players."""
+
+    def __init__(self, tile_map, collectibles, settings, nav_graph=None, batched=True):
+        level = tile_map.level
+        scaling = tile_map.scaling
+        self.tile_map = tile_map
+        self.collectibles = collectibles
+        self.settings = settings
+        self.chunk_width = settings.chunk_tiles * level.tile_width * scaling
+        self.chunk_count = max(1, math.ceil(level.width / settings.chunk_tiles))
+        # Drawn like a whole level, the live chunks' sprite lists handed to tile_chunks
+        self.tile_chunks = ChunkedTileLayers(tile_map, static_tile_layer_names(level), settings.chunk_tiles)
+        # Solid tiles of the live chunks, what the players collide with
+        if batched:
+            self.solid = LevelHulls(level.width, level.tile_width * scaling)
+        else:
+            self.solid = CollisionGrid(level.width, level.height, level.tile_width * scaling, level.tile_height * scaling)
+        # The dogs' navigation graph, linked chunk by chunk (None without dogs)
+        self.nav_graph = nav_graph
+        self._collidable = set(level.collidable_layer_names)
+        # chunk -> [(layer, object index, object)]
+        self._objects = {}
+        for layer in level.layers:
+            if layer["kind"] != "objects":
+                continue
+            for number, obj in enumerate(layer["objects"]):
+                chunk = self._chunk_at(_object_x(obj) * scaling)
+                self._objects.setdefault(chunk, []).append((layer, number, obj))
+        # (layer name, object index) of items picked up
+        self._gone = set()
+        self.live = {}
+        self.sprite_count = 0
+
+    def _chunk_at(self, x):
+        return min(self.chunk_count - 1, max(0, int(x // self.chunk_width)))
+
+    def update(self, view_left, view_right, player_xs=(), build_ahead=1):
+        """
+        Make live the chunks the view [view_left, view_right] and the players
+        need, build_ahead of the missing look-ahead chunks, and release the
+        chunks left well behind.
+        """
+        settings = self.settings
+        first, last = self._chunk_at(view_left), self._chunk_at(view_right)
+        needed = set(range(first, last + 1))
+        for x in player_xs:
+            chunk = self._chunk_at(x)
+            needed.update(range(max(0, chunk - 1), min(self.chunk_count - 1, chunk + 1) + 1))
+        for chunk in sorted(needed.difference(self.live)):
+            self._build(chunk)
+
+        def distance(chunk):
+            return max(first - chunk, chunk - last, 0)
+
+        ahead_first = max(0, first - settings.look_ahead)
+        ahead_last = min(self.chunk_count - 1, last + settings.look_ahead)
+        missing = sorted((chunk for chunk in range(ahead_first, ahead_last + 1) if chunk not in self.live), key=distance)
+        for chunk in missing[:build_ahead]:
+            if self.sprite_count >= settings.max_sprites:
+                break
+            self._build(chunk)
+
+        # Chunks past the look-ahead (and the players') are kept for keep_behind more, or within the budget
+        spare = sorted(
+            (chunk for chunk in self.live if chunk not in needed and not ahead_first <= chunk <= ahead_last),
+            key=distance,
+            reverse=True,
+        )
+        for chunk in spare:
+            if distance(chunk) <= settings.look_ahead + settings.keep_behind and self.sprite_count <= settings.max_sprites:
+                continue
+            self._release(chunk)
+
+    def _build(self, chunk):
+        tile_map = self.tile_map
+        level = tile_map.level
+        first_column = chunk * self.settings.chunk_tiles
+        last_column = min(level.width, first_column + self.settings.chunk_tiles) - 1
+        live = LiveChunk([], [], [], 0)
+        sprite_count = 0
+        polygons = []
+        for layer in level.layers:
+            if layer["kind"] != "tiles":
+                continue
+            sprites = tile_map.tile_sprites(layer, first_column, last_column)
+            if not sprites:
+                continue
+            sprite_list = arcade.SpriteList(use_spatial_hash=False, is_static=True)
+            sprite_list.extend(sprites)
+            source = tile_map.sprite_lists[layer["name"]]
+            self.tile_chunks.set_chunk(source, chunk, sprite_list)
+            live.tiles.append((source, sprite_list))
+            sprite_count += len(sprites)
+            if layer["name"] in self._collidable:
+                polygons.extend(sprite.get_adjusted_hit_box() for sprite in sprites)
+        for layer, number, obj in self._objects.get(chunk, ()):
+            name = layer["name"]
+            if (name, number) in self._gone:
+                continue
+            if obj["kind"] == "tile":
+                sprite = tile_map.object_sprite(layer, obj)
+                tile_map.sprite_lists[name].append(sprite)
+                if self._is_collectible(name):
+                    self.collectibles.add(name, sprite)
+                if name in self._collidable:
+                    polygons.append(sprite.get_adjusted_hit_box())
+                live.objects.append((name, number, sprite))
+                sprite_count += 1
+            else:
+                shape = tile_map.object_shape(obj)
+                tile_map.object_lists[name].append(shape)
+                live.shapes.append((name, shape))
+        if isinstance(self.solid, CollisionGrid):
+            self.solid.add_group(chunk, polygons)
+        else:
+            self.solid.add(chunk, polygons)
+        if self.nav_graph is not None:
+            self.nav_graph.link_columns(first_column, last_column)
+        self.live[chunk] = live._replace(sprite_count=sprite_count)
+        self.sprite_count += sprite_count
+
+    def _release(self, chunk):
+        live = self.live.pop(chunk)
+        for source, _ in live.tiles:
+            self.tile_chunks.set_chunk(source, chunk, None)
+        for name, number, sprite in live.objects:
+            if not self._is_collectible(name):
+                sprite.remove_from_sprite_lists()
+            elif not self.collectibles.discard(name, sprite):
+                self._gone.add((name, number))
+        for name, shape in live.shapes:
+            self.tile_map.object_lists[name].remove(shape)
+        if isinstance(self.solid, CollisionGrid):
+            self.solid.remove_group(chunk)
+        else:
+            self.solid.remove(chunk)
+        self.sprite_count -= live.sprite_count
+
+    def _is_collectible(self, layer_name):
+        return self.collectibles is not None and layer_name in self.collectibles.indexes
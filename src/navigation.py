@@ -0,0 +1,437 @@
+# Platform navigation for Peluche Express
+#
+# Dogs (src/dogs.py) get around a level without testing tiles as they move:
+# where they can stand and how they get from one platform to another is
+# worked out once per level from its collidable tile layers (on the level
+# loader's thread) and kept with the LevelData.
+#
+# NavGraph nodes are spans: runs of solid tiles in one row with free tiles
+# above them. Links join two spans a dog gets between in one move:
+#  - a drop off either end of a span onto whatever is below the next column
+#  - a jump, at the players' jump speed (or a lower hop) and under the level's
+#    gravity, whose arc clears every solid tile between its take-off and
+#    landing points; onto higher spans a dog may first rise straight up
+# Each link holds its take-off and landing x, launch speed, climb and duration,
+# so following one is a walk to the take-off point and a ballistic arc.
+#
+# Spans are found for the whole map at once (a few NumPy passes); links, whose
+# arcs are what costs, are made a range of columns at a time. A column owns the
+# drops that go over it and the jumps between the spans starting in it and the
+# spans starting at or left of it, so linking every column once links the
+# level whatever the ranges. Within a row spans don't overlap, so each row's
+# spans in jumping range come from two bisections. A streamed level
+# (level_streaming.py) links the columns of each chunk as it makes it live.
+#
+# Paths come from A* over the spans. A search records, for its goal, the link
+# to take from every span on the path it found; dogs heading for the same goal
+# (chasing the same player) standing on any of those spans read their next
+# link from there without searching. The goals of the last PATH_CACHE_GOALS
+# searches are kept.
+import heapq
+import math
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+import numpy as np
+
+from src.player import GRAVITY, JUMP_SPEED, RUN_SPEED
+
+# Link kinds
+JUMP = 1
+DROP = 2
+# Free tiles a span needs above it to be stood on
+CLEARANCE_ROWS = 1
+# Jumps are planned up to this share of the highest jump, for margin
+JUMP_MARGIN = 0.95
+# Jumps down more than this many rows are left to drops
+MAX_JUMP_DOWN_ROWS = 4
+# Half the width and the height, in tiles, of what must clear the tiles along a jump's arc
+BODY_HALF_WIDTH = 0.25
+BODY_HEIGHT = 0.6
+# Launch speeds tried for a jump, as shares of the jump speed: a full jump first,
+# then lower hops that stay under an overhang
+HOP_SHARES = (1.0, 0.85, 0.7)
+# Where jumps take off, in tiles back from the span's end, and land, in tiles past the target's
+TAKEOFF_OFFSETS = (0.25, 0.75, 1.25, 2.25)
+LANDING_OFFSETS = (0.5, 1.5)
+# Points per second of a jump's arc checked against the tiles
+ARC_SAMPLES = 60
+PATH_CACHE_GOALS = 64
+
+LINK_DTYPE = np.dtype([
+    ("source", "<i4"),
+    ("target", "<i4"),
+    ("kind", "u1"),
+    ("takeoff_x", "<f4"),
+    ("landing_x", "<f4"),
+    ("duration", "<f4"),
+    # Upward speed at take-off (0 for a drop)
+    ("launch_speed", "<f4"),
+    # Seconds spent rising straight up before moving across
+    ("climb", "<f4"),
+])
+
+
+def solid_cells(level_data):
+    """Bool (rows, columns) array of the tiles of the collidable layers, row 0 being the top row."""
+    solid = np.zeros((level_data.height, level_data.width), dtype=bool)
+    for name in level_data.collidable_layer_names:
+        gids = np.asarray(level_data.layer_data[name], dtype=np.uint32)
+        solid |= (gids != 0).reshape(level_data.height, level_data.width)
+    return solid
+
+
+def airtime(height, jump_speed, gravity):
+    """Seconds from take-off until a jump comes down at `height` above its start (arrays welcome)."""
+    return (jump_speed + np.sqrt(np.maximum(jump_speed ** 2 - 2 * gravity * height, 0.0))) / gravity
+
+
+
+def level_nav_graph(level_data, linked=True):
+    """
+    The level's NavGraph, built on first use and kept with its LevelData.
+    Unless linked is False (the stream links it chunk by chunk), every column is linked.
+    """
+    if level_data.nav_graph is None:
+        level_data.nav_graph = NavGraph.from_level(level_data, linked=False)
+    if linked:
+        level_data.nav_graph.link_columns(0, level_data.width - 1)
+    return level_data.nav_graph
+
+class NavGraph:
+    """Platform spans of a level and the jump and drop links between them."""
+
+    def __init__(self, solid, spans, below, tile_width, tile_height,
+                 run_speed=RUN_SPEED, jump_speed=JUMP_SPEED, gravity=GRAVITY):
+        # (row, first column, last column) per span, row by row and left to right within a row
+        self.spans = spans
+        # The span under each cell (the nearest one at or below it in its column), -1 for none
+        self.below = below
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.run_speed = run_speed
+        self.jump_speed = jump_speed
+        self.gravity = gravity
+        rows, columns = solid.shape
+        self._arc = _ArcCheck(solid, tile_width, tile_height, gravity)
+        self._surface = (rows - spans[:, 0]) * float(tile_height)
+        self._left = spans[:, 1] * float(tile_width)
+        self._right = (spans[:, 2] + 1) * float(tile_width)
+        # Where each row's spans start and their left and right x, and the spans by first and by last column
+        self._row_start = np.searchsorted(spans[:, 0], np.arange(rows + 1)).tolist()
+        self._row_left = [self._left[start:end].tolist() for start, end in zip(self._row_start, self._row_start[1:])]
+        self._row_right = [self._right[start:end].tolist() for start, end in zip(self._row_start, self._row_start[1:])]
+        self._by_first = np.argsort(spans[:, 1], kind="stable")
+        self._firsts = spans[self._by_first, 1]
+        self._by_last = np.argsort(spans[:, 2], kind="stable")
+        self._lasts = spans[self._by_last, 2]
+        self._linked = np.zeros(columns, dtype=bool)
+        # Links made so far, one array per linked range
+        self._link_arrays = []
+        # Plain lists: the per-step lookups and searches read single items
+        self.surface = self._surface.tolist()
+        self.left = self._left.tolist()
+        self.right = self._right.tolist()
+        # Links from each span: drops by take-off x, then jumps by target
+        self.span_links = [[] for _ in range(len(spans))]
+        self.link_source = []
+        self.link_target = []
+        self.link_kind = []
+        self.takeoff_x = []
+        self.landing_x = []
+        self.duration = []
+        self.launch_speed = []
+        self.climb = []
+        # goal span -> {span: link to take from it (None when the goal can't be reached)}
+        self._next_links = OrderedDict()
+        self.hits = 0
+        self.searches = 0
+
+    @classmethod
+    def from_level(cls, level_data, run_speed=RUN_SPEED, jump_speed=JUMP_SPEED, gravity=GRAVITY, linked=True):
+        """The spans of a level, and the links between them unless linked is False (see link_columns)."""
+        solid = solid_cells(level_data)
+        rows, columns = solid.shape
+        # Solid with CLEARANCE_ROWS free tiles above (above the map counts as free)
+        standing = solid.copy()
+        for offset in range(1, CLEARANCE_ROWS + 1):
+            standing[offset:] &= ~solid[:-offset]
+
+        spans = []
+        span_at = np.full((rows, columns), -1, dtype=np.int32)
+        for row in range(rows):
+            edges = np.flatnonzero(np.diff(np.concatenate(([0], standing[row].view(np.int8), [0]))))
+            for first, end in zip(edges[::2].tolist(), edges[1::2].tolist()):
+                span_at[row, first:end] = len(spans)
+                spans.append((row, first, end - 1))
+        spans = np.array(spans, dtype=np.int32).reshape(-1, 3)
+        below = np.full((rows + 1, columns), -1, dtype=np.int32)
+        for row in range(rows - 1, -1, -1):
+            below[row] = np.where(span_at[row] >= 0, span_at[row], below[row + 1])
+        graph = cls(
+            solid, spans, below[:rows], level_data.tile_width, level_data.tile_height,
+            run_speed, jump_speed, gravity,
+        )
+        if linked:
+            graph.link_columns(0, columns - 1)
+        return graph
+
+    def link_columns(self, first, last):
+        """Make the links the columns first..last own (those not linked yet); returns how many were made."""
+        unlinked = np.concatenate(([False], ~self._linked[first:last + 1], [False])).view(np.int8)
+        edges = np.flatnonzero(np.diff(unlinked)) + first
+        links = []
+        for start, end in zip(edges[::2].tolist(), edges[1::2].tolist()):
+            links.extend(self._links_owned(start, end - 1))
+        self._linked[first:last + 1] = True
+        if not links:
+            return 0
+        links = np.array(links, dtype=LINK_DTYPE)
+        self._link_arrays.append(links)
+        sources = links["source"].tolist()
+        for number, source in enumerate(sources, len(self.link_source)):
+            self.span_links[source].append(number)
+        self.link_source += sources
+        self.link_target += links["target"].tolist()
+        self.link_kind += links["kind"].tolist()
+        self.takeoff_x += links["takeoff_x"].astype(float).tolist()
+        self.landing_x += links["landing_x"].astype(float).tolist()
+        self.duration += links["duration"].astype(float).tolist()
+        self.launch_speed += links["launch_speed"].astype(float).tolist()
+        self.climb += links["climb"].astype(float).tolist()
+        for source in set(sources):
+            self.span_links[source].sort(key=self._link_order)
+        # Searches that found no way may find one now
+        self._next_links.clear()
+        return len(links)
+
+    def _link_order(self, link):
+        if self.link_kind[link] == DROP:
+            return 0, self.takeoff_x[link]
+        return 1, self.link_target[link]
+
+    def _links_owned(self, first, last):
+        """Drops over columns first..last and jumps involving the spans starting in them."""
+        solid = self._arc.solid
+        rows, columns = solid.shape
+        tile_width, tile_height = self.tile_width, self.tile_height
+        surface, left, right = self.surface, self.left, self.right
+        links = []
+        # Drops off the left end of the spans starting just right of these columns, and off
+        # the right end of those ending just left of them
+        drops = []
+        for index in _spans_between(self._firsts, self._by_first, first + 1, last + 1):
+            drops.append((index, int(self.spans[index, 1]) - 1, left[index]))
+        for index in _spans_between(self._lasts, self._by_last, first - 1, last - 1):
+            drops.append((index, int(self.spans[index, 2]) + 1, right[index]))
+        for index, column, takeoff_x in drops:
+            row = int(self.spans[index, 0])
+            # Unless a wall or a step up is there
+            if not 0 <= column < columns or solid[max(0, row - CLEARANCE_ROWS):row + 1, column].any():
+                continue
+            target = int(self.below[row + 1, column]) if row + 1 < rows else -1
+            if target >= 0:
+                fall = surface[index] - surface[target]
+                links.append((index, target, DROP, float(takeoff_x), (column + 0.5) * tile_width,
+                              math.sqrt(2 * fall / self.gravity), 0.0, 0.0))
+
+        # Jumps either way between each span starting here and the spans starting at or left of it in reach
+        highest = self.jump_speed ** 2 / (2 * self.gravity) * JUMP_MARGIN
+        lowest = -MAX_JUMP_DOWN_ROWS * tile_height
+        for index in _spans_between(self._firsts, self._by_first, first, last):
+            for row in range(rows):
+                height = (rows - row) * tile_height - surface[index]
+                reaches = [self._reach(h) for h in (height, -height) if lowest <= h <= highest]
+                if not reaches:
+                    continue
+                start = self._row_start[row]
+                lo = start + bisect_left(self._row_right[row], left[index] - max(reaches))
+                hi = start + bisect_right(self._row_left[row], left[index])
+                for other in range(lo, hi):
+                    if other == index or (left[other] == left[index] and other > index):
+                        continue
+                    for source, target in ((index, other), (other, index)):
+                        rise = surface[target] - surface[source]
+                        if not lowest <= rise <= highest:
+                            continue
+                        reach = self._reach(rise)
+                        if left[target] > right[source] + reach or right[target] < left[source] - reach:
+                            continue
+                        link = _jump(self._arc, source, target, left, right, surface,
+                                     self.run_speed, self.jump_speed, self.gravity)
+                        if link is not None:
+                            links.append(link)
+        return links
+
+    def _reach(self, height):
+        """How far across a full jump goes before coming down at `height` above its start."""
+        jump_speed, gravity = self.jump_speed, self.gravity
+        return self.run_speed * (jump_speed + math.sqrt(max(jump_speed ** 2 - 2 * gravity * height, 0.0))) / gravity
+
+    @property
+    def nbytes(self):
+        return self.spans.nbytes + self.below.nbytes + sum(links.nbytes for links in self._link_arrays)
+
+    def locate(self, x, y):
+        """The span under a point (a sprite's bottom center), -1 over a pit or off the map."""
+        rows, columns = self.below.shape
+        column = int(x // self.tile_width)
+        if not 0 <= column < columns:
+            return -1
+        row = min(max(rows - 1 - int(y // self.tile_height), 0), rows - 1)
+        return int(self.below[row, column])
+
+    def next_link(self, start, goal):
+        """The link to take from span `start` (not the goal) towards span `goal`, None if it can't be reached."""
+        next_links = self._next_links.get(goal)
+        if next_links is None:
+            next_links = self._next_links[goal] = {}
+            if len(self._next_links) > PATH_CACHE_GOALS:
+                self._next_links.popitem(last=False)
+        else:
+            self._next_links.move_to_end(goal)
+        if start in next_links:
+            self.hits += 1
+            return next_links[start]
+        self.searches += 1
+        path = self.search(start, goal)
+        if path is None:
+            next_links[start] = None
+        else:
+            for link in path:
+                next_links[self.link_source[link]] = link
+        return next_links[start]
+
+    def path(self, start, goal):
+        """The links from span `start` to span `goal` through the cache ([] when already there, None if unreachable)."""
+        links = []
+        while start != goal:
+            link = self.next_link(start, goal)
+            if link is None or len(links) > len(self.surface):
+                return None
+            links.append(link)
+            start = self.link_target[link]
+        return links
+
+    def search(self, start, goal):
+        """A* over the spans, costed in seconds: the links of the quickest path, None if there is none."""
+        goal_x = (self.left[goal] + self.right[goal]) / 2
+        start_x = (self.left[start] + self.right[start]) / 2
+        speed = self.run_speed
+        costs = {start: 0.0}
+        # Where each span was landed on, and the link that got there
+        arrivals = {start: (start_x, None)}
+        frontier = [(abs(goal_x - start_x) / speed, 0.0, start)]
+        while frontier:
+            _, cost, span = heapq.heappop(frontier)
+            if span == goal:
+                links = []
+                while arrivals[span][1] is not None:
+                    link = arrivals[span][1]
+                    links.append(link)
+                    span = self.link_source[link]
+                return links[::-1]
+            if cost > costs[span]:
+                continue
+            x = arrivals[span][0]
+            for link in self.span_links[span]:
+                target = self.link_target[link]
+                new_cost = cost + abs(self.takeoff_x[link] - x) / speed + self.duration[link]
+                if new_cost < costs.get(target, math.inf):
+                    costs[target] = new_cost
+                    landing_x = self.landing_x[link]
+                    arrivals[target] = (landing_x, link)
+                    heapq.heappush(frontier, (new_cost + abs(goal_x - landing_x) / speed, new_cost, target))
+        return None
+
+    def stats(self):
+        return {
+            "spans": len(self.surface),
+            "links": len(self.link_target),
+            "bytes": self.nbytes,
+            "goals": len(self._next_links),
+            "hits": self.hits,
+            "searches": self.searches,
+        }
+
+
+def _spans_between(sorted_columns, order, first, last):
+    """The spans (ordered by `order`, whose columns are sorted_columns) with their column in first..last."""
+    lo = np.searchsorted(sorted_columns, first, "left")
+    hi = np.searchsorted(sorted_columns, last, "right")
+    return order[lo:hi].tolist()
+
+
+def _jump(arc, source, target, left, right, surface, run_speed, jump_speed, gravity):
+    """The link of the first jump from one span to another whose arc is clear, or None."""
+    height = surface[target] - surface[source]
+    ends = _jump_ends(left[source], right[source], left[target], right[target], height, arc.tile_width)
+    for share in HOP_SHARES:
+        launch_speed = jump_speed * share
+        if launch_speed ** 2 / (2 * gravity) * JUMP_MARGIN < height:
+            break
+        duration = float(airtime(height, launch_speed, gravity))
+        # Across all the way, or up to the target's height first
+        climbs = [0.0]
+        if height > 0:
+            climbs.append(float(launch_speed - math.sqrt(launch_speed ** 2 - 2 * gravity * height)) / gravity)
+        for takeoff_x, landing_x in ends:
+            for climb in climbs:
+                if abs(landing_x - takeoff_x) <= run_speed * (duration - climb) and arc.clear(
+                        takeoff_x, surface[source], landing_x, duration, launch_speed, climb):
+                    return source, target, JUMP, takeoff_x, landing_x, duration, launch_speed, climb
+    return None
+
+
+def _jump_ends(left, right, target_left, target_right, height, tile_width):
+    """Candidate (take-off x, landing x) pairs of a jump between two spans, nearest first."""
+    ends = []
+    if target_left >= right:
+        sides = [(right, target_left, 1)]
+    elif target_right <= left:
+        sides = [(left, target_right, -1)]
+    elif height > 0:
+        # A span above this one: jump up past one of its ends
+        sides = [(target_left, target_left, 1), (target_right, target_right, -1)]
+    else:
+        # Below and overlapping: that's a drop
+        return ends
+    for edge, target_edge, direction in sides:
+        for back in TAKEOFF_OFFSETS:
+            takeoff_x = edge - direction * back * tile_width
+            if not left <= takeoff_x <= right:
+                continue
+            for into in LANDING_OFFSETS:
+                landing_x = target_edge + direction * into * tile_width
+                if target_left <= landing_x <= target_right:
+                    ends.append((takeoff_x, landing_x))
+    return ends
+
+
+class _ArcCheck:
+    """Tests a jump's arc against the solid tiles."""
+
+    def __init__(self, solid, tile_width, tile_height, gravity):
+        self.solid = solid
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.gravity = gravity
+
+    def clear(self, takeoff_x, start_y, landing_x, duration, launch_speed, climb):
+        rows, columns = self.solid.shape
+        times = np.linspace(0.0, duration, max(4, int(duration * ARC_SAMPLES)))
+        x = takeoff_x + (landing_x - takeoff_x) * np.clip((times - climb) / (duration - climb), 0.0, 1.0)
+        y = start_y + launch_speed * times - self.gravity / 2 * times ** 2
+        half_width = BODY_HALF_WIDTH * self.tile_width
+        points_x = np.concatenate((x - half_width, x + half_width, x - half_width, x + half_width))
+        # Just above the feet, and the top of the body
+        feet = y + 1
+        head = y + BODY_HEIGHT * self.tile_height
+        points_y = np.concatenate((feet, feet, head, head))
+        column = np.floor(points_x / self.tile_width).astype(np.int64)
+        row = rows - 1 - np.floor(points_y / self.tile_height).astype(np.int64)
+        if ((column < 0) | (column >= columns)).any():
+            return False
+        # Above the map is free
+        inside = row >= 0
+        return not self.solid[np.minimum(row[inside], rows - 1), column[inside]].any()
@@ -0,0 +1,616 @@
+# Batched player physics for Peluche Express
+#
+# Every player's state (position, velocity, ground contact, crouch, held input)
+# lives in NumPy arrays, one slot per player, and all players are stepped
+# together: gravity, the vertical move, the horizontal move with its step-up
+# and the ground probe are each a handful of array operations, whatever the
+# player count. Player sprites only mirror the arrays for drawing and
+# animation (sync_sprites).
+#
+# Hit boxes (tiles' and players') are convex polygons, kept as their bottom and
+# top boundary chains (Hull), each the max or min of its edges' lines. How far
+# two hulls overlap vertically, i.e. how far one must move up or down to clear
+# the other, is the largest gap between one's top and the other's bottom over
+# their shared x range; that gap is concave, so it peaks at a corner of either
+# polygon or at an end of the range, and checking those few places gives the
+# exact answer. Collisions therefore match GridPhysicsEngine's polygon tests
+# without stepping through positions, and only tiles whose bounds overlap a
+# player's are looked at.
+#
+# The level's hulls are filed by grid column (LevelHulls), padded into arrays
+# (streamed levels add and remove columns as they go); each query gathers the
+# tiles of the few columns a player can touch, so its cost doesn't depend on
+# the level's size either. The movement rules are those
+# of GridPhysicsEngine / arcade's platformer engine (gravity before moving,
+# climb out of overlaps, land on top or bonk under, step up to the horizontal
+# speed, stop against walls, can jump within 5px of the ground), down to the
+# whole and quarter pixel increments arcade moves by while resolving a
+# collision, so both engines put players in the same place
+# (script/compare_physics.py).
+#
+# Each batched step costs a fixed few hundred microseconds of NumPy call
+# overhead, which only pays off with many players: below BATCH_MIN_PLAYERS
+# (script/bench_players.py) GridPlayerPhysics steps every player with its own
+# GridPhysicsEngine instead, behind the same interface.
+import math
+from collections import namedtuple
+
+import numpy as np
+
+from src.clock import per_step
+from src.grid_physics import GridPhysicsEngine
+
+# Input bits, one byte per player
+MOVE_LEFT = 1
+MOVE_RIGHT = 2
+JUMP = 4
+CROUCH = 8
+ACTION = 16
+
+# Fewest players stepped batched; fewer get a GridPhysicsEngine each (script/bench_players.py)
+BATCH_MIN_PLAYERS = 16
+
+# Ground closer than this below a player's feet allows a jump (can_jump's y_distance)
+GROUND_PROBE = 5
+# How far arcade's engine moves a player back per try after landing / hitting its head
+LANDING_STEP = 0.25
+BONK_STEP = 1
+
+# Boundary chains of a Hull
+BOTTOM, TOP = range(2)
+
+# Overlaps and move amounts below this are float error (positions are rounded to 0.01px)
+_EPSILON = 1e-7
+_NO_BOUNDS = (1e12, 1e12, -1e12, -1e12)
+# Directions of arcade's search out of an overlap, tried at doubling distances
+_UNSTICK_DIRECTIONS = np.array([(0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1)], dtype=np.float64)
+
+# A convex polygon (or arrays of them): bounds (..., 4) as left, bottom, right,
+# top; lines (..., 2, lines, 2) as slope a and offset c (y = a * x + c) of the
+# edges of its bottom and top chains; xs (..., vertices) of its corners.
+Hull = namedtuple("Hull", ["bounds", "lines", "xs"])
+
+
+def hull(points):
+    """Hull of a convex polygon's points."""
+    points = [(float(x), float(y)) for x, y in points]
+    area = sum(x1 * y2 - x2 * y1 for (x1, y1), (x2, y2) in zip(points, points[1:] + points[:1]))
+    if area < 0:
+        points.reverse()
+    chains = ([], [])
+    # Counterclockwise, the bottom runs left to right and the top right to left
+    for (x1, y1), (x2, y2) in zip(points, points[1:] + points[:1]):
+        if x1 != x2:
+            slope = (y2 - y1) / (x2 - x1)
+            chains[BOTTOM if x2 > x1 else TOP].append((slope, y1 - slope * x1))
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+    return Hull(
+        np.array((min(xs), min(ys), max(xs), max(ys))),
+        _pad_chains(chains, max(len(chain) for chain in chains)),
+        np.array(xs),
+    )
+
+
+def _pad_chains(chains, size):
+    """Chains padded to `size` lines with lines that never win their max (bottom) / min (top)."""
+    lines = np.zeros((2, size, 2))
+    lines[BOTTOM, :, 1] = -np.inf
+    lines[TOP, :, 1] = np.inf
+    for index, chain in enumerate(chains):
+        if len(chain):
+            lines[index, :len(chain)] = chain
+    return lines
+
+
+def _padded(shape, lines, vertices):
+    """A Hull padded to `lines` lines per chain and `vertices` corners (repeating the first)."""
+    padded_lines = _pad_chains([chain[np.isfinite(chain[:, 1])] for chain in shape.lines], lines)
+    xs = np.full(vertices, shape.xs[0])
+    xs[:len(shape.xs)] = shape.xs
+    return Hull(shape.bounds, padded_lines, xs)
+
+
+def _stack(shapes, lines, vertices):
+    shapes = [_padded(shape, lines, vertices) for shape in shapes]
+    return Hull(*(np.stack(field) for field in zip(*shapes)))
+
+
+def _chain(lines, at, largest):
+    """Boundary chains (lines (pairs, n, 2)) evaluated at `at` (pairs, k): the max or min over each chain's lines."""
+    pick = np.maximum if largest else np.minimum
+    value = lines[:, 0, 0, None] * at + lines[:, 0, 1, None]
+    for index in range(1, lines.shape[1]):
+        value = pick(value, lines[:, index, 0, None] * at + lines[:, index, 1, None])
+    return value
+
+
+def _per_player(count, players, values):
+    """Largest of each player's values (0 for players without any)."""
+    largest = np.zeros(count)
+    np.maximum.at(largest, players, values)
+    return largest
+
+
+def _is_rectangle(points):
+    left, bottom, right, top = min(x for x, _ in points), min(y for _, y in points), \
+        max(x for x, _ in points), max(y for _, y in points)
+    return len(points) == 4 and all(x in (left, right) and y in (bottom, top) for x, y in points)
+
+
+def _merge_stacks(polygons):
+    """Merge rectangles of equal width sitting exactly on top of each other (walls, pillars)."""
+    merged = []
+    others = []
+    rectangles = []
+    for points in polygons:
+        if _is_rectangle(points):
+            xs, ys = [x for x, _ in points], [y for _, y in points]
+            rectangles.append((min(xs), min(ys), max(xs), max(ys)))
+        else:
+            others.append(points)
+    for box in sorted(set(rectangles), key=lambda box: (box[0], box[2], box[1])):
+        if merged:
+            left, bottom, right, top = merged[-1]
+            if left == box[0] and right == box[2] and abs(top - box[1]) < 1e-6:
+                merged[-1] = (left, bottom, right, max(top, box[3]))
+                continue
+        merged.append(box)
+    return [[(left, bottom), (right, bottom), (right, top), (left, top)] for left, bottom, right, top in merged] + others
+
+
+class LevelHulls:
+    """
+    Solid tiles as Hulls filed by grid column, `depth` slots per column, padded
+    into flat arrays.
+
+    Polygons are added and removed in groups (a streamed level's chunks, see
+    src/level_streaming.py); only columns that hold something take room in the
+    arrays, found through `slots` (slot 0 is always empty).
+    """
+
+    def __init__(self, columns, column_width):
+        self.columns = columns
+        self.column_width = column_width
+        self.slots = np.zeros(columns, dtype=np.int64)
+        self.depth = 1
+        # column -> {group: polygons filed under it}
+        self._polygons = {}
+        # column -> its hulls, unpadded
+        self._column_hulls = {}
+        self._free_slots = []
+        self._used_slots = 1
+        self._stack_columns()
+
+    @classmethod
+    def from_grid(cls, grid):
+        """Every tile of a CollisionGrid, as a single group."""
+        level = cls(grid.columns, grid.cell_width)
+        entries = {}
+        for cell in grid.cells:
+            for entry in cell or ():
+                entries[id(entry)] = entry
+        level.add(None, [points for _, points, _ in entries.values()])
+        return level
+
+    def add(self, group, polygons):
+        """File solid polygons (absolute points) under the columns they cover; remove(group) takes them out."""
+        touched = set()
+        for points in polygons:
+            first = max(0, int(min(x for x, _ in points) // self.column_width))
+            last = min(self.columns - 1, int(math.ceil(max(x for x, _ in points) / self.column_width)) - 1)
+            for column in range(first, last + 1):
+                self._polygons.setdefault(column, {}).setdefault(group, []).append(list(points))
+                touched.add(column)
+        self._update(touched)
+
+    def remove(self, group):
+        touched = [column for column, groups in self._polygons.items() if group in groups]
+        for column in touched:
+            groups = self._polygons[column]
+            del groups[group]
+            if not groups:
+                del self._polygons[column]
+        self._update(touched)
+
+    def _update(self, columns):
+        changed = []
+        for column in columns:
+            polygons = [points for group in self._polygons.get(column, {}).values() for points in group]
+            if polygons:
+                self._column_hulls[column] = [hull(points) for points in _merge_stacks(polygons)]
+                if not self.slots[column]:
+                    if self._free_slots:
+                        self.slots[column] = self._free_slots.pop()
+                    else:
+                        self.slots[column] = self._used_slots
+                        self._used_slots += 1
+                changed.append(column)
+            elif self.slots[column]:
+                del self._column_hulls[column]
+                self._free_slots.append(int(self.slots[column]))
+                self._clear_slot(self.slots[column])
+                self.slots[column] = 0
+        if not changed:
+            return
+        fits = (
+            self._used_slots * self.depth <= len(self.hulls.bounds)
+            and all(self._fits(self._column_hulls[column]) for column in changed)
+        )
+        if not fits:
+            self._stack_columns()
+            return
+        for column in changed:
+            self._clear_slot(self.slots[column])
+            base = self.slots[column] * self.depth
+            for index, shape in enumerate(self._column_hulls[column]):
+                for field, value in zip(self.hulls, _padded(shape, self._lines, self._vertices)):
+                    field[base + index] = value
+
+    def _fits(self, shapes):
+        return len(shapes) <= self.depth and all(
+            shape.lines.shape[1] <= self._lines and len(shape.xs) <= self._vertices for shape in shapes
+        )
+
+    def _clear_slot(self, slot):
+        rows = slice(slot * self.depth, (slot + 1) * self.depth)
+        for field, value in zip(self.hulls, self._empty):
+            field[rows] = value
+
+    def _stack_columns(self):
+        """Rebuild the arrays, sized for every column's hulls and room to grow."""
+        shapes = [shape for column in self._column_hulls.values() for shape in column]
+        self._lines = max((shape.lines.shape[1] for shape in shapes), default=1)
+        self._vertices = max((len(shape.xs) for shape in shapes), default=1)
+        self.depth = max((len(column) for column in self._column_hulls.values()), default=1)
+        # Padding tiles have bounds that never overlap anything
+        self._empty = Hull(np.array(_NO_BOUNDS), _pad_chains(((), ()), self._lines), np.zeros(self._vertices))
+        slots = [[] for _ in range(2 ** math.ceil(math.log2(self._used_slots)) if self._used_slots > 1 else 1)]
+        for column, column_hulls in self._column_hulls.items():
+            slots[self.slots[column]] = column_hulls
+        self.hulls = _stack(
+            [slot[index] if index < len(slot) else self._empty for slot in slots for index in range(self.depth)],
+            self._lines,
+            self._vertices,
+        )
+
+    def near(self, left, right):
+        """Indices of the tiles in the columns spanning [left, right], for each player: (players, tiles)."""
+        width = self.column_width
+        first = np.floor(left / width).astype(np.int64) - 1
+        span = int(np.max(np.ceil((right - left) / width))) + 3 if len(left) else 0
+        columns = np.clip(first[:, None] + np.arange(span), 0, self.columns - 1)
+        return (self.slots[columns][:, :, None] * self.depth + np.arange(self.depth)).reshape(len(left), -1)
+
+
+class PlayerPhysics:
+    """Position, velocity, ground contact and input of every player, stepped at once."""
+
+    def __init__(self, level, sprites, gravity_constant):
+        # The solid tiles (LevelHulls), shared with the level's streaming when there is one
+        self.level = level
+        self.sprites = list(sprites)
+        count = len(self.sprites)
+        self.count = count
+        self.gravity_constant = gravity_constant
+        self.x = np.array([sprite.center_x for sprite in self.sprites], dtype=np.float64)
+        self.y = np.array([sprite.center_y for sprite in self.sprites], dtype=np.float64)
+        self.change_x = np.zeros(count)
+        self.change_y = np.zeros(count)
+        # Per-step amounts of each player's per-second speeds
+        self.run_speed = np.array([per_step(sprite.speed) for sprite in self.sprites])
+        self.jump_speed = np.array([per_step(sprite.jump_speed) for sprite in self.sprites])
+        self.grounded = np.zeros(count, dtype=bool)
+        self.crouching = np.zeros(count, dtype=bool)
+        self.inputs = np.zeros(count, dtype=np.uint8)
+        self._held = np.zeros(count, dtype=np.uint8)
+        self.input_disabled = np.zeros(count, dtype=bool)
+        self.forced_walk = np.zeros(count, dtype=bool)
+        # Each player's hit box relative to its center, stacked (players, ...)
+        self.hulls = None
+        self._hulls = [None] * count
+        # (hit box points, scale, angle) each player's hull was made from
+        self._sources = [None] * count
+        self._hull_cache = {}
+        # Hulls padded to the stack's current size, by hit box
+        self._padded_cache = {}
+        self.refresh_shapes()
+
+    def refresh_shapes(self):
+        """Re-read the hit boxes of players whose hit box changed (animation state)."""
+        changed = []
+        for index, sprite in enumerate(self.sprites):
+            # Player.update swaps the hit box list on state changes only, not with every texture
+            points = sprite.get_hit_box()
+            source = self._sources[index]
+            if source is not None and source[0] is points and source[1] == sprite.scale and source[2] == sprite.angle:
+                continue
+            self._sources[index] = (points, sprite.scale, sprite.angle)
+            key = (tuple(map(tuple, points)), sprite.scale, sprite.angle)
+            shape = self._hull_cache.get(key)
+            if shape is None:
+                cx, cy = sprite.center_x, sprite.center_y
+                shape = self._hull_cache[key] = hull([(x - cx, y - cy) for x, y in sprite.get_adjusted_hit_box()])
+            self._hulls[index] = shape
+            changed.append((index, key, shape))
+        if not changed or not self.count:
+            return
+        size = self.hulls.lines.shape[2] if self.hulls is not None else 0
+        vertices = self.hulls.xs.shape[1] if self.hulls is not None else 0
+        if all(shape.lines.shape[1] <= size and len(shape.xs) <= vertices for _, _, shape in changed):
+            # Same-sized hulls: overwrite the changed players' rows only
+            for index, key, shape in changed:
+                padded = self._padded_cache.get(key)
+                if padded is None:
+                    padded = self._padded_cache[key] = _padded(shape, size, vertices)
+                for field, value in zip(self.hulls, padded):
+                    field[index] = value
+        else:
+            size = max(shape.lines.shape[1] for shape in self._hulls)
+            vertices = max(len(shape.xs) for shape in self._hulls)
+            self.hulls = _stack(self._hulls, size, vertices)
+            self._padded_cache = {}
+        self._probe_ground()
+
+    def _probe_ground(self):
+        self.grounded = self._vertical(self.x, self.y - GROUND_PROBE)[0]
+
+    def force_walk(self, index):
+        """Take a player's controls away and walk it right (level exit)."""
+        self.input_disabled[index] = True
+        self.forced_walk[index] = True
+
+    def can_jump(self, index):
+        return bool(self.grounded[index])
+
+    def _pairs(self, x, y, shapes):
+        """Players at (x, y) and the tiles whose bounds overlap theirs: (player indices, tile indices)."""
+        left, bottom = x + shapes.bounds[:, 0], y + shapes.bounds[:, 1]
+        right, top = x + shapes.bounds[:, 2], y + shapes.bounds[:, 3]
+        tiles = self.level.near(left, right)
+        bounds = self.level.hulls.bounds[tiles]
+        overlap = (
+            (bounds[..., 0] < right[:, None] - _EPSILON) & (bounds[..., 2] > left[:, None] + _EPSILON)
+            & (bounds[..., 1] < top[:, None] - _EPSILON) & (bounds[..., 3] > bottom[:, None] + _EPSILON)
+        )
+        players, slots = np.nonzero(overlap)
+        return players, tiles[players, slots]
+
+    def _vertical(self, x, y, shapes=None):
+        """
+        Overlaps of players at (x, y) with the level: whether each player hits
+        anything, and how far up and how far down it would have to move to
+        clear everything it hits. Touching isn't overlapping.
+        """
+        shapes = self.hulls if shapes is None else shapes
+        count = len(x)
+        players, tiles = self._pairs(x, y, shapes)
+        if not len(players):
+            return np.zeros(count, dtype=bool), np.zeros(count), np.zeros(count)
+        level = self.level.hulls
+        tile_bounds, tile_lines = level.bounds[tiles], level.lines[tiles]
+        player_x, player_y = x[players], y[players]
+        player_lines = shapes.lines[players]
+        low = np.maximum(tile_bounds[:, 0], player_x + shapes.bounds[players, 0])
+        high = np.minimum(tile_bounds[:, 2], player_x + shapes.bounds[players, 2])
+        at = np.concatenate((low[:, None], high[:, None], level.xs[tiles], player_x[:, None] + shapes.xs[players]), axis=1)
+        at = np.clip(at, low[:, None], high[:, None])
+        local = at - player_x[:, None]
+        up = _chain(tile_lines[:, TOP], at, False) - _chain(player_lines[:, BOTTOM], local, True)
+        down = _chain(player_lines[:, TOP], local, False) - _chain(tile_lines[:, BOTTOM], at, True)
+        up = up.max(axis=1) - player_y
+        down = down.max(axis=1) + player_y
+        hit = (up > _EPSILON) & (down > _EPSILON)
+        players = players[hit]
+        hits = np.zeros(count, dtype=bool)
+        hits[players] = True
+        return hits, _per_player(count, players, up[hit]), _per_player(count, players, down[hit])
+
+    def _unstick(self, stuck):
+        """Arcade's search out of an overlap, for players starting a step inside a tile (spawns)."""
+        tries = len(_UNSTICK_DIRECTIONS)
+        for index in np.flatnonzero(stuck):
+            shapes = Hull(*(np.broadcast_to(field[index], (tries,) + field.shape[1:]) for field in self.hulls))
+            vary = 1
+            while True:
+                x = self.x[index] + _UNSTICK_DIRECTIONS[:, 0] * vary
+                y = self.y[index] + _UNSTICK_DIRECTIONS[:, 1] * vary
+                free = ~self._vertical(x, y, shapes)[0]
+                if free.any():
+                    first = int(np.argmax(free))
+                    self.x[index], self.y[index] = x[first], y[first]
+                    break
+                vary *= 2
+
+    def _slide(self, players, x, start_y, y, speed):
+        """
+        Arcade's search for how far players stopped by a wall still get to
+        move: a binary search over whole pixels that tries to ramp up at every
+        blocked probe, and whose probes run at the height of the last failed
+        ramp. Returns how far each of `players` moves and how much it climbs.
+        """
+        shapes = Hull(*(field[players] for field in self.hulls))
+        x, start_y, y, speed = x[players], start_y[players], y[players], speed[players]
+        direction = np.sign(self.change_x[players])
+        # The full move and its ramp already failed
+        lower = np.zeros(len(players))
+        upper = speed - 1
+        probe_y = start_y + speed
+        lift = np.zeros(len(players))
+        active = upper - lower > 0
+        current = np.where(active, np.floor((upper + lower) / 2), lower)
+        while active.any():
+            probe_x = x + current * direction
+            hit = self._vertical(probe_x, probe_y, shapes)[0]
+            free = active & ~hit
+            lower = np.where(free, current, lower)
+            blocked = active & hit
+            probe_y = np.where(blocked, start_y + current, probe_y)
+            ramp_hit, _, _ = self._vertical(probe_x, probe_y, shapes)
+            ramped = blocked & ~ramp_hit
+            if ramped.any():
+                up = self._vertical(probe_x, y, shapes)[1]
+                lift = np.where(ramped, np.maximum(np.minimum(np.ceil(up - _EPSILON), current), 1), lift)
+            failed = blocked & ramp_hit
+            upper = np.where(failed, current - 1, upper)
+            searching = upper - lower > 0
+            total = upper + lower
+            current = np.where(free & searching, np.floor(total / 2) + np.mod(total, 2), current)
+            current = np.where(failed, np.where(searching, np.floor(total / 2), lower), current)
+            active &= ~ramped & searching
+        return current, lift
+
+    def _apply_input(self):
+        held = self.inputs
+        active = ~self.input_disabled
+        pressed_jump = (held & JUMP) != 0
+        # Crouch only starts on the ground, and stops as soon as it's released
+        crouch = (held & CROUCH) != 0
+        self.crouching = np.where(active, crouch & (self.grounded | self.crouching), self.crouching)
+        direction = ((held & MOVE_RIGHT) != 0).astype(np.float64) - ((held & MOVE_LEFT) != 0)
+        walking = np.where(self.crouching, 0.0, direction * self.run_speed)
+        self.change_x = np.where(active, walking, self.change_x)
+        self.change_x = np.where(self.forced_walk, self.run_speed, self.change_x)
+        # Jump on the press, not while the key is held
+        jump = active & pressed_jump & ((self._held & JUMP) == 0) & self.grounded
+        self.change_y = np.where(jump, self.jump_speed, self.change_y)
+        self._held = np.where(active, held, self._held)
+
+    def step(self):
+        """Advance every player by one simulation step."""
+        if not self.count:
+            return
+        self._apply_input()
+        stuck = self._vertical(self.x, self.y)[0]
+        if stuck.any():
+            self._unstick(stuck)
+
+        # --- Vertical: gravity, then back up out of what was landed on or down from what was bonked
+        self.change_y = self.change_y - self.gravity_constant
+        x, start_y = self.x, self.y
+        y = start_y + self.change_y
+        blocked, up, down = self._vertical(x, y)
+        if blocked.any():
+            landed = y + LANDING_STEP * np.ceil(up / LANDING_STEP - _EPSILON)
+            bonked = y - BONK_STEP * np.ceil(down / BONK_STEP - _EPSILON)
+            y = np.where(blocked, np.where(self.change_y < 0, landed, bonked), y)
+            self.change_y = np.where(blocked, 0.0, self.change_y)
+        y = np.round(y, 2)
+
+        # --- Horizontal: move, step up onto anything no higher than the move, else slide up to the wall
+        speed = np.abs(self.change_x)
+        new_x = x + self.change_x
+        y = y.copy()
+        hit, up, _ = self._vertical(new_x, y)
+        blocked = (speed > 0) & hit
+        if blocked.any():
+            # Arcade ramps up when the spot `speed` above where the step started is free,
+            # then settles on the lowest whole-pixel lift (at most `speed`) that clears
+            can_climb = blocked & ~self._vertical(new_x, np.where(blocked, start_y + speed, y))[0]
+            lift = np.minimum(np.ceil(up - _EPSILON), speed)
+            y = np.where(can_climb, y + lift, y)
+            stopped = blocked & ~can_climb
+            if stopped.any():
+                players = np.flatnonzero(stopped)
+                moved, lift = self._slide(players, x, start_y, y, speed)
+                new_x[players] = x[players] + np.sign(self.change_x[players]) * moved
+                y[players] += lift
+        # The map has no wall on its left edge
+        self.x = np.maximum(new_x, 0.0)
+        self.y = y
+        self._probe_ground()
+
+    def sync_sprites(self):
+        """Copy the state the sprites draw and animate from."""
+        x, y = self.x.tolist(), self.y.tolist()
+        change_x, change_y = self.change_x.tolist(), self.change_y.tolist()
+        crouching = self.crouching.tolist()
+        inputs = self.inputs.tolist()
+        for index, sprite in enumerate(self.sprites):
+            sprite.position = x[index], y[index]
+            sprite.change_x = change_x[index]
+            sprite.change_y = change_y[index]
+            sprite.is_crouching = crouching[index]
+            sprite.is_action = bool(inputs[index] & ACTION)
+
+
+class GridPlayerPhysics:
+    """PlayerPhysics' interface over one GridPhysicsEngine per player, for a few players on a CollisionGrid."""
+
+    def __init__(self, grid, sprites, gravity_constant):
+        # The solid tiles (CollisionGrid)
+        self.level = grid
+        self.sprites = list(sprites)
+        count = len(self.sprites)
+        self.count = count
+        self.gravity_constant = gravity_constant
+        self.engines = [GridPhysicsEngine(sprite, grid, gravity_constant=gravity_constant) for sprite in self.sprites]
+        self.run_speed = [per_step(sprite.speed) for sprite in self.sprites]
+        self.jump_speed = [per_step(sprite.jump_speed) for sprite in self.sprites]
+        self.grounded = [False] * count
+        self.crouching = [False] * count
+        self.inputs = np.zeros(count, dtype=np.uint8)
+        self._held = [0] * count
+        self.input_disabled = [False] * count
+        self.forced_walk = [False] * count
+        # (hit box points, scale, angle) each player's ground contact was last probed with
+        self._sources = [None] * count
+        self.refresh_shapes()
+
+    @property
+    def x(self):
+        return np.array([sprite.center_x for sprite in self.sprites], dtype=np.float64)
+
+    @property
+    def y(self):
+        return np.array([sprite.center_y for sprite in self.sprites], dtype=np.float64)
+
+    def refresh_shapes(self):
+        """Probe the ground again for players whose hit box changed (animation state)."""
+        for index, sprite in enumerate(self.sprites):
+            points = sprite.get_hit_box()
+            source = self._sources[index]
+            if source is not None and source[0] is points and source[1] == sprite.scale and source[2] == sprite.angle:
+                continue
+            self._sources[index] = (points, sprite.scale, sprite.angle)
+            self.grounded[index] = self.engines[index].can_jump(GROUND_PROBE)
+
+    def force_walk(self, index):
+        """Take a player's controls away and walk it right (level exit)."""
+        self.input_disabled[index] = True
+        self.forced_walk[index] = True
+
+    def can_jump(self, index):
+        return self.grounded[index]
+
+    def step(self):
+        """Advance every player by one simulation step, by PlayerPhysics' rules."""
+        inputs = self.inputs.tolist()
+        for index, sprite in enumerate(self.sprites):
+            held = inputs[index]
+            active = not self.input_disabled[index]
+            if active:
+                # Crouch only starts on the ground, and stops as soon as it's released
+                self.crouching[index] = bool(held & CROUCH) and (self.grounded[index] or self.crouching[index])
+                direction = bool(held & MOVE_RIGHT) - bool(held & MOVE_LEFT)
+                sprite.change_x = 0.0 if self.crouching[index] else direction * self.run_speed[index]
+            if self.forced_walk[index]:
+                sprite.change_x = self.run_speed[index]
+            # Jump on the press, not while the key is held
+            if active and held & JUMP and not self._held[index] & JUMP and self.grounded[index]:
+                sprite.change_y = self.jump_speed[index]
+            if active:
+                self._held[index] = held
+            engine = self.engines[index]
+            engine.update()
+            # The map has no wall on its left edge
+            if sprite.center_x < 0:
+                sprite.center_x = 0.0
+            self.grounded[index] = engine.can_jump(GROUND_PROBE)
+
+    def sync_sprites(self):
+        """Copy the state the sprites animate from (the engines move the sprites themselves)."""
+        inputs = self.inputs.tolist()
+        for index, sprite in enumerate(self.sprites):
+            sprite.is_crouching = self.crouching[index]
+            sprite.is_action = bool(inputs[index] & ACTION)
@@ -0,0 +1,158 @@
+# Frame profiler for Peluche Express
+#
+# Times the phases of the game loop (update: physics, players, end zone,
+# apples, camera; draw: background, scene, HUD) into a fixed-size ring buffer
+# of frames. The overlay (F3 in game, see ui_draw.draw_profiler_overlay) shows
+# the recent averages; main.py --profile-dump writes the buffer on exit as
+# JSON or in Chrome's trace format (open in chrome://tracing or Perfetto).
+import json
+import os
+from collections import deque
+from time import perf_counter
+
+import arcade
+
+CAPACITY = 600  # frames, 10 seconds at 60 FPS
+OVERLAY_FRAMES = 60
+
+
+class _Section:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        profiler = self.profiler
+        if profiler._stack:
+            self.name = f"{profiler._stack[-1]}/{self.name}"
+        profiler._stack.append(self.name)
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = perf_counter()
+        profiler = self.profiler
+        profiler._stack.pop()
+        profiler._sections.append((self.name, self.start, end))
+        return False
+
+
+class FrameProfiler:
+    """Per-phase timings of the last `capacity` frames."""
+
+    def __init__(self, capacity=CAPACITY):
+        # Each frame: {"index", "start", "end", "sections": [(name, start, end), ...]}
+        self.frames = deque(maxlen=capacity)
+        self.overlay_visible = False
+        self._sections = []
+        self._stack = []
+        self._frame_index = 0
+        self._frame_start = perf_counter()
+        self._origin = self._frame_start
+
+    def section(self, name):
+        """Context manager timing one phase; nested sections are named "outer/inner"."""
+        return _Section(self, name)
+
+    def end_frame(self):
+        """Close the current frame (everything timed since the previous end_frame)."""
+        now = perf_counter()
+        self.frames.append({
+            "index": self._frame_index,
+            "start": self._frame_start,
+            "end": now,
+            "sections": self._sections,
+        })
+        self._sections = []
+        self._frame_index += 1
+        self._frame_start = now
+
+    def toggle_overlay(self):
+        self.overlay_visible = not self.overlay_visible
+
+    def summary(self, frames=OVERLAY_FRAMES):
+        """Frame time (mean, max) and mean time per phase, in ms, over the last frames."""
+        recent = list(self.frames)[-frames:]
+        if not recent:
+            return {"frame_ms": 0.0, "frame_max_ms": 0.0, "phases": {}}
+        frame_times = [frame["end"] - frame["start"] for frame in recent]
+        phases = {}
+        for frame in recent:
+            for name, start, end in frame["sections"]:
+                phases[name] = phases.get(name, 0.0) + (end - start)
+        return {
+            "frame_ms": sum(frame_times) / len(recent) * 1000,
+            "frame_max_ms": max(frame_times) * 1000,
+            "phases": {name: total / len(recent) * 1000 for name, total in sorted(phases.items())},
+        }
+
+    def to_json(self):
+        return {
+            "capacity": self.frames.maxlen,
+            "frames": [
+                {
+                    "index": frame["index"],
+                    "start_ms": (frame["start"] - self._origin) * 1000,
+                    "frame_ms": (frame["end"] - frame["start"]) * 1000,
+                    "sections": [
+                        {"name": name, "start_ms": (start - self._origin) * 1000, "ms": (end - start) * 1000}
+                        for name, start, end in frame["sections"]
+                    ],
+                }
+                for frame in self.frames
+            ],
+        }
+
+    def to_chrome_trace(self):
+        """Trace Event Format: one complete ("X") event per frame and per section, in µs."""
+        events = []
+        pid = os.getpid()
+        for frame in self.frames:
+            events.append({
+                "name": "frame",
+                "ph": "X",
+                "ts": (frame["start"] - self._origin) * 1e6,
+                "dur": (frame["end"] - frame["start"]) * 1e6,
+                "pid": pid,
+                "tid": 0,
+                "args": {"index": frame["index"]},
+            })
+            for name, start, end in frame["sections"]:
+                events.append({
+                    "name": name.rsplit("/", 1)[-1],
+                    "cat": name.split("/", 1)[0],
+                    "ph": "X",
+                    "ts": (start - self._origin) * 1e6,
+                    "dur": (end - start) * 1e6,
+                    "pid": pid,
+                    "tid": 1,
+                })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def dump(self, path, fmt=None):
+        """Write the buffer to path as "json" or "chrome" (default: chrome for *.trace.json)."""
+        if fmt is None:
+            fmt = "chrome" if path.endswith(".trace.json") else "json"
+        data = self.to_chrome_trace() if fmt == "chrome" else self.to_json()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+
+def sprite_count(scene):
+    if not scene:
+        return 0
+    return sum(len(sprite_list) for sprite_list in scene.sprite_lists)
+
+
+def texture_memory(ctx):
+    """(GPU atlas bytes, textures in the atlas, decoded image bytes in arcade's texture cache)."""
+    atlas = ctx.default_atlas
+    gpu_bytes = atlas.width * atlas.height * 4
+    images = {}
+    for texture in arcade.load_texture.texture_cache.values():
+        image = getattr(texture, "image", None)
+        if image is not None:
+            images[id(image)] = image.width * image.height * 4
+    return gpu_bytes, len(atlas._textures), sum(images.values())
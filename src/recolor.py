@@ -0,0 +1,93 @@
+# Sprite recoloring for Peluche Express
+#
+# Hue-shift rules applied to whole RGBA images with NumPy, used offline by
+# script/recolor.py on asset folders. Player color variants are hand-made art
+# (shp2 is Player 2's blue seahorse), not recolored at runtime.
+from collections import namedtuple
+
+import numpy as np
+from PIL import Image
+
+# Pixels whose hue (degrees, 0-360) is in [min_hue, max_hue] get rotated by shift.
+# When ranges overlap, the first matching rule wins.
+HueRule = namedtuple("HueRule", ["min_hue", "max_hue", "shift"])
+
+# Greens toward blue, teals a little less so they don't over-saturate;
+# yellows and reds are left alone
+GREEN_TO_BLUE = (
+    HueRule(80, 160, 80),
+    HueRule(150, 200, 48),
+)
+
+def parse_rule(text):
+    """HueRule from "min:max:shift", e.g. "80:160:80"."""
+    min_hue, max_hue, shift = (float(part) for part in text.split(":"))
+    return HueRule(min_hue, max_hue, shift)
+
+
+def rgb_to_hsv(rgb):
+    """Float arrays h (degrees), s, v from an (..., 3) uint8 array."""
+    rgb = rgb.astype(np.float64) / 255.0
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    mx = rgb.max(axis=-1)
+    mn = rgb.min(axis=-1)
+    diff = mx - mn
+    safe_diff = np.where(diff == 0, 1.0, diff)
+    h = np.where(
+        mx == r,
+        (60 * ((g - b) / safe_diff) + 360) % 360,
+        np.where(
+            mx == g,
+            (60 * ((b - r) / safe_diff) + 120) % 360,
+            (60 * ((r - g) / safe_diff) + 240) % 360,
+        ),
+    )
+    h = np.where(diff == 0, 0.0, h)
+    s = np.where(mx == 0, 0.0, diff / np.where(mx == 0, 1.0, mx))
+    return h, s, mx
+
+
+def hsv_to_rgb(h, s, v):
+    """(..., 3) uint8 array from float arrays h (degrees), s, v."""
+    c = v * s
+    x = c * (1 - np.abs(((h / 60.0) % 2) - 1))
+    m = v - c
+    zero = np.zeros_like(c)
+    sector = np.clip((h // 60).astype(np.int64), 0, 5)
+    r1 = np.choose(sector, [c, x, zero, zero, x, c])
+    g1 = np.choose(sector, [x, c, c, x, zero, zero])
+    b1 = np.choose(sector, [zero, zero, x, c, c, x])
+    rgb = np.stack([(r1 + m) * 255, (g1 + m) * 255, (b1 + m) * 255], axis=-1)
+    # Truncate like int() does
+    return rgb.astype(np.uint8)
+
+
+def recolor_array(rgba, rules):
+    """
+    Apply hue rules to an (H, W, 4) uint8 array.
+
+    Returns (new array, whether any pixel changed). Fully transparent pixels
+    are left untouched.
+    """
+    h, s, v = rgb_to_hsv(rgba[..., :3])
+    shift = np.zeros_like(h)
+    unmatched = rgba[..., 3] != 0
+    for rule in rules:
+        matched = unmatched & (h >= rule.min_hue) & (h <= rule.max_hue)
+        shift[matched] = rule.shift
+        unmatched &= ~matched
+    changed = shift != 0
+    if not changed.any():
+        return rgba, False
+    result = rgba.copy()
+    new_rgb = hsv_to_rgb((h[changed] + shift[changed]) % 360, s[changed], v[changed])
+    result[changed, :3] = new_rgb
+    return result, True
+
+
+def recolor_image(image, rules):
+    """Recolored RGBA copy of a PIL image (the image itself when nothing matched)."""
+    rgba = np.asarray(image.convert("RGBA"))
+    result, changed = recolor_array(rgba, rules)
+    return Image.fromarray(result, "RGBA") if changed else image
+
@@ -1,27 +1,72 @@
 """
 Resource path utilities for PyInstaller compatibility.
+
+Images written by the bake step (script/bake_assets.py) live under
+assets/baked/ at their original relative path; get_resource_path hands those
+out instead of the originals. During development an original changed since the
+bake is used as is until the next bake.
 """
 import os
 import sys
 
+BAKED_DIR = "assets/baked"
+BAKED_MANIFEST = f"{BAKED_DIR}/manifest.json"
+
+_baked = None
+
+
+def resource_root():
+    """The folder resource paths are relative to: the project root, or the bundle's."""
+    if getattr(sys, 'frozen', False):
+        # Running as PyInstaller bundle
+        return sys._MEIPASS
+    # Running as normal Python script
+    # Go up from src/ to project root
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def baked_images():
+    """Project-relative paths of the images with a baked copy, read once from the bake manifest."""
+    global _baked
+    if _baked is not None:
+        return _baked
+    # Imported here: the archive itself resolves paths with this module
+    from src.asset_pack import load_json
+
+    base_path = resource_root()
+    try:
+        images = load_json(os.path.join(base_path, BAKED_MANIFEST))["images"]
+    except FileNotFoundError:
+        images = {}
+    if not getattr(sys, 'frozen', False):
+        # The bundle ships what was baked; a checkout skips images edited since
+        images = {
+            path: entry for path, entry in images.items()
+            if _unchanged(os.path.join(base_path, path), entry["source_mtime"], entry["source_bytes"])
+        }
+    _baked = frozenset(images)
+    return _baked
+
+
+def _unchanged(path, mtime, size):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return True
+    return stat.st_size == size and int(stat.st_mtime) == mtime
+
 
 def get_resource_path(relative_path):
     """
     Get the absolute path to a resource file.
     Works both in development and when bundled with PyInstaller.
-    
+
     Args:
         relative_path: Path relative to the project root
-        
+
     Returns:
-        Absolute path to the resource
+        Absolute path to the resource (its baked copy when there is one)
     """
-    if getattr(sys, 'frozen', False):
-        # Running as PyInstaller bundle
-        base_path = sys._MEIPASS
-    else:
-        # Running as normal Python script
-        # Go up from src/ to project root
-        base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    
-    return os.path.join(base_path, relative_path)
+    if relative_path in baked_images():
+        relative_path = f"{BAKED_DIR}/{relative_path}"
+    return os.path.join(resource_root(), relative_path)
@@ -0,0 +1,215 @@
+# Headless simulation for Peluche Express
+#
+# Runs a level's game logic (src/gameplay.py, the input handler, apple
+# collection, end-zone detection) without a window or GL context, as fast as
+# the CPU allows. Input comes from a bot: a function of the simulation that
+# returns the keys Player 1 holds this frame (scripted input is a bot too), or
+# from an input log recorded in the game (input_recording.py), replayed step
+# for step. Used by script/simulate.py to check levels on machines without a
+# display, and by script/replay.py.
+import random
+import time
+
+import arcade
+from pyglet.math import Vec2
+
+from src.clock import FixedStepClock, STEP
+from src.gameplay import setup_level_world, update_gameplay
+from src.input_handler import update_player_movement
+from src.input_recording import InputRecorder, InputReplay, before_step
+from src.level_compiler import load_level_data
+from src.level_streaming import stream_settings
+from src.level_manager import load_levels_config
+from src.profiler import FrameProfiler
+from src.resource_utils import get_resource_path
+
+SCREEN_WIDTH = 1260
+SCREEN_HEIGHT = 840
+FRAME_TIME = 1 / 60
+
+
+class HeadlessCamera:
+    """The part of arcade.Camera that game logic reads, without a window."""
+
+    def __init__(self, viewport_width, viewport_height):
+        self.viewport_width = viewport_width
+        self.viewport_height = viewport_height
+        self.position = Vec2(0, 0)
+        self.goal_position = Vec2(0, 0)
+        self.move_speed = 1.0
+
+    def move_to(self, vector, speed=1.0):
+        self.goal_position = Vec2(vector[0], vector[1])
+        self.move_speed = speed
+
+    def update(self):
+        # What arcade.Camera.use() does every drawn frame
+        self.position = self.position.lerp(self.goal_position, self.move_speed)
+
+
+class Simulation:
+    """One level played headless; carries the same gameplay attributes as PelucheExpress."""
+
+    def __init__(self, level_id, levels=None, level_data=None):
+        """Play a configured level; level_data replaces its map (e.g. a stress level)."""
+        self.levels = levels or load_levels_config()
+        self.current_level_id = level_id
+        self.camera = HeadlessCamera(SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.pressed_keys = set()
+        self.player_physics = None
+        self.dogs = None
+        self.input_recorder = None
+        self.input_replay = None
+        self.level_stream = None
+        self.end_zone_sprites = arcade.SpriteList()
+        self.profiler = FrameProfiler()
+        self.clock = FixedStepClock()
+        self.frame = 0
+        self.state = "game"
+        level = self.levels[level_id]
+        if level_data is None:
+            level_data = load_level_data(get_resource_path(level["map"]), mapped=True)
+        setup_level_world(self, level_data, stream_settings(level, level_data))
+
+    @property
+    def finished(self):
+        """The end zone was reached (the exit animation that follows is cosmetic)."""
+        return self.state != "game"
+
+    def step(self, keys=(), delta_time=FRAME_TIME):
+        """
+        Advance one frame (the fixed steps it covers) with the given keys held
+        (any player's, see input_handler.KEY_BINDINGS), as PelucheExpress.on_update would.
+        """
+        keys = set(keys)
+        if keys != self.pressed_keys:
+            # The window forwards key changes to the players as they happen
+            self.pressed_keys = keys
+            update_player_movement(self)
+        with self.profiler.section("update"):
+            for _ in range(self.clock.advance(delta_time)):
+                if self.input_replay is not None and self.input_replay.done:
+                    break
+                before_step(self)
+                update_gameplay(self, STEP)
+                if self.finished:
+                    break
+        self.camera.update()
+        self.profiler.end_frame()
+        self.frame += 1
+
+
+def run_right_bot(sim):
+    """Hold right the whole time."""
+    return {arcade.key.RIGHT}
+
+
+def run_right_jump_bot(sim, period=24, hold=12):
+    """Hold right and jump every `period` frames, holding jump for `hold` frames."""
+    keys = {arcade.key.RIGHT}
+    if sim.frame % period < hold:
+        keys.add(arcade.key.UP)
+    return keys
+
+
+def make_random_jump_bot(seed):
+    """Hold right and press jump for random lengths at random times (reproducible per seed)."""
+    rng = random.Random(seed)
+    state = {"until": 0, "jumping": False}
+
+    def bot(sim):
+        if sim.frame >= state["until"]:
+            state["jumping"] = not state["jumping"]
+            state["until"] = sim.frame + rng.randint(4, 30)
+        return {arcade.key.RIGHT, arcade.key.UP} if state["jumping"] else {arcade.key.RIGHT}
+    return bot
+
+
+def make_script_bot(events):
+    """
+    Replay a key script: a list of [frame, [key names]] meaning "from this frame
+    on, hold these keys" (names as in arcade.key, e.g. "RIGHT", "UP").
+    """
+    timeline = sorted((frame, {getattr(arcade.key, name) for name in names}) for frame, names in events)
+    state = {"next": 0, "keys": set()}
+
+    def bot(sim):
+        while state["next"] < len(timeline) and timeline[state["next"]][0] <= sim.frame:
+            state["keys"] = timeline[state["next"]][1]
+            state["next"] += 1
+        return state["keys"]
+    return bot
+
+
+BOTS = {
+    "run-right": lambda seed: run_right_bot,
+    "run-right-jump": lambda seed: run_right_jump_bot,
+    "random-jump": make_random_jump_bot,
+}
+
+MAX_FRAMES = 60 * 60 * 3
+
+
+def run_level(level_id, bot="run-right-jump", seed=0, max_frames=MAX_FRAMES, script=None, record=None):
+    """
+    Play a level headless and report how it went.
+
+    Input comes from the named bot, or from a key script (see make_script_bot)
+    when one is given. With `record`, the input log of the run is saved there.
+    """
+    start = time.perf_counter()
+    sim = Simulation(level_id)
+    load_seconds = time.perf_counter() - start
+    choose_keys = make_script_bot(script) if script is not None else BOTS[bot](seed)
+    if record:
+        sim.input_recorder = InputRecorder(level_id, sim.player_physics.count if sim.player_physics else 0)
+    start = time.perf_counter()
+    while not sim.finished and sim.frame < max_frames:
+        sim.step(choose_keys(sim))
+    seconds = time.perf_counter() - start
+    if record:
+        sim.input_recorder.finish(sim).save(record)
+    player = sim.players[0] if sim.players else None
+    return {
+        "level": level_id,
+        "bot": "script" if script is not None else bot,
+        "seed": seed,
+        "finished": sim.finished,
+        "frames": sim.frame,
+        "apples": sim.apples_collected,
+        "total_apples": sim.total_apples,
+        "final_x": round(player.center_x, 1) if player else None,
+        "load_seconds": round(load_seconds, 4),
+        "sim_seconds": round(seconds, 4),
+        "frames_per_second": round(sim.frame / seconds) if seconds else None,
+    }
+
+
+def replay_level(log):
+    """
+    Replay an input log headless, as fast as possible, and report how long its
+    steps took and whether the players ended where they did when it was recorded.
+    """
+    start = time.perf_counter()
+    sim = Simulation(log.level_id)
+    load_seconds = time.perf_counter() - start
+    sim.input_replay = InputReplay(log)
+    start = time.perf_counter()
+    while not sim.finished and not sim.input_replay.done:
+        # The replay holds the keys; frames only pace the steps
+        sim.step(sim.pressed_keys)
+    seconds = time.perf_counter() - start
+    steps = sim.input_replay.step
+    return {
+        "level": log.level_id,
+        "steps": steps,
+        "recorded_steps": log.steps,
+        "matches": steps == log.steps and sim.input_replay.matches(sim),
+        "finished": sim.finished,
+        "apples": sim.apples_collected,
+        "total_apples": sim.total_apples,
+        "load_seconds": round(load_seconds, 4),
+        "sim_seconds": round(seconds, 4),
+        "steps_per_second": round(steps / seconds) if seconds else None,
+        "phases": sim.profiler.summary(sim.frame)["phases"],
+    }
@@ -5,17 +5,29 @@ from src.level_manager import go_to_next_level
 def handle_level_exit_update(game, delta_time):
     player = game.players[0]
     # Let player land if in air
-    if abs(player.change_y) > 1:
+    if player.is_airborne():
         pass  # Wait until landed
     else:
         if not game.exit_player_walk:
-            player.forced_walk = True
-            player.input_disabled = True
+            if game.player_physics:
+                game.player_physics.force_walk(0)
             game.exit_player_walk = True
         if player.center_x > game.camera.position[0] + game.camera.viewport_width:
             game.exit_player_offscreen = True
     if game.exit_player_offscreen:
-        game.exit_fade += game.exit_fade_speed
+        game.exit_fade += game.exit_fade_speed * delta_time
         if game.exit_fade >= 1.0:
             go_to_next_level(game)
     # Don't update camera (freeze)
+
+def static_scene(game):
+    """
+    What a static screen shows (compare two to know whether it changed), or
+    None while the picture moves; src/frame_pacing.py slows static scenes down.
+    """
+    if game.state == "main_screen":
+        return game.state, game.current_level_id
+    if game.state == "transition_screen":
+        # The loading bar is the only thing moving
+        return game.state, game.current_level_id, game.level_loader.progress(game.current_level_id)
+    return None
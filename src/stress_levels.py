@@ -0,0 +1,101 @@
+# Synthetic stress levels for Peluche Express
+#
+# Bigger versions of real levels for the benchmarks (script/benchmark.py,
+# script/bench_render.py): the same tiles repeated over a longer map, or more
+# apples to collect, or more players or dogs. They are built from LevelData in memory and never saved.
+import copy
+from array import array
+
+from src.level_data import LevelData
+
+
+def stretched(level_data, times):
+    """
+    The level with its map repeated `times` over, left to right.
+
+    Tiles and apples are repeated in every copy; spawns stay in the first copy
+    and the end zone moves to the last one.
+    """
+    width_px = level_data.width * level_data.tile_width
+    meta = copy.deepcopy(level_data.meta)
+    meta["width"] = level_data.width * times
+    for layer in meta["layers"]:
+        if layer["kind"] != "objects" or layer["name"] == "Spawns":
+            continue
+        if layer["name"] == "EndZone":
+            copies = [times - 1]
+        else:
+            copies = range(times)
+        originals = layer["objects"]
+        layer["objects"] = [_shifted(obj, width_px * index) for index in copies for obj in originals]
+    if meta["end_zone_avg_x"] is not None:
+        meta["end_zone_avg_x"] += width_px * (times - 1)
+
+    layer_data = {}
+    for name, data in level_data.layer_data.items():
+        rows = array("I")
+        for row in range(level_data.height):
+            row_data = data[row * level_data.width:(row + 1) * level_data.width]
+            for _ in range(times):
+                rows.extend(row_data)
+        layer_data[name] = rows
+    return LevelData(meta, layer_data)
+
+
+def with_more_apples(level_data, factor):
+    """The level with every apple repeated `factor` times, a few tiles apart."""
+    meta = copy.deepcopy(level_data.meta)
+    for layer in meta["layers"]:
+        if layer["kind"] == "objects" and layer["name"] == "Apples":
+            originals = layer["objects"]
+            layer["objects"] = [
+                _shifted(obj, index * 3 * level_data.tile_width)
+                for index in range(factor)
+                for obj in originals
+            ]
+    return LevelData(meta, level_data.layer_data)
+
+
+def with_more_players(level_data, count):
+    """
+    The level with `count` extra player spawns (Player3, Player4, ...) next to
+    Player1, 40px apart; each spawn gets its own player.
+    """
+    meta = copy.deepcopy(level_data.meta)
+    spawns = meta["spawns"]
+    x, y = spawns["Player1"]
+    number = 1 + sum(1 for name in spawns if name.startswith("Player"))
+    for index in range(count):
+        spawns[f"Player{number + index}"] = [x + 40 * (index + 1), y]
+    return LevelData(meta, level_data.layer_data)
+
+
+def with_more_dogs(level_data, count):
+    """
+    The level with `count` extra dogs next to Player1's spawn, 60px apart, in
+    its Dogs object layer (added if the level has none).
+    """
+    meta = copy.deepcopy(level_data.meta)
+    x, y = meta["spawns"]["Player1"]
+    layer = next((layer for layer in meta["layers"] if layer["kind"] == "objects" and layer["name"] == "Dogs"), None)
+    if layer is None:
+        layer = {"name": "Dogs", "visible": True, "opacity": 1, "properties": {},
+                 "collides": False, "kind": "objects", "objects": []}
+        meta["layers"].append(layer)
+    for index in range(count):
+        layer["objects"].append({
+            "id": 0, "name": f"Dog{index + 1}", "type": "", "properties": {},
+            "kind": "shape", "shape": [x + 60 * (index + 1), y],
+        })
+    return LevelData(meta, level_data.layer_data)
+
+
+def _shifted(obj, dx):
+    obj = copy.deepcopy(obj)
+    if obj["kind"] == "tile":
+        obj["x"] += dx
+    elif obj["shape"] and isinstance(obj["shape"][0], (int, float)):
+        obj["shape"][0] += dx
+    else:
+        obj["shape"] = [[x + dx, y] for x, y in obj["shape"]]
+    return obj
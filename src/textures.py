@@ -0,0 +1,161 @@
+# Texture registry for Peluche Express
+#
+# One place that hands out arcade textures, keyed by (resolved path, flips,
+# crop). Every caller asking for the same key gets the same
+# Texture object, so respawning players or re-entering a level does no decode
+# work (and, since the GPU atlas keys textures by name, no upload either).
+#
+# Textures are reference-counted per owner: the game uses the current level id
+# for level textures and GLOBAL for what lives as long as the window (players,
+# HUD). release(owner) drops an owner's references; trim() then forgets every
+# texture nobody references any more, once the next level holds its own. Levels
+# kept built by src/level_residency.py hold their owner until evicted.
+#
+# preload() and warm_up() decode the files behind many textures in one parallel
+# batch; the textures are then made from arcade's cache on the main thread.
+import os
+
+import arcade
+
+from src.asset_pack import load_pack
+from src.atlas import decode_texture_images, install_textures
+
+GLOBAL = "global"
+
+
+class TextureRegistry:
+    """Shared, reference-counted textures with hit/miss statistics."""
+
+    def __init__(self):
+        self._textures = {}
+        # key -> set of owners holding it
+        self._owners = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(path, flipped_horizontally=False, flipped_vertically=False, flipped_diagonally=False,
+            crop=None):
+        path = os.path.normcase(os.path.abspath(str(path)))
+        flips = (bool(flipped_horizontally), bool(flipped_vertically), bool(flipped_diagonally))
+        return path, flips, tuple(crop) if crop else None
+
+    def get(self, path, flipped_horizontally=False, flipped_vertically=False, flipped_diagonally=False,
+            crop=None, owner=None):
+        """
+        The shared texture for a file, optionally cropped (x, y, width, height)
+        or flipped.
+
+        owner (a level id, or GLOBAL) keeps the texture alive until released.
+        """
+        key = self.key(path, flipped_horizontally, flipped_vertically, flipped_diagonally, crop)
+        texture = self._textures.get(key)
+        if texture is None:
+            self.misses += 1
+            texture = self._load(key)
+            self._textures[key] = texture
+            self._owners[key] = set()
+        else:
+            self.hits += 1
+        if owner is not None:
+            self._owners[key].add(owner)
+        return texture
+
+    def _load(self, key):
+        path, (flip_h, flip_v, flip_d), crop = key
+        if load_pack() is not None:
+            # Decoded from the asset archive's mapping, so arcade finds the file cached instead of opening it
+            install_textures(decode_texture_images([path], include_loose=True))
+        x, y, width, height = crop or (0, 0, 0, 0)
+        # Same arguments arcade.Sprite passes, so textures seeded from the atlas are found
+        return arcade.load_texture(
+            path, x, y, width, height,
+            flipped_horizontally=flip_h,
+            flipped_vertically=flip_v,
+            flipped_diagonally=flip_d,
+            hit_box_algorithm="Simple",
+        )
+
+    @staticmethod
+    def preload(paths):
+        """
+        Decode image files in one parallel batch (src/atlas.py) and cache them for
+        arcade, so the textures later made from them don't decode one at a time.
+        Call from the main thread.
+        """
+        return install_textures(decode_texture_images(paths, include_loose=True))
+
+    def warm_up(self, entries, owner=GLOBAL):
+        """Load a declared set of textures up front: (path, flipped_horizontally) entries."""
+        self.preload([
+            path for path, flipped_horizontally in entries
+            if self.key(path, flipped_horizontally=flipped_horizontally) not in self._textures
+        ])
+        for path, flipped_horizontally in entries:
+            self.get(path, flipped_horizontally=flipped_horizontally, owner=owner)
+
+    def release(self, owner):
+        """Drop every reference an owner holds (the textures stay until trim())."""
+        if owner is None:
+            return
+        for owners in self._owners.values():
+            owners.discard(owner)
+
+    def trim(self, gpu_atlas=None):
+        """
+        Forget textures no owner references, here and in arcade's texture cache,
+        and with gpu_atlas (the window's ctx.default_atlas) in the GPU atlas too.
+        """
+        unused = [key for key, owners in self._owners.items() if not owners]
+        dropped = set()
+        for key in unused:
+            texture = self._textures.pop(key)
+            del self._owners[key]
+            dropped.add(id(texture))
+            dropped.add(id(texture.image))
+        if dropped:
+            cache = arcade.load_texture.texture_cache
+            for name in [name for name, texture in cache.items()
+                         if id(texture) in dropped or id(texture.image) in dropped]:
+                del cache[name]
+            if gpu_atlas is not None:
+                self._trim_atlas(gpu_atlas, dropped)
+        return len(unused)
+
+    @staticmethod
+    def _trim_atlas(gpu_atlas, dropped):
+        removed = [texture for texture in gpu_atlas._textures
+                   if id(texture) in dropped or id(texture.image) in dropped]
+        for texture in removed:
+            gpu_atlas.remove(texture)
+        if removed:
+            # Packs the remaining textures again (their ids stay) so the freed space is reused
+            gpu_atlas.rebuild()
+
+    def owner_bytes(self, owner):
+        """Decoded RGBA bytes of the images an owner holds (shared images count for every owner)."""
+        images = {}
+        for key, owners in self._owners.items():
+            if owner in owners:
+                image = self._textures[key].image
+                images[id(image)] = image.width * image.height * 4
+        return sum(images.values())
+
+    def stats(self):
+        images = {}
+        for texture in self._textures.values():
+            images[id(texture.image)] = texture.image.width * texture.image.height * 4
+        owners = {}
+        for key_owners in self._owners.values():
+            for owner in key_owners:
+                owners[owner] = owners.get(owner, 0) + 1
+        return {
+            "textures": len(self._textures),
+            "hits": self.hits,
+            "misses": self.misses,
+            "bytes": sum(images.values()),
+            "owners": owners,
+        }
+
+
+texture_registry = TextureRegistry()
@@ -0,0 +1,87 @@
+# Chunked tile layers for Peluche Express
+#
+# Levels are long and narrow (180 tiles = 12,600px) while the window shows about
+# 1,260px, so drawing whole tile layers every frame submits ten times more
+# sprites than can be seen. ChunkedTileLayers splits each static tile layer into
+# vertical strips of CHUNK_TILES columns, each with its own static sprite list,
+# and draw() only submits the strips overlapping the camera (plus a margin).
+# The cost of a frame then depends on the window width, not the map length.
+#
+# The tile sprites stay in the tile map / scene lists too (physics and the
+# rest of the game read those); only drawing goes through the chunks. Streamed
+# levels (src/level_streaming.py) leave those lists empty and install each
+# chunk's sprite list as it is made live.
+import math
+
+import arcade
+
+CHUNK_TILES = 16
+
+
+class ChunkedTileLayers:
+    """Static tile layers of a tile map, split into fixed-width chunks for culled drawing."""
+
+    def __init__(self, tile_map, layer_names, chunk_tiles=CHUNK_TILES):
+        scaling = getattr(tile_map, "scaling", 1.0)
+        self.chunk_width = chunk_tiles * tile_map.tile_width * scaling
+        self.chunk_count = max(1, math.ceil(tile_map.width / chunk_tiles))
+        # A sprite is filed by its center, so it can stick out of its chunk by half a tile
+        self.margin = tile_map.tile_width * scaling
+        # id(source sprite list) -> per-chunk sprite lists (None where the chunk is empty)
+        self._chunks = {}
+        for name in layer_names:
+            source = tile_map.sprite_lists.get(name)
+            if source is None:
+                continue
+            chunks = [None] * self.chunk_count
+            for sprite in source:
+                index = min(self.chunk_count - 1, max(0, int(sprite.center_x // self.chunk_width)))
+                if chunks[index] is None:
+                    chunks[index] = arcade.SpriteList(use_spatial_hash=False, is_static=True)
+                chunks[index].append(sprite)
+            self._chunks[id(source)] = (source, chunks)
+
+    def chunk_range(self, left, right):
+        """First and last chunk index overlapping [left, right] in world x."""
+        first = int((left - self.margin) // self.chunk_width)
+        last = int((right + self.margin) // self.chunk_width)
+        return max(0, first), min(self.chunk_count - 1, last)
+
+    def set_chunk(self, sprite_list, index, chunk):
+        """Install one chunk's sprite list of a layer, or empty it with None (streamed levels)."""
+        self._chunks[id(sprite_list)][1][index] = chunk
+
+    def chunk_lists(self):
+        """Every non-empty chunk sprite list, of every layer."""
+        return [chunk for _, chunks in self._chunks.values() for chunk in chunks if chunk is not None]
+
+    def is_chunked(self, sprite_list):
+        return id(sprite_list) in self._chunks
+
+    def draw_layer(self, sprite_list, left, right):
+        """Draw the chunks of a chunked layer that overlap [left, right]."""
+        source, chunks = self._chunks[id(sprite_list)]
+        if not source.visible:
+            return
+        first, last = self.chunk_range(left, right)
+        for index in range(first, last + 1):
+            chunk = chunks[index]
+            if chunk is not None:
+                chunk.draw()
+
+    def draw_scene(self, scene, left, right):
+        """
+        Draw a scene in its layer order, culling chunked layers to [left, right].
+
+        Layers that aren't chunked (players, apples, end zone...) are drawn whole.
+        """
+        for sprite_list in scene.sprite_lists:
+            if id(sprite_list) in self._chunks:
+                self.draw_layer(sprite_list, left, right)
+            else:
+                sprite_list.draw()
+
+
+def static_tile_layer_names(level_data):
+    """Names of the level's tile layers; object layers (apples, end zone...) stay dynamic."""
+    return [layer["name"] for layer in level_data.layers if layer["kind"] == "tiles"]
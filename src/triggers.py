@@ -0,0 +1,162 @@
+# Trigger volumes for Peluche Express
+#
+# Any object layer can be a layer of triggers: give it a `trigger` property in
+# Tiled naming the action its volumes run (gameplay.TRIGGER_ACTIONS: level_exit,
+# goal...); EndZone layers are level_exit triggers without one. A tile,
+# rectangle or polygon object is a volume of its bounds. A layer's point
+# objects together mark a finish line instead: one volume covering everything
+# right of their average x, at any height (the EndZone rule).
+#
+# An action has enter, exit and stay callbacks, called as (game, volume,
+# player index) when a player's center comes into a volume, leaves it, and on
+# every step it spends inside. Levels are long and only 12 tiles high, so the
+# volumes are indexed by x alone: the edges of all volumes cut x into
+# segments, each holding the volumes that cover it, found by bisection. Every
+# player remembers its cell, the box of its segment where the volumes holding
+# its center stay the same, so while it stays in it (nearly every step) an
+# update costs four comparisons, however many triggers the level has.
+from bisect import bisect_right
+from collections import namedtuple
+import math
+
+DEFAULT_TRIGGERS = {"EndZone": "level_exit"}
+
+# Callbacks of a trigger action, each (game, volume, player index) or None
+TriggerAction = namedtuple("TriggerAction", ["enter", "exit", "stay"], defaults=(None, None, None))
+# A volume in map pixels (y up), half-open: left <= x < right, bottom <= y < top
+TriggerVolume = namedtuple("TriggerVolume", ["action", "layer", "name", "left", "right", "bottom", "top", "properties"])
+
+
+def trigger_layers(level_data):
+    """(layer name, action name) of every object layer holding triggers."""
+    layers = []
+    for layer in level_data.layers:
+        if layer["kind"] != "objects":
+            continue
+        action = layer["properties"].get("trigger") or DEFAULT_TRIGGERS.get(layer["name"])
+        if action:
+            layers.append((layer["name"], str(action)))
+    return layers
+
+
+def trigger_volumes(level_data):
+    """The TriggerVolumes of a level's trigger layers."""
+    map_height = level_data.height * level_data.tile_height
+    volumes = []
+    for layer, action in trigger_layers(level_data):
+        objects = level_data.object_layer(layer)
+        points = [obj for obj in objects if obj["kind"] == "shape" and isinstance(obj["shape"][0], (int, float))]
+        if points:
+            # Finish line (resolved for the EndZone by the level compiler as end_zone_avg_x)
+            left = sum(obj["shape"][0] for obj in points) / len(points)
+            volumes.append(TriggerVolume(action, layer, "", left, math.inf, -math.inf, math.inf, {}))
+            continue
+        for obj in objects:
+            if obj["kind"] == "tile":
+                left, bottom, right, top = obj["x"], obj["y"], obj["x"] + obj["w"], obj["y"] + obj["h"]
+            else:
+                xs = [x for x, _ in obj["shape"]]
+                ys = [y for _, y in obj["shape"]]
+                if max(ys) <= 0:
+                    # Rectangles and ellipses keep arcade.TileMap's shapes: y down, negated
+                    ys = [map_height + y for y in ys]
+                left, bottom, right, top = min(xs), min(ys), max(xs), max(ys)
+            volumes.append(TriggerVolume(action, layer, obj["name"], left, right, bottom, top, obj["properties"]))
+    return volumes
+
+
+class TriggerIndex:
+    """Volumes cut into x segments, each with the volumes covering it."""
+
+    def __init__(self, volumes):
+        # A volume without width can't hold a point
+        self.volumes = [volume for volume in volumes if volume.left < volume.right]
+        # Segment i spans [edges[i - 1], edges[i]) (the first and last are open-ended)
+        self.edges = sorted({volume.left for volume in self.volumes} | {volume.right for volume in self.volumes})
+        starts = {}
+        ends = {}
+        for volume in self.volumes:
+            starts.setdefault(volume.left, []).append(volume)
+            ends.setdefault(volume.right, []).append(volume)
+        # Sweep the edges left to right, keeping the volumes open between them
+        self.segments = [()]
+        active = []
+        for edge in self.edges:
+            ending = ends.get(edge, ())
+            active = [volume for volume in active if volume not in ending] + starts.get(edge, [])
+            self.segments.append(tuple(active))
+
+    def segment(self, x):
+        """(index, left edge, right edge) of the segment holding x."""
+        index = bisect_right(self.edges, x)
+        left = self.edges[index - 1] if index else -math.inf
+        right = self.edges[index] if index < len(self.edges) else math.inf
+        return index, left, right
+
+    def at(self, x, y):
+        """Volumes holding the point (x, y)."""
+        return self.cell(x, y)[4]
+
+    def cell(self, x, y):
+        """
+        (left, right, bottom, top, volumes): the largest box around (x, y)
+        within its segment where the same volumes hold every point.
+        """
+        index, left, right = self.segment(x)
+        bottom, top = -math.inf, math.inf
+        volumes = []
+        for volume in self.segments[index]:
+            if volume.bottom <= y < volume.top:
+                volumes.append(volume)
+                bottom, top = max(bottom, volume.bottom), min(top, volume.top)
+            elif volume.top <= y:
+                bottom = max(bottom, volume.top)
+            else:
+                top = min(top, volume.bottom)
+        return left, right, bottom, top, tuple(volumes)
+
+
+class Triggers:
+    """A level's trigger volumes and which of them each player is in."""
+
+    def __init__(self, volumes, actions):
+        self.index = TriggerIndex(volumes)
+        self.actions = actions
+        self._staying = {name for name, action in actions.items() if action.stay is not None}
+        # Per player: [left, right, bottom, top, volumes, volumes with a stay callback] of the cell it was last in
+        self._cells = []
+        self.enters = 0
+
+    def __len__(self):
+        return len(self.index.volumes)
+
+    def update(self, game, players):
+        """One step: call the enter, exit and stay callbacks for every player's moves."""
+        cells = self._cells
+        while len(cells) < len(players):
+            cells.append([math.inf, -math.inf, math.inf, -math.inf, (), ()])
+        for number, player in enumerate(players):
+            cell = cells[number]
+            x = player.center_x
+            y = player.center_y
+            if not (cell[0] <= x < cell[1] and cell[2] <= y < cell[3]):
+                inside = cell[4]
+                left, right, bottom, top, now = self.index.cell(x, y)
+                staying = tuple(volume for volume in now if volume.action in self._staying)
+                cells[number] = cell = [left, right, bottom, top, now, staying]
+                if now != inside:
+                    for volume in inside:
+                        if volume not in now:
+                            self._call(volume, "exit", game, number)
+                    for volume in now:
+                        if volume not in inside:
+                            self.enters += 1
+                            self._call(volume, "enter", game, number)
+            for volume in cell[5]:
+                self.actions[volume.action].stay(game, volume, number)
+
+    def _call(self, volume, event, game, number):
+        action = self.actions.get(volume.action)
+        callback = getattr(action, event) if action else None
+        if callback is not None:
+            callback(game, volume, number)
@@ -1,92 +1,80 @@
 # UI drawing helpers for Peluche Express
-import arcade
+import time
+
+from src.profiler import sprite_count, texture_memory
+from src.textures import texture_registry
+from src.hud import PROFILER_REFRESH_RATE, update_game_hud, update_profiler_hud, update_transition_hud
 
 def draw_apple_counter(game):
     """Draw the apple collection counter with mini apple icon in the top-left corner."""
     if game.state != "game":
         return
-    camera_x = game.camera.position[0]
-    text_x = camera_x + 20
-    text_y = game.height - 40
-    icon_x = camera_x + 80
-    icon_y = game.height - 30
-    arcade.draw_rectangle_filled(
-        camera_x + 65, game.height - 30,
-        100, 40,
-        (0, 0, 0, 128)
-    )
-    arcade.draw_text(
-        f"{game.apples_collected}/{game.total_apples}",
-        text_x, text_y,
-        arcade.color.WHITE,
-        font_size=16,
-        font_name="Arial"
-    )
-    arcade.draw_texture_rectangle(
-        icon_x, icon_y,
-        24, 24,
-        game.apple_icon_texture
-    )
-
-def draw_transition_text(game):
-    if not game.transition_text:
-        return
-    arcade.draw_rectangle_filled(
-        game.width // 2,
-        game.height // 2,
-        len(game.transition_text) * 25,
-        60,
-        (0, 0, 0, 128)
-    )
-    arcade.draw_text(
-        game.transition_text,
-        game.width // 2,
-        game.height // 2,
-        arcade.color.WHITE,
-        font_size=36,
-        anchor_x="center",
-        anchor_y="center",
-        font_name="Arial"
-    )
-
-def draw_repeating_background(texture, width, height):
-    if not texture:
-        return
-    scale_y = height / texture.height
-    scaled_width = texture.width * scale_y
-    scaled_height = height
-    x = 0
-    while x < width:
-        arcade.draw_lrwh_rectangle_textured(
-            x, 0, scaled_width, scaled_height, texture
-        )
-        x += scaled_width
+    update_game_hud(game)
+    game.hud.draw()
 
 def draw_main_screen(game):
     game.camera.use()
-    if game.background_texture:
-        draw_repeating_background(game.background_texture, game.width, game.height)
+    if game.screen_background:
+        game.screen_background.draw(0, 0, game.width, game.height)
 
 def draw_transition_screen(game):
-    ui_camera = arcade.Camera(game.width, game.height)
-    ui_camera.move_to((0, 0), 1.0)
-    ui_camera.use()
-    draw_repeating_background(game.background_texture, game.width, game.height)
-    draw_transition_text(game)
+    """Background, level title and loading bar."""
+    game.ui_camera.use()
+    if game.screen_background:
+        game.screen_background.draw(0, 0, game.width, game.height)
+    update_transition_hud(game)
+    game.transition_hud.draw()
 
 def draw_game_screen(game):
     if not game.scene:
         return
+    profiler = game.profiler
     game.camera.use()
-    if game.map_bg_texture:
-        if game.tile_map:
-            map_width = game.tile_map.width * game.tile_map.tile_width
-            map_height = game.tile_map.height * game.tile_map.tile_height
+    with profiler.section("background"):
+        if game.map_background:
+            left, bottom = game.camera.position
+            game.map_background.draw(left, bottom, game.camera.viewport_width, game.camera.viewport_height)
+    with profiler.section("scene"):
+        if game.tile_chunks:
+            view_left = game.camera.position[0]
+            game.tile_chunks.draw_scene(game.scene, view_left, view_left + game.camera.viewport_width)
         else:
-            map_width = game.width
-            map_height = game.height
-        draw_repeating_background(game.map_bg_texture, map_width, map_height)
-    game.scene.draw()
-    if game.end_zone_sprites:
-        game.end_zone_sprites.draw()
-    draw_apple_counter(game)
+            game.scene.draw()
+        if game.end_zone_sprites:
+            game.end_zone_sprites.draw()
+    with profiler.section("hud"):
+        draw_apple_counter(game)
+
+def draw_profiler_overlay(game):
+    """Frame time, per-phase breakdown, sprite counts and texture memory (toggled with F3)."""
+    hud = game.profiler_hud
+    now = time.perf_counter()
+    # Refreshed a few times a second: re-laying out the text every frame would weigh on the timings shown
+    if now >= hud.refresh_at:
+        hud.refresh_at = now + 1 / PROFILER_REFRESH_RATE
+        update_profiler_hud(game, profiler_lines(game))
+    hud.draw()
+    game.camera.use()
+
+def profiler_lines(game):
+    """The profiler overlay's lines of figures."""
+    profiler = game.profiler
+    summary = profiler.summary()
+    gpu_bytes, atlas_textures, image_bytes = texture_memory(game.ctx)
+    lines = [
+        f"frame {summary['frame_ms']:.2f} ms (max {summary['frame_max_ms']:.2f})",
+    ]
+    for name, ms in summary["phases"].items():
+        depth = name.count("/")
+        lines.append(f"{'  ' * depth}{name.rsplit('/', 1)[-1]:<{14 - 2 * depth}}{ms:7.3f} ms")
+    lines.append(f"sprites {sprite_count(game.scene)}  players {len(game.players)}")
+    if game.level_stream:
+        lines.append(f"stream {len(game.level_stream.live)} chunks  {game.level_stream.sprite_count} sprites")
+    lines.append(f"atlas {gpu_bytes / 2**20:.1f} MB ({atlas_textures} textures)  images {image_bytes / 2**20:.1f} MB")
+    registry = texture_registry.stats()
+    lines.append(f"registry {registry['textures']} textures {registry['bytes'] / 2**20:.1f} MB  hits {registry['hits']} misses {registry['misses']}")
+    residency = game.level_residency.stats()
+    lines.append(f"levels {len(residency['levels'])}/{residency['max_levels']} "
+                 f"{(residency['cpu_bytes'] + residency['gpu_bytes']) / 2**20:.1f} MB  "
+                 f"hits {residency['hits']} evicted {residency['evictions']}")
+    return lines